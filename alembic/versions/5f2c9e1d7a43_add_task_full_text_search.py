@@ -0,0 +1,82 @@
+"""add task full text search
+
+Revision ID: 5f2c9e1d7a43
+Revises: 8db74134e572
+Create Date: 2026-10-18 21:04:17.326591
+
+"""
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = "5f2c9e1d7a43"
+down_revision = "8db74134e572"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    dialect = op.get_bind().dialect.name
+    if dialect == "postgresql":
+        # Kept up to date by Postgres itself, the title weighs more.
+        op.execute(
+            """
+            ALTER TABLE task ADD COLUMN search_vector tsvector
+            GENERATED ALWAYS AS (
+                setweight(to_tsvector('english', coalesce(title, '')), 'A')
+                || setweight(
+                    to_tsvector('english', coalesce(description, '')), 'B'
+                )
+            ) STORED
+            """
+        )
+        op.create_index(
+            "ix_task_search_vector",
+            "task",
+            ["search_vector"],
+            postgresql_using="gin",
+        )
+    elif dialect == "sqlite":
+        # External content FTS5 table, synced with task by the triggers.
+        op.execute(
+            "CREATE VIRTUAL TABLE task_fts USING fts5("
+            "title, description, content='task', content_rowid='id')"
+        )
+        op.execute(
+            """
+            CREATE TRIGGER task_fts_insert AFTER INSERT ON task BEGIN
+                INSERT INTO task_fts(rowid, title, description)
+                VALUES (new.id, new.title, new.description);
+            END
+            """
+        )
+        op.execute(
+            """
+            CREATE TRIGGER task_fts_delete AFTER DELETE ON task BEGIN
+                INSERT INTO task_fts(task_fts, rowid, title, description)
+                VALUES ('delete', old.id, old.title, old.description);
+            END
+            """
+        )
+        op.execute(
+            """
+            CREATE TRIGGER task_fts_update
+            AFTER UPDATE OF title, description ON task BEGIN
+                INSERT INTO task_fts(task_fts, rowid, title, description)
+                VALUES ('delete', old.id, old.title, old.description);
+                INSERT INTO task_fts(rowid, title, description)
+                VALUES (new.id, new.title, new.description);
+            END
+            """
+        )
+        op.execute("INSERT INTO task_fts(task_fts) VALUES ('rebuild')")
+
+
+def downgrade():
+    dialect = op.get_bind().dialect.name
+    if dialect == "postgresql":
+        op.drop_index("ix_task_search_vector", table_name="task")
+        op.drop_column("task", "search_vector")
+    elif dialect == "sqlite":
+        for trigger in ("insert", "delete", "update"):
+            op.execute(f"DROP TRIGGER task_fts_{trigger}")
+        op.execute("DROP TABLE task_fts")
@@ -0,0 +1,33 @@
+"""add user token version
+
+Revision ID: 8db74134e572
+Revises: ca1aebc64db5
+Create Date: 2026-10-18 19:12:41.502318
+
+"""
+import sqlalchemy as sa
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = "8db74134e572"
+down_revision = "ca1aebc64db5"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.add_column(
+        "user",
+        sa.Column(
+            "token_version",
+            sa.Integer(),
+            nullable=False,
+            server_default="0",
+        ),
+    )
+
+
+def downgrade():
+    with op.batch_alter_table("user") as batch_op:
+        batch_op.drop_column("token_version")
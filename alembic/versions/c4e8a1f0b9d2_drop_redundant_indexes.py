@@ -0,0 +1,36 @@
+"""drop redundant indexes
+
+Revision ID: c4e8a1f0b9d2
+Revises: 5f2c9e1d7a43
+Create Date: 2026-10-18 21:47:52.810364
+
+"""
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = "c4e8a1f0b9d2"
+down_revision = "5f2c9e1d7a43"
+branch_labels = None
+depends_on = None
+
+# Indexes no query uses (see app/database/index_audit.py): the id ones
+# duplicate the primary keys, nothing filters or orders by full_name, and
+# the title/description B-trees can't serve the word search.
+REDUNDANT_INDEXES = [
+    ("ix_user_id", "user", ["id"]),
+    ("ix_user_full_name", "user", ["full_name"]),
+    ("ix_task_id", "task", ["id"]),
+    ("ix_task_title", "task", ["title"]),
+    ("ix_task_description", "task", ["description"]),
+]
+
+
+def upgrade():
+    for name, table, _ in REDUNDANT_INDEXES:
+        op.drop_index(name, table_name=table)
+
+
+def downgrade():
+    for name, table, columns in REDUNDANT_INDEXES:
+        op.create_index(name, table, columns, unique=False)
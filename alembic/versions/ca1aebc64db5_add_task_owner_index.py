@@ -0,0 +1,70 @@
+"""add task owner index
+
+Revision ID: ca1aebc64db5
+Revises: 3b14f8ae6b27
+Create Date: 2026-10-18 16:55:02.118734
+
+"""
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = "ca1aebc64db5"
+down_revision = "3b14f8ae6b27"
+branch_labels = None
+depends_on = None
+
+# Names the unnamed foreign key of the first revision, so the batch mode
+# can drop it on SQLite.
+NAMING_CONVENTION = {
+    "fk": "fk_%(table_name)s_%(column_0_name)s_%(referred_table_name)s"
+}
+
+
+def upgrade():
+    op.create_index(
+        "ix_task_owner_id_is_done_id",
+        "task",
+        ["owner_id", "is_done", "id"],
+        unique=False,
+    )
+    if op.get_bind().dialect.name == "postgresql":
+        op.drop_constraint("task_owner_id_fkey", "task", type_="foreignkey")
+        op.create_foreign_key(
+            "task_owner_id_fkey",
+            "task",
+            "user",
+            ["owner_id"],
+            ["id"],
+            ondelete="CASCADE",
+        )
+    else:
+        # SQLite can't alter constraints, the batch mode copies the table
+        # with the new foreign key.
+        with op.batch_alter_table(
+            "task", naming_convention=NAMING_CONVENTION
+        ) as batch_op:
+            batch_op.drop_constraint(
+                "fk_task_owner_id_user", type_="foreignkey"
+            )
+            batch_op.create_foreign_key(
+                "task_owner_id_fkey",
+                "user",
+                ["owner_id"],
+                ["id"],
+                ondelete="CASCADE",
+            )
+
+
+def downgrade():
+    if op.get_bind().dialect.name == "postgresql":
+        op.drop_constraint("task_owner_id_fkey", "task", type_="foreignkey")
+        op.create_foreign_key(
+            "task_owner_id_fkey", "task", "user", ["owner_id"], ["id"]
+        )
+    else:
+        with op.batch_alter_table("task") as batch_op:
+            batch_op.drop_constraint("task_owner_id_fkey", type_="foreignkey")
+            batch_op.create_foreign_key(
+                "fk_task_owner_id_user", "user", ["owner_id"], ["id"]
+            )
+    op.drop_index("ix_task_owner_id_is_done_id", table_name="task")
@@ -0,0 +1,36 @@
+"""user email lower index
+
+Revision ID: e93b7d2f5a16
+Revises: c4e8a1f0b9d2
+Create Date: 2026-10-18 22:31:06.174829
+
+"""
+import sqlalchemy as sa
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = "e93b7d2f5a16"
+down_revision = "c4e8a1f0b9d2"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # Fails if two users have the same email in different cases, they must
+    # be merged by hand first.
+    op.create_index(
+        "ix_user_email_lower", "user", [sa.text("lower(email)")], unique=True
+    )
+    user = sa.table("user", sa.column("email", sa.String))
+    op.execute(
+        user.update()
+        .where(user.c.email != sa.func.lower(user.c.email))
+        .values(email=sa.func.lower(user.c.email))
+    )
+    op.drop_index("ix_user_email", table_name="user")
+
+
+def downgrade():
+    op.create_index("ix_user_email", "user", ["email"], unique=True)
+    op.drop_index("ix_user_email_lower", table_name="user")
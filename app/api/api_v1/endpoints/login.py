@@ -1,4 +1,5 @@
 from datetime import timedelta
+from typing import Dict
 
 from fastapi import APIRouter, Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordRequestForm
@@ -19,7 +20,10 @@ router = APIRouter()
     responses={
         400: {"model": schemas.HTTPError},
         401: {"model": schemas.HTTPError},
+        429: {"model": schemas.HTTPError},
+        503: {"model": schemas.HTTPError},
     },
+    dependencies=[Depends(deps.limit_login_attempts)],
 )
 async def login_access_token(
     db: AsyncSession = Depends(deps.get_db),
@@ -37,13 +41,76 @@ async def login_access_token(
             status_code=status.HTTP_400_BAD_REQUEST, detail="Inactive user"
         )
 
+    await deps.mark_recent_writer(user.id)
+    return create_tokens(user)
+
+
+@router.post(
+    "/refresh",
+    response_model=schemas.Token,
+    responses={
+        400: {"model": schemas.HTTPError},
+        403: {"model": schemas.HTTPError},
+        404: {"model": schemas.HTTPError},
+    },
+)
+async def login_refresh_token(
+    refresh_in: schemas.RefreshTokenRequest,
+    db: AsyncSession = Depends(deps.get_db),
+):
+    """
+    Exchanges a refresh token for a new access token and a new refresh
+    token, without checking the password again. Each refresh token can be
+    used only once.
+    """
+    payload = deps.decode_token(refresh_in.refresh_token)
+    if payload.get("type") != security.REFRESH_TOKEN_TYPE:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Could not validade credentials",
+        )
+    # Checked and revoked in one step before looking the user up, so two
+    # concurrent requests reusing the token can't both pass.
+    if not await security.refresh_revocations.revoke(
+        payload["jti"], payload["exp"]
+    ):
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="The token has been revoked",
+        )
+    user = await crud.user.get_principal(db, id=int(payload["sub"]))
+    if not user:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND, detail="User not found"
+        )
+    # Updating the user (e.g. its password) revokes its refresh tokens.
+    if payload.get("ver", 0) < user.token_version:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="The token has been revoked",
+        )
+    if not user.is_active:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST, detail="Inactive user"
+        )
+    return create_tokens(user)
+
+
+def create_tokens(user: schemas.UserPrincipal) -> Dict[str, str]:
     access_token_expires = timedelta(
         minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES
     )
+    claims = None
+    if settings.STATELESS_AUTH:
+        claims = deps.get_token_claims(user)
     access_token = security.create_jwt_token(
-        subject=user.id, expires_delta=access_token_expires
+        subject=user.id, expires_delta=access_token_expires, claims=claims
+    )
+    refresh_token = security.create_refresh_token(
+        subject=user.id, claims={"ver": user.token_version}
     )
     return {
         "access_token": access_token,
         "token_type": "bearer",
+        "refresh_token": refresh_token,
     }
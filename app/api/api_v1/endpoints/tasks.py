@@ -0,0 +1,240 @@
+from typing import Any, List, Optional
+
+from fastapi import (
+    APIRouter,
+    Depends,
+    HTTPException,
+    Query,
+    Response,
+    status,
+)
+from fastapi.responses import ORJSONResponse
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app import crud, schemas
+from app.api import deps
+from app.core.pagination import decode_cursor, encode_cursor
+
+router = APIRouter()
+
+
+@router.get(
+    "/",
+    response_model=schemas.Page[schemas.Task],
+    status_code=status.HTTP_200_OK,
+    responses=deps.GET_TOKEN_ACTIVE_USER_RESPONSES
+    | {400: {"model": schemas.HTTPError}},
+)
+async def list_tasks(
+    cursor: Optional[str] = None,
+    limit: int = Query(default=100, ge=1, le=1000),
+    token_user: schemas.UserPrincipal = Depends(deps.get_token_active_user),
+    db: AsyncSession = Depends(deps.get_db),
+) -> Any:
+    """
+    List your own tasks, the not done ones first. Use the returned
+    `next_cursor` as `cursor` to get the next page.
+    """
+    after = None
+    if cursor:
+        after = decode_cursor(cursor, [bool, int])
+    tasks = await crud.task.get_multi_public_by_owner(
+        db=db, owner_id=token_user.id, limit=limit + 1, after=after
+    )
+    next_cursor = None
+    if len(tasks) > limit:
+        tasks = tasks[:limit]
+        next_cursor = encode_cursor([tasks[-1]["is_done"], tasks[-1]["id"]])
+    # The rows already hold just the schemas.Task fields, so they are
+    # returned as they are instead of being validated again.
+    return ORJSONResponse({"items": tasks, "next_cursor": next_cursor})
+
+
+# Declared before /{task_id}, otherwise "search" would be taken as an id.
+@router.get(
+    "/search",
+    response_model=List[schemas.Task],
+    status_code=status.HTTP_200_OK,
+    responses=deps.GET_TOKEN_ACTIVE_USER_RESPONSES,
+)
+async def search_tasks(
+    q: str = Query(min_length=1, max_length=200),
+    limit: int = Query(default=100, ge=1, le=1000),
+    token_user: schemas.UserPrincipal = Depends(deps.get_token_active_user),
+    db: AsyncSession = Depends(deps.get_db),
+) -> Any:
+    """
+    Search your own tasks by the words of their title and description, the
+    most relevant first.
+    """
+    tasks = await crud.task.search_public_by_owner(
+        db=db, owner_id=token_user.id, q=q, limit=limit
+    )
+    return ORJSONResponse(tasks)
+
+
+@router.post(
+    "/",
+    response_model=schemas.Task,
+    status_code=status.HTTP_201_CREATED,
+    responses=deps.GET_TOKEN_ACTIVE_USER_RESPONSES,
+)
+async def create_task(
+    task_in: schemas.TaskCreate,
+    token_user: schemas.UserPrincipal = Depends(deps.get_token_active_user),
+    db: AsyncSession = Depends(deps.get_db),
+) -> Any:
+    task = await crud.task.create(
+        db=db, owner_id=token_user.id, task_in=task_in
+    )
+    return task
+
+
+@router.post(
+    "/bulk",
+    response_model=schemas.TaskBulkResult,
+    status_code=status.HTTP_201_CREATED,
+    responses=deps.GET_TOKEN_ACTIVE_USER_RESPONSES,
+)
+async def create_tasks_bulk(
+    tasks_in: schemas.TaskBulkCreate,
+    token_user: schemas.UserPrincipal = Depends(deps.get_token_active_user),
+    db: AsyncSession = Depends(deps.get_db),
+) -> Any:
+    """
+    Create many tasks at once, in a single transaction.
+    """
+    tasks = await crud.task.create_multi(
+        db=db, owner_id=token_user.id, tasks_in=tasks_in.items
+    )
+    return {
+        "items": [
+            {"id": task.id, "status": "created", "task": task}
+            for task in tasks
+        ]
+    }
+
+
+@router.patch(
+    "/bulk",
+    response_model=schemas.TaskBulkResult,
+    status_code=status.HTTP_200_OK,
+    responses=deps.GET_TOKEN_ACTIVE_USER_RESPONSES,
+)
+async def update_tasks_bulk(
+    tasks_in: schemas.TaskBulkUpdate,
+    token_user: schemas.UserPrincipal = Depends(deps.get_token_active_user),
+    db: AsyncSession = Depends(deps.get_db),
+) -> Any:
+    """
+    Update many tasks at once, in a single transaction. The items whose task
+    is not found are reported as `not_found`.
+    """
+    tasks = await crud.task.update_multi(
+        db=db, owner_id=token_user.id, tasks_in=tasks_in.items
+    )
+    updated_tasks = {task.id: task for task in tasks}
+    return {
+        "items": [
+            (
+                {
+                    "id": item.id,
+                    "status": "updated",
+                    "task": updated_tasks[item.id],
+                }
+                if item.id in updated_tasks
+                else {"id": item.id, "status": "not_found"}
+            )
+            for item in tasks_in.items
+        ]
+    }
+
+
+@router.delete(
+    "/bulk",
+    response_model=schemas.TaskBulkResult,
+    status_code=status.HTTP_200_OK,
+    responses=deps.GET_TOKEN_ACTIVE_USER_RESPONSES,
+)
+async def delete_tasks_bulk(
+    tasks_in: schemas.TaskBulkDelete,
+    token_user: schemas.UserPrincipal = Depends(deps.get_token_active_user),
+    db: AsyncSession = Depends(deps.get_db),
+) -> Any:
+    """
+    Delete many tasks at once, in a single transaction. The ids whose task
+    is not found are reported as `not_found`.
+    """
+    deleted_ids = set(
+        await crud.task.delete_multi(
+            db=db, owner_id=token_user.id, ids=tasks_in.ids
+        )
+    )
+    return {
+        "items": [
+            {
+                "id": id,
+                "status": "deleted" if id in deleted_ids else "not_found",
+            }
+            for id in tasks_in.ids
+        ]
+    }
+
+
+@router.get(
+    "/{task_id}",
+    response_model=schemas.Task,
+    status_code=status.HTTP_200_OK,
+    responses=deps.GET_TOKEN_ACTIVE_USER_RESPONSES,
+)
+async def get_task_by_id(
+    task_id: int,
+    token_user: schemas.UserPrincipal = Depends(deps.get_token_active_user),
+    db: AsyncSession = Depends(deps.get_db),
+) -> Any:
+    task = await crud.task.get_by_id(db=db, owner_id=token_user.id, id=task_id)
+    if not task:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND, detail="Task not found"
+        )
+    return task
+
+
+@router.put(
+    "/{task_id}",
+    response_model=schemas.Task,
+    status_code=status.HTTP_200_OK,
+    responses=deps.GET_TOKEN_ACTIVE_USER_RESPONSES,
+)
+async def update_task_by_id(
+    task_id: int,
+    task_in: schemas.TaskUpdate,
+    token_user: schemas.UserPrincipal = Depends(deps.get_token_active_user),
+    db: AsyncSession = Depends(deps.get_db),
+) -> Any:
+    task = await crud.task.get_by_id(db=db, owner_id=token_user.id, id=task_id)
+    if not task:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND, detail="Task not found"
+        )
+    updated_task = await crud.task.update(db=db, db_task=task, task_in=task_in)
+    return updated_task
+
+
+@router.delete(
+    "/{task_id}",
+    status_code=status.HTTP_204_NO_CONTENT,
+    response_class=Response,
+    responses=deps.GET_TOKEN_ACTIVE_USER_RESPONSES,
+)
+async def delete_task_by_id(
+    task_id: int,
+    token_user: schemas.UserPrincipal = Depends(deps.get_token_active_user),
+    db: AsyncSession = Depends(deps.get_db),
+) -> None:
+    task = await crud.task.get_by_id(db=db, owner_id=token_user.id, id=task_id)
+    if not task:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND, detail="Task not found"
+        )
+    await crud.task.delete(db=db, db_task=task)
@@ -1,33 +1,113 @@
-from typing import Any
+from typing import Any, Optional
 
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import (
+    APIRouter,
+    BackgroundTasks,
+    Depends,
+    HTTPException,
+    Query,
+    status,
+)
+from fastapi.responses import ORJSONResponse
+from sqlalchemy.exc import IntegrityError
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from app import crud, models, schemas
+from app import crud, schemas
 from app.api import deps
+from app.core import jobs, security
+from app.core.pagination import decode_cursor, encode_cursor
 
 router = APIRouter()
 
+UPDATE_USER_RESPONSES = deps.GET_TOKEN_ACTIVE_USER_RESPONSES | {
+    400: {"model": schemas.HTTPError}
+}
+
+
+async def update_user(
+    db: AsyncSession,
+    db_user: schemas.UserPrincipal,
+    user_in: schemas.UserUpdatePUT,
+) -> Any:
+    """crud.user.update answering 400 when the new email is already used."""
+    try:
+        return await crud.user.update(db=db, db_user=db_user, user_in=user_in)
+    except IntegrityError:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Already exists an user with this email.",
+        )
+
 
 @router.post(
     "/",
     response_model=schemas.User,
     status_code=status.HTTP_201_CREATED,
-    responses={400: {"model": schemas.HTTPError}},
+    responses={
+        400: {"model": schemas.HTTPError},
+        503: {"model": schemas.HTTPError},
+    },
 )
 async def create_user(
-    user_in: schemas.UserCreate, db: AsyncSession = Depends(deps.get_db)
+    user_in: schemas.UserCreate,
+    background_tasks: BackgroundTasks,
+    db: AsyncSession = Depends(deps.get_db),
 ) -> Any:
-    user = await crud.user.get_by_email(db=db, email=user_in.email)
-    if user:
+    # The unique index on user.email is the existence check, it saves a
+    # round trip compared to looking the email up first.
+    try:
+        user = await crud.user.create(db=db, user_in=user_in)
+    except IntegrityError:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="Already exists an user with this email.",
         )
-    user = await crud.user.create(db=db, user_in=user_in)
+    await deps.mark_recent_writer(user.id)
+    if not user.is_active:
+        # Enqueued after the response, the signup doesn't wait for it.
+        background_tasks.add_task(
+            jobs.enqueue_verification_email,
+            user.email,
+            user.full_name.partition(" ")[0],
+            security.create_verification_token(user.id),
+        )
     return user
 
 
+@router.get(
+    "/",
+    response_model=schemas.Page[schemas.User],
+    status_code=status.HTTP_200_OK,
+    responses=deps.GET_TOKEN_ACTIVE_SUPERUSER_RESPONSES
+    | {400: {"model": schemas.HTTPError}},
+)
+async def list_users(
+    cursor: Optional[str] = None,
+    limit: int = Query(default=100, ge=1, le=1000),
+    token_user: schemas.UserPrincipal = Depends(
+        deps.get_token_active_superuser
+    ),
+    db: AsyncSession = Depends(deps.get_db),
+) -> Any:
+    """
+    List the users ordered by id. Use the returned `next_cursor` as `cursor`
+    to get the next page.
+    """
+    after_id = None
+    if cursor:
+        (after_id,) = decode_cursor(cursor, [int])
+    users = await crud.user.get_multi_public(
+        db=db, limit=limit + 1, after_id=after_id
+    )
+    next_cursor = None
+    if len(users) > limit:
+        users = users[:limit]
+        next_cursor = encode_cursor([users[-1]["id"]])
+    # The rows already hold just the schemas.User fields, so they are
+    # returned as they are instead of being validated again.
+    return ORJSONResponse({"items": users, "next_cursor": next_cursor})
+
+
 @router.get(
     "/me",
     response_model=schemas.User,
@@ -35,7 +115,7 @@ async def create_user(
     responses=deps.GET_TOKEN_USER_RESPONSES
 )
 async def get_current_user(
-    token_user: models.User = Depends(deps.get_token_user),
+    token_user: schemas.UserPrincipal = Depends(deps.get_token_user),
 ) -> Any:
     return token_user
 
@@ -44,11 +124,11 @@ async def get_current_user(
     "/me",
     response_model=schemas.User,
     status_code=status.HTTP_200_OK,
-    responses=deps.GET_TOKEN_ACTIVE_USER_RESPONSES,
+    responses=UPDATE_USER_RESPONSES,
 )
 async def update_current_user(
     user_in: schemas.UserUpdatePUT,
-    token_user: models.User = Depends(deps.get_token_active_user),
+    token_user: schemas.UserPrincipal = Depends(deps.get_token_active_user),
     db: AsyncSession = Depends(deps.get_db),
 ) -> Any:
     """
@@ -69,7 +149,7 @@ async def update_current_user(
         if user_in.email and user_in.email != token_user.email:
             user_in.is_active = False
 
-    user = await crud.user.update(db=db, db_user=token_user, user_in=user_in)
+    user = await update_user(db=db, db_user=token_user, user_in=user_in)
     return user
 
 @router.delete(
@@ -79,7 +159,7 @@ async def update_current_user(
     responses=deps.GET_TOKEN_ACTIVE_USER_RESPONSES
 )
 async def delete_current_user(
-    token_user: models.User = Depends(deps.get_token_active_user),
+    token_user: schemas.UserPrincipal = Depends(deps.get_token_active_user),
     db: AsyncSession = Depends(deps.get_db)
 ) -> Any:
     await crud.user.delete_by_id(db=db, id=token_user.id)
@@ -93,7 +173,7 @@ async def delete_current_user(
 )
 async def get_user_by_id(
     user_id: int,
-    token_user: models.User = Depends(deps.get_token_active_user),
+    token_user: schemas.UserPrincipal = Depends(deps.get_token_active_user),
     db: AsyncSession = Depends(deps.get_db),
 ) -> Any:
     if token_user.id == user_id:
@@ -105,7 +185,7 @@ async def get_user_by_id(
             detail="The user doesn't have enough privileges",
         )
 
-    user = await crud.user.get_by_id(db=db, id=user_id)
+    user = await crud.user.get_principal(db=db, id=user_id)
     if not user:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -118,12 +198,12 @@ async def get_user_by_id(
     "/{user_id}",
     response_model=schemas.User,
     status_code=status.HTTP_200_OK,
-    responses=deps.GET_TOKEN_ACTIVE_USER_RESPONSES,
+    responses=UPDATE_USER_RESPONSES,
 )
 async def update_user_by_id(
     user_id: int,
     user_in: schemas.UserUpdatePUT,
-    token_user: models.User = Depends(deps.get_token_active_user),
+    token_user: schemas.UserPrincipal = Depends(deps.get_token_active_user),
     db: AsyncSession = Depends(deps.get_db),
 ) -> Any:
     """
@@ -145,7 +225,7 @@ async def update_user_by_id(
             if user_in.email and user_in.email != token_user.email:
                 user_in.is_active = False
 
-        updated_user = await crud.user.update(
+        updated_user = await update_user(
             db=db, db_user=token_user, user_in=user_in
         )
         return updated_user
@@ -156,13 +236,13 @@ async def update_user_by_id(
             detail="The user doesn't have enough privileges",
         )
 
-    db_user = await crud.user.get_by_id(db=db, id=user_id)
+    db_user = await crud.user.get_principal(db=db, id=user_id)
     if not db_user:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="User not found"
         )
-    updated_user = await crud.user.update(
+    updated_user = await update_user(
         db=db, db_user=db_user, user_in=user_in
     )
     return updated_user
@@ -177,7 +257,7 @@ async def update_user_by_id(
 async def delete_user_by_id(
     user_id: int,
     db: AsyncSession = Depends(deps.get_db),
-    token_user: models.User = Depends(deps.get_token_active_user)
+    token_user: schemas.UserPrincipal = Depends(deps.get_token_active_user)
 ):
     if not token_user.is_superuser and token_user.id != user_id:
         raise HTTPException(
@@ -186,5 +266,10 @@ async def delete_user_by_id(
         )
 
     deleted_user = await crud.user.delete_by_id(db=db, id=user_id)
+    if not deleted_user:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="User not found"
+        )
     return deleted_user
 
@@ -1,15 +1,16 @@
-from typing import Any, AsyncGenerator, Dict
+from typing import Any, AsyncGenerator, Dict, Optional
 
 import jwt
-from fastapi import Depends, HTTPException, status
-from fastapi.security import OAuth2PasswordBearer
+from fastapi import Depends, HTTPException, Request, status
+from fastapi.security import OAuth2PasswordBearer, OAuth2PasswordRequestForm
 from pydantic import ValidationError
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from app import crud, models, schemas
+from app import crud, schemas
+from app.core import rate_limit
 from app.core.config import settings
-from app.core.security import decode_jwt_token
-from app.database.session import async_session
+from app.core.security import decode_jwt_token, token_versions
+from app.database.session import session_router
 
 GET_TOKEN_PAYLOAD_RESPONSES = {403: {"model": schemas.HTTPError}}
 GET_TOKEN_USER_RESPONSES = GET_TOKEN_PAYLOAD_RESPONSES | {
@@ -30,12 +31,88 @@ reusable_oauth2 = OAuth2PasswordBearer(
 )
 
 
-async def get_db() -> AsyncGenerator:
-    async with async_session() as db:
+def get_client_key(request: Request) -> Optional[str]:
+    """
+    Subject of the bearer token of the request, if it has a valid one. It
+    only routes the request to a database, the auth dependencies still
+    check the token.
+    """
+    scheme, _, token = request.headers.get("Authorization", "").partition(" ")
+    if scheme.lower() != "bearer" or not token:
+        return None
+    try:
+        return str(decode_jwt_token(token)["sub"])
+    except (jwt.PyJWTError, KeyError):
+        return None
+
+
+async def get_db(request: Request) -> AsyncGenerator:
+    """
+    Session on the replica for the safe methods (unless the same user wrote
+    recently), on the primary otherwise. It only holds a pooled connection
+    while a unit of work is running (see ShortTransactionSession), so the
+    routes not using it and the response serialization hold none.
+    """
+    session_factory = await session_router.session_for(
+        request.method, get_client_key(request)
+    )
+    async with session_factory() as db:
         yield db
 
 
-def get_token_payload(token: str = Depends(reusable_oauth2)) -> Dict[str, Any]:
+async def get_writer_db() -> AsyncGenerator:
+    """
+    Session on the primary whatever the method, for the reads that must not
+    lag behind the last write.
+    """
+    async with session_router.writer() as db:
+        yield db
+
+
+async def mark_recent_writer(user_id: int) -> None:
+    """
+    Sends the reads of the user to the primary for a while, so they see
+    what was just written for them by a request without its token (like
+    the user creation, or the login).
+    """
+    await session_router.mark_writer(str(user_id))
+
+
+async def limit_login_attempts(
+    request: Request, form_data: OAuth2PasswordRequestForm = Depends()
+) -> None:
+    """
+    Rejects the login attempt with 429 when the client IP or the account
+    ran out of attempts, before any password is verified.
+    """
+    ip = request.client.host if request.client else "unknown"
+    for limiter, key in (
+        (rate_limit.login_ip_limiter, ip),
+        (rate_limit.login_account_limiter, form_data.username.lower()),
+    ):
+        retry_after = await limiter.hit(key)
+        if retry_after is not None:
+            raise HTTPException(
+                status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+                detail="Too many login attempts, try again later.",
+                headers={
+                    "Retry-After": rate_limit.retry_after_header(retry_after)
+                },
+            )
+
+
+def get_token_claims(user: schemas.UserPrincipal) -> Dict[str, Any]:
+    """User state embedded in the STATELESS_AUTH tokens."""
+    return {
+        "name": user.full_name,
+        "email": user.email,
+        "is_active": user.is_active,
+        "is_superuser": user.is_superuser,
+        "ver": user.token_version,
+    }
+
+
+def decode_token(token: str) -> Dict[str, Any]:
     try:
         payload = decode_jwt_token(token)
     except jwt.ExpiredSignatureError:
@@ -56,10 +133,22 @@ def get_token_payload(token: str = Depends(reusable_oauth2)) -> Dict[str, Any]:
     return payload
 
 
+def get_token_payload(token: str = Depends(reusable_oauth2)) -> Dict[str, Any]:
+    payload = decode_token(token)
+    if payload.get("type") is not None:
+        # Only the access tokens have no type: the refresh ones are only
+        # accepted by /login/refresh, and the verification ones can't log in.
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Could not validade credentials",
+        )
+    return payload
+
+
 async def get_token_user(
-    db: AsyncSession = Depends(get_db),
+    db: AsyncSession = Depends(get_writer_db),
     payload: Dict[str, Any] = Depends(get_token_payload),
-) -> models.User:
+) -> schemas.UserPrincipal:
     try:
         token_data = schemas.TokenPayload(**payload)
     except ValidationError:
@@ -67,7 +156,40 @@ async def get_token_user(
             status_code=status.HTTP_403_FORBIDDEN,
             detail="Could not validade credentials",
         )
-    user = await crud.user.get_by_id(db, id=int(token_data.sub))
+    if settings.STATELESS_AUTH and token_data.ver is not None:
+        # Trust the token claims, only checking they weren't revoked.
+        user = schemas.UserPrincipal(
+            id=int(token_data.sub),
+            full_name=token_data.name,
+            email=token_data.email,
+            is_active=bool(token_data.is_active),
+            is_superuser=bool(token_data.is_superuser),
+            token_version=token_data.ver,
+        )
+        if (
+            not token_versions.shared
+            and await token_versions.get(user.id) is None
+        ):
+            # This process doesn't see the revocations of the others, the
+            # database has the latest version.
+            user_data = await crud.user.get_fields_by_id(
+                db, id=user.id, fields=["token_version"]
+            )
+            if not user_data:
+                raise HTTPException(
+                    status_code=status.HTTP_404_NOT_FOUND,
+                    detail="User not found",
+                )
+            await token_versions.set(user.id, user_data["token_version"])
+        if await token_versions.is_revoked(user.id, user.token_version):
+            raise HTTPException(
+                status_code=status.HTTP_403_FORBIDDEN,
+                detail="The token has been revoked",
+            )
+        return user
+    # Read from the primary: it fills the user cache, and a lagging replica
+    # could put back the state an update just invalidated (e.g. is_active).
+    user = await crud.user.get_principal(db, id=int(token_data.sub))
     if not user:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND, detail="User not found"
@@ -76,8 +198,8 @@ async def get_token_user(
 
 
 def get_token_active_user(
-    user: models.User = Depends(get_token_user),
-) -> models.User:
+    user: schemas.UserPrincipal = Depends(get_token_user),
+) -> schemas.UserPrincipal:
     if not user.is_active:
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN, detail="Inactive user"
@@ -86,8 +208,8 @@ def get_token_active_user(
 
 
 def get_token_active_superuser(
-    user: models.User = Depends(get_token_active_user),
-) -> models.User:
+    user: schemas.UserPrincipal = Depends(get_token_active_user),
+) -> schemas.UserPrincipal:
     if not user.is_superuser:
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
@@ -0,0 +1,129 @@
+import asyncio
+import time
+from typing import Any, Awaitable, Callable, Dict, Optional, Tuple
+
+from fastapi import APIRouter, status
+from fastapi.responses import JSONResponse
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+from app.core.celery_app import celery_app
+from app.core.config import settings
+from app.database.session import engine, reader_engine
+
+router = APIRouter()
+
+
+async def check_database(engine: AsyncEngine = engine) -> None:
+    async with engine.connect() as connection:
+        await connection.execute(text("SELECT 1"))
+
+
+async def check_replica() -> None:
+    await check_database(reader_engine)
+
+
+def _ping_broker() -> None:
+    with celery_app.connection_for_write(
+        connect_timeout=settings.HEALTH_CHECK_TIMEOUT
+    ) as connection:
+        connection.connect()
+
+
+async def check_broker() -> None:
+    # kombu is synchronous, so the connection is made in a worker thread.
+    await asyncio.to_thread(_ping_broker)
+
+
+class ReadinessProbe:
+    """
+    Runs every check concurrently, each one limited to `timeout` seconds,
+    and reuses the result for `ttl` seconds. Concurrent calls while the
+    checks are running wait for the same result instead of running them
+    again.
+    """
+
+    def __init__(
+        self,
+        checks: Dict[str, Callable[[], Awaitable[None]]],
+        timeout: float,
+        ttl: float,
+    ) -> None:
+        self.checks = checks
+        self.timeout = timeout
+        self.ttl = ttl
+        self._result: Optional[Tuple[float, Dict[str, Any]]] = None
+        self._running: Optional[asyncio.Future] = None
+
+    async def _run_check(self, check: Callable[[], Awaitable[None]]) -> str:
+        try:
+            await asyncio.wait_for(check(), self.timeout)
+        except asyncio.TimeoutError:
+            return "timeout"
+        except Exception:
+            return "error"
+        return "ok"
+
+    async def _run_checks(self) -> Dict[str, Any]:
+        names = list(self.checks)
+        results = await asyncio.gather(
+            *(self._run_check(self.checks[name]) for name in names)
+        )
+        checks = dict(zip(names, results))
+        ready = all(result == "ok" for result in results)
+        return {"status": "ok" if ready else "unavailable", "checks": checks}
+
+    async def _refresh(self) -> Dict[str, Any]:
+        try:
+            result = await self._run_checks()
+            self._result = (time.monotonic() + self.ttl, result)
+            return result
+        finally:
+            self._running = None
+
+    async def status(self) -> Dict[str, Any]:
+        if self._result is not None:
+            expires_at, result = self._result
+            if expires_at > time.monotonic():
+                return result
+        if self._running is None:
+            self._running = asyncio.ensure_future(self._refresh())
+        return await asyncio.shield(self._running)
+
+    def clear(self) -> None:
+        self._result = None
+
+
+def get_readiness_checks() -> Dict[str, Callable[[], Awaitable[None]]]:
+    checks = {"database": check_database}
+    # The asyncio job backend runs the jobs in process, without a broker.
+    if settings.JOB_BACKEND == "celery":
+        checks["broker"] = check_broker
+    if reader_engine is not engine:
+        checks["replica"] = check_replica
+    return checks
+
+
+readiness = ReadinessProbe(
+    checks=get_readiness_checks(),
+    timeout=settings.HEALTH_CHECK_TIMEOUT,
+    ttl=settings.HEALTH_CHECK_CACHE_SECONDS,
+)
+
+
+@router.get(
+    "/ready",
+    responses={
+        status.HTTP_503_SERVICE_UNAVAILABLE: {
+            "description": "Some dependency is not reachable"
+        }
+    },
+)
+async def ready() -> JSONResponse:
+    result = await readiness.status()
+    status_code = (
+        status.HTTP_200_OK
+        if result["status"] == "ok"
+        else status.HTTP_503_SERVICE_UNAVAILABLE
+    )
+    return JSONResponse(status_code=status_code, content=result)
@@ -1,28 +1,11 @@
-import asyncio
-
-from fastapi_mail import FastMail, MessageSchema
-
 from app.core.celery_app import celery_app
 from app.core.config import settings
+from app.core.mail import build_verification_email, mailer_thread
 
 
-@celery_app.task
+@celery_app.task(ignore_result=True)
 def send_verification_email(email_to: str, first_name: str, token: str):
-
-    # TODO: insert link to frontend page resolve it.
-    verification_link = "https://github.com/wlsouza/fastapi-todolist"
-
-    message = MessageSchema(
-        subject="FastAPI-TodoList Email Verification",
-        recipients=[email_to],
-        template_body={
-            "first_name": first_name,
-            "verification_link": verification_link,
-            "token": token,
-        },
-    )
-
-    fm = FastMail(settings.EMAIL_CONNECTION_CONFIG)
-    asyncio.run(
-        fm.send_message(message, template_name="verification_email.html")
-    )
+    email = build_verification_email(email_to, first_name, token)
+    # Batched with the emails queued by the other tasks of this process and
+    # sent over its pooled SMTP connections.
+    mailer_thread.send(email, timeout=settings.MAIL_TIMEOUT)
@@ -0,0 +1,231 @@
+import heapq
+import json
+import math
+import time
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Hashable, List, Optional, Tuple
+
+from app.core.config import settings
+
+
+class LRUCache:
+    """
+    In-process least recently used cache whose entries expire after `ttl`
+    seconds. It is not thread safe, it is meant to be used from the event loop.
+    """
+
+    def __init__(
+        self,
+        maxsize: int,
+        ttl: float,
+        timer: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.timer = timer
+        self._data: "OrderedDict[Hashable, Tuple[float, Any]]" = OrderedDict()
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        item = self._data.get(key)
+        if item is None:
+            return default
+        expires_at, value = item
+        if expires_at <= self.timer():
+            del self._data[key]
+            return default
+        self._data.move_to_end(key)
+        return value
+
+    def set(
+        self, key: Hashable, value: Any, ttl: Optional[float] = None
+    ) -> None:
+        if ttl is None:
+            ttl = self.ttl
+        self._data[key] = (self.timer() + ttl, value)
+        self._data.move_to_end(key)
+        while len(self._data) > self.maxsize:
+            self._data.popitem(last=False)
+
+    def delete(self, key: Hashable) -> None:
+        self._data.pop(key, None)
+
+    def clear(self) -> None:
+        self._data.clear()
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+
+class ExpiringDict:
+    """
+    Mapping whose entries are dropped once their `expires_at` (a `timer`
+    timestamp) is reached, and never before: unlike LRUCache it has no size
+    bound. The keys are also kept in a heap ordered by expiration, so each
+    set purges the expired entries in O(log n) without scanning them all.
+    """
+
+    def __init__(self, timer: Callable[[], float] = time.time) -> None:
+        self.timer = timer
+        self._items: Dict[Hashable, Tuple[float, Any]] = {}
+        self._heap: List[Tuple[float, Hashable]] = []
+
+    def set(self, key: Hashable, value: Any, expires_at: float) -> None:
+        self.purge()
+        if expires_at <= self.timer():
+            return
+        item = self._items.get(key)
+        if item is not None:
+            expires_at = max(expires_at, item[0])
+        self._items[key] = (expires_at, value)
+        heapq.heappush(self._heap, (expires_at, key))
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        item = self._items.get(key)
+        if item is None or item[0] <= self.timer():
+            return default
+        return item[1]
+
+    def purge(self) -> None:
+        now = self.timer()
+        while self._heap and self._heap[0][0] <= now:
+            expires_at, key = heapq.heappop(self._heap)
+            # The key may have been set again with a later expiration.
+            item = self._items.get(key)
+            if item is not None and item[0] <= now:
+                del self._items[key]
+
+    def __contains__(self, key: Hashable) -> bool:
+        item = self._items.get(key)
+        return item is not None and item[0] > self.timer()
+
+    def __len__(self) -> int:
+        self.purge()
+        return len(self._items)
+
+
+class ExpiringSet(ExpiringDict):
+    """ExpiringDict of members, each one kept until its `expires_at`."""
+
+    def add(self, member: Hashable, expires_at: float) -> None:
+        self.set(member, True, expires_at)
+
+
+class CacheBackend(ABC):
+    """Async key-value cache interface shared by all cache backends."""
+
+    @abstractmethod
+    async def get(self, key: str) -> Optional[Any]:
+        """Value of the key, or None if it is not set or expired."""
+
+    @abstractmethod
+    async def set(
+        self, key: str, value: Any, ttl: Optional[float] = None
+    ) -> None:
+        """Sets the key, expiring it after `ttl` (or the default) seconds."""
+
+    @abstractmethod
+    async def add(
+        self, key: str, value: Any, ttl: Optional[float] = None
+    ) -> bool:
+        """
+        Sets the key only if it is not set yet, in a single step. Returns
+        whether it was set.
+        """
+
+    @abstractmethod
+    async def delete(self, key: str) -> None:
+        """Removes the key, if it is set."""
+
+
+class MemoryCacheBackend(CacheBackend):
+    """Keeps the entries in the memory of the current process."""
+
+    def __init__(self, maxsize: int, ttl: float) -> None:
+        self.cache = LRUCache(maxsize=maxsize, ttl=ttl)
+
+    async def get(self, key: str) -> Optional[Any]:
+        return self.cache.get(key)
+
+    async def set(
+        self, key: str, value: Any, ttl: Optional[float] = None
+    ) -> None:
+        self.cache.set(key, value, ttl=ttl)
+
+    async def add(
+        self, key: str, value: Any, ttl: Optional[float] = None
+    ) -> bool:
+        # Nothing else runs on the event loop between the get and the set.
+        if self.cache.get(key) is not None:
+            return False
+        self.cache.set(key, value, ttl=ttl)
+        return True
+
+    async def delete(self, key: str) -> None:
+        self.cache.delete(key)
+
+
+class SharedCacheBackend(CacheBackend):
+    """
+    Keeps the entries JSON encoded in a store shared between processes.
+    The `client` must provide the awaitable `get`, `set(key, value, ex=...,
+    nx=...)` and `delete` methods, like `redis.asyncio.Redis` does.
+    """
+
+    def __init__(self, client: Any, namespace: str, ttl: float) -> None:
+        self.client = client
+        self.namespace = namespace
+        self.ttl = ttl
+
+    def _key(self, key: str) -> str:
+        return f"{self.namespace}:{key}"
+
+    async def get(self, key: str) -> Optional[Any]:
+        raw = await self.client.get(self._key(key))
+        if raw is None:
+            return None
+        return json.loads(raw)
+
+    async def set(
+        self, key: str, value: Any, ttl: Optional[float] = None
+    ) -> None:
+        if ttl is None:
+            ttl = self.ttl
+        await self.client.set(
+            self._key(key), json.dumps(value), ex=max(1, math.ceil(ttl))
+        )
+
+    async def add(
+        self, key: str, value: Any, ttl: Optional[float] = None
+    ) -> bool:
+        if ttl is None:
+            ttl = self.ttl
+        added = await self.client.set(
+            self._key(key),
+            json.dumps(value),
+            ex=max(1, math.ceil(ttl)),
+            nx=True,
+        )
+        return bool(added)
+
+    async def delete(self, key: str) -> None:
+        await self.client.delete(self._key(key))
+
+
+def create_cache_backend(
+    namespace: str, maxsize: int, ttl: float
+) -> CacheBackend:
+    if settings.CACHE_BACKEND == "redis":
+        # redis is an optional dependency, only needed by the shared backend.
+        from redis import asyncio as redis
+
+        client = redis.from_url(settings.CACHE_REDIS_URI)
+        return SharedCacheBackend(client, namespace=namespace, ttl=ttl)
+    return MemoryCacheBackend(maxsize=maxsize, ttl=ttl)
+
+
+user_cache = create_cache_backend(
+    "user",
+    maxsize=settings.USER_CACHE_MAXSIZE,
+    ttl=settings.USER_CACHE_TTL_SECONDS,
+)
@@ -1,5 +1,36 @@
+from typing import Any, Dict
+
 from celery import Celery
+from kombu import Queue
+
+from app.core.config import Settings, settings
+
+
+def get_celery_config(settings: Settings) -> Dict[str, Any]:
+    queues = [settings.CELERY_DEFAULT_QUEUE]
+    for queue in settings.CELERY_TASK_QUEUES.values():
+        if queue not in queues:
+            queues.append(queue)
+    return {
+        "worker_pool": settings.CELERY_WORKER_POOL,
+        "worker_concurrency": settings.CELERY_WORKER_CONCURRENCY,
+        "worker_prefetch_multiplier": settings.CELERY_PREFETCH_MULTIPLIER,
+        "task_acks_late": settings.CELERY_ACKS_LATE,
+        "task_serializer": settings.CELERY_SERIALIZER,
+        # json is still accepted, for the messages of older producers.
+        "accept_content": sorted({settings.CELERY_SERIALIZER, "json"}),
+        "task_compression": settings.CELERY_COMPRESSION,
+        # The tasks are fire-and-forget, nobody reads their results.
+        "task_ignore_result": True,
+        "task_default_queue": settings.CELERY_DEFAULT_QUEUE,
+        # A worker started without -Q consumes every queue.
+        "task_queues": [Queue(queue) for queue in queues],
+        "task_routes": {
+            task: {"queue": queue}
+            for task, queue in settings.CELERY_TASK_QUEUES.items()
+        },
+    }
 
-from app.core.config import settings
 
 celery_app = Celery(broker=settings.BROKER_URI)
+celery_app.conf.update(get_celery_config(settings))
@@ -0,0 +1,139 @@
+import asyncio
+import logging
+from typing import Any, Awaitable, Callable, Dict, List, NamedTuple, Optional
+
+from app.core.config import settings
+from app.core.mail import build_verification_email, send_email
+
+logger = logging.getLogger(__name__)
+
+
+class Job(NamedTuple):
+    func: Callable[..., Awaitable[Any]]
+    args: tuple
+    kwargs: Dict[str, Any]
+
+
+class JobQueue:
+    """
+    In-process background jobs: coroutine functions queued in a bounded
+    asyncio queue and run by `workers` worker coroutines of the current
+    event loop. A failed job is retried up to `max_retries` times, waiting
+    `backoff` seconds before the first retry and doubling it for each next
+    one (up to `max_backoff`).
+
+    The jobs live in the memory of the process, so the ones still queued
+    when it dies are lost. `stop` drains the queue before returning.
+    """
+
+    def __init__(
+        self,
+        maxsize: int = 1000,
+        workers: int = 4,
+        max_retries: int = 3,
+        backoff: float = 1,
+        max_backoff: float = 60,
+    ) -> None:
+        self.maxsize = maxsize
+        self.workers = workers
+        self.max_retries = max_retries
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+        self.processed = 0
+        self.failed = 0
+        self._queue: Optional[asyncio.Queue] = None
+        self._workers: List[asyncio.Task] = []
+
+    @property
+    def running(self) -> bool:
+        return bool(self._workers)
+
+    def start(self) -> None:
+        if not self.running:
+            self._queue = asyncio.Queue(self.maxsize)
+            self._workers = [
+                asyncio.create_task(self._work()) for _ in range(self.workers)
+            ]
+
+    async def enqueue(
+        self, func: Callable[..., Awaitable[Any]], *args: Any, **kwargs: Any
+    ) -> None:
+        """
+        Queues `func(*args, **kwargs)` to run in background. When the queue
+        is full it waits for a free slot, slowing the producers down.
+        """
+        self.start()
+        await self._queue.put(Job(func, args, kwargs))
+
+    async def stop(self, timeout: Optional[float] = None) -> None:
+        """
+        Waits up to `timeout` seconds for the queued jobs (and their
+        retries) to finish, then stops the workers.
+        """
+        if not self.running:
+            return
+        try:
+            await asyncio.wait_for(self._queue.join(), timeout)
+        except asyncio.TimeoutError:
+            logger.warning(
+                "Stopped with %s background jobs left", self._queue.qsize()
+            )
+        for worker in self._workers:
+            worker.cancel()
+        await asyncio.gather(*self._workers, return_exceptions=True)
+        self._workers = []
+
+    def retry_delay(self, attempt: int) -> float:
+        return min(self.max_backoff, self.backoff * 2 ** (attempt - 1))
+
+    async def _work(self) -> None:
+        while True:
+            job = await self._queue.get()
+            try:
+                await self._run(job)
+            finally:
+                self._queue.task_done()
+
+    async def _run(self, job: Job) -> None:
+        attempt = 0
+        while True:
+            try:
+                await job.func(*job.args, **job.kwargs)
+            except Exception:
+                attempt += 1
+                if attempt > self.max_retries:
+                    self.failed += 1
+                    logger.exception(
+                        "Background job %s failed", job.func.__name__
+                    )
+                    return
+                await asyncio.sleep(self.retry_delay(attempt))
+            else:
+                self.processed += 1
+                return
+
+
+job_queue = JobQueue(
+    maxsize=settings.JOB_QUEUE_MAXSIZE,
+    workers=settings.JOB_WORKERS,
+    max_retries=settings.JOB_MAX_RETRIES,
+    backoff=settings.JOB_RETRY_BACKOFF,
+    max_backoff=settings.JOB_RETRY_MAX_BACKOFF,
+)
+
+
+async def enqueue_verification_email(
+    email_to: str, first_name: str, token: str
+) -> None:
+    """Sends the verification email through the JOB_BACKEND job runner."""
+    if settings.JOB_BACKEND == "asyncio":
+        email = build_verification_email(email_to, first_name, token)
+        await job_queue.enqueue(send_email, email)
+    else:
+        # Imported here so the celery tasks are only loaded when used.
+        from app.celery_worker import send_verification_email
+
+        # Publishing to the broker blocks, it must not stall the event loop.
+        await asyncio.to_thread(
+            send_verification_email.delay, email_to, first_name, token
+        )
@@ -0,0 +1,356 @@
+import asyncio
+import os
+import threading
+from collections import deque
+from contextlib import asynccontextmanager
+from email.message import EmailMessage
+from pathlib import Path
+from typing import (
+    Any,
+    AsyncIterator,
+    Deque,
+    Dict,
+    List,
+    NamedTuple,
+    Optional,
+    Tuple,
+    Union,
+)
+
+import aiosmtplib
+from jinja2 import Environment, FileSystemLoader, Template, select_autoescape
+
+from app.core.config import settings
+
+
+class OutgoingEmail(NamedTuple):
+    recipient: str
+    subject: str
+    template_name: str
+    context: Dict[str, Any]
+
+
+class TemplateCache:
+    """
+    Compiles each email template once and keeps it, so the messages are
+    rendered without touching the filesystem again.
+    """
+
+    def __init__(self, directory: Union[Path, str]) -> None:
+        self.environment = Environment(
+            loader=FileSystemLoader(str(directory)),
+            autoescape=select_autoescape(["html", "xml"]),
+            auto_reload=False,
+        )
+        self._templates: Dict[str, Template] = {}
+
+    def get(self, name: str) -> Template:
+        template = self._templates.get(name)
+        if template is None:
+            template = self.environment.get_template(name)
+            self._templates[name] = template
+        return template
+
+    def render(self, name: str, context: Dict[str, Any]) -> str:
+        return self.get(name).render(**context)
+
+
+class SMTPConnectionPool:
+    """
+    Keeps up to `size` SMTP connections open between messages. A connection
+    dropped by the server is reopened the next time it is acquired.
+    """
+
+    def __init__(
+        self,
+        hostname: str,
+        port: int,
+        username: Optional[str] = None,
+        password: Optional[str] = None,
+        use_tls: bool = False,
+        start_tls: bool = False,
+        timeout: float = 60,
+        size: int = 2,
+    ) -> None:
+        self.hostname = hostname
+        self.port = port
+        self.username = username
+        self.password = password
+        self.use_tls = use_tls
+        self.start_tls = start_tls
+        self.timeout = timeout
+        self.size = size
+        self.connects = 0
+        self._idle: Deque[aiosmtplib.SMTP] = deque()
+        self._semaphore: Optional[asyncio.Semaphore] = None
+
+    @property
+    def semaphore(self) -> asyncio.Semaphore:
+        # Created lazily so it binds to the loop that uses the pool.
+        if self._semaphore is None:
+            self._semaphore = asyncio.Semaphore(self.size)
+        return self._semaphore
+
+    async def _connect(self) -> aiosmtplib.SMTP:
+        smtp = aiosmtplib.SMTP(
+            hostname=self.hostname,
+            port=self.port,
+            use_tls=self.use_tls,
+            start_tls=self.start_tls,
+            timeout=self.timeout,
+        )
+        await smtp.connect()
+        if self.username and self.password:
+            await smtp.login(self.username, self.password)
+        self.connects += 1
+        return smtp
+
+    @asynccontextmanager
+    async def connection(self) -> AsyncIterator[aiosmtplib.SMTP]:
+        async with self.semaphore:
+            smtp = self._idle.popleft() if self._idle else None
+            if smtp is None or not smtp.is_connected:
+                smtp = await self._connect()
+            try:
+                yield smtp
+            finally:
+                if smtp.is_connected:
+                    self._idle.append(smtp)
+
+    async def close(self) -> None:
+        while self._idle:
+            smtp = self._idle.popleft()
+            if smtp.is_connected:
+                try:
+                    await smtp.quit()
+                except aiosmtplib.SMTPException:
+                    smtp.close()
+
+
+class BatchMailer:
+    """
+    Gathers the queued emails for up to `batch_window` seconds (or until
+    `batch_size` of them are waiting), renders them from the template cache
+    and sends the batch over the pooled SMTP connections. It only waits
+    while more emails are arriving: a lone email, like the one of each
+    Celery task, is sent right away.
+    """
+
+    def __init__(
+        self,
+        pool: SMTPConnectionPool,
+        templates: TemplateCache,
+        sender: str,
+        batch_size: int = 50,
+        batch_window: float = 0.1,
+    ) -> None:
+        self.pool = pool
+        self.templates = templates
+        self.sender = sender
+        self.batch_size = batch_size
+        self.batch_window = batch_window
+        self.sent = 0
+        self._queue: Optional[asyncio.Queue] = None
+        self._worker: Optional[asyncio.Task] = None
+
+    def start(self) -> None:
+        if self._worker is None:
+            self._queue = asyncio.Queue()
+            self._worker = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        """Sends what is still queued, then closes the SMTP connections."""
+        if self._worker is not None:
+            await self._queue.put(None)
+            await self._worker
+            self._worker = None
+        await self.pool.close()
+
+    async def send(self, email: OutgoingEmail) -> None:
+        """Queues the email and waits until the SMTP server accepted it."""
+        self.start()
+        future = asyncio.get_running_loop().create_future()
+        await self._queue.put((email, future))
+        await future
+
+    def build_message(self, email: OutgoingEmail) -> EmailMessage:
+        message = EmailMessage()
+        message["From"] = self.sender
+        message["To"] = email.recipient
+        message["Subject"] = email.subject
+        message.set_content(
+            self.templates.render(email.template_name, email.context),
+            subtype="html",
+        )
+        return message
+
+    async def _next_batch(self) -> Tuple[List[Any], bool]:
+        batch = [await self._queue.get()]
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + self.batch_window
+        while batch[-1] is not None and len(batch) < self.batch_size:
+            if not self._queue.empty():
+                batch.append(self._queue.get_nowait())
+                continue
+            timeout = deadline - loop.time()
+            if len(batch) == 1 or timeout <= 0:
+                # Nothing else is arriving, don't hold a lone email back.
+                break
+            try:
+                batch.append(
+                    await asyncio.wait_for(self._queue.get(), timeout)
+                )
+            except asyncio.TimeoutError:
+                break
+        stopping = batch[-1] is None
+        if stopping:
+            batch.pop()
+            while not self._queue.empty():
+                batch.append(self._queue.get_nowait())
+        return batch, stopping
+
+    async def _run(self) -> None:
+        stopping = False
+        while not stopping:
+            batch, stopping = await self._next_batch()
+            jobs = deque(job for job in batch if job is not None)
+            if jobs:
+                senders = min(self.pool.size, len(jobs))
+                await asyncio.gather(
+                    *(self._deliver(jobs) for _ in range(senders))
+                )
+
+    async def _deliver(self, jobs: Deque[Tuple[OutgoingEmail, Any]]) -> None:
+        while jobs:
+            try:
+                async with self.pool.connection() as smtp:
+                    while jobs and smtp.is_connected:
+                        email, future = jobs.popleft()
+                        try:
+                            await smtp.send_message(self.build_message(email))
+                        except Exception as exc:
+                            _set_exception(future, exc)
+                        else:
+                            self.sent += 1
+                            if not future.done():
+                                future.set_result(None)
+            except Exception as exc:
+                # Could not connect, fail what is left of the batch.
+                while jobs:
+                    _set_exception(jobs.popleft()[1], exc)
+
+
+def _set_exception(future: asyncio.Future, exc: Exception) -> None:
+    if not future.done():
+        future.set_exception(exc)
+
+
+class MailerThread:
+    """
+    Runs a BatchMailer in an event loop living in a background thread of the
+    current process, so synchronous code (like the Celery tasks) can share
+    its SMTP connections and batches. The thread is started on first use and
+    restarted after a fork.
+    """
+
+    def __init__(self, mailer_factory: Any) -> None:
+        self.mailer_factory = mailer_factory
+        self.mailer: Optional[BatchMailer] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._thread: Optional[threading.Thread] = None
+        self._pid: Optional[int] = None
+        self._lock = threading.Lock()
+
+    def _ensure_started(self) -> asyncio.AbstractEventLoop:
+        with self._lock:
+            if self._loop is None or self._pid != os.getpid():
+                self._pid = os.getpid()
+                self._loop = asyncio.new_event_loop()
+                self.mailer = self.mailer_factory()
+                self._thread = threading.Thread(
+                    target=self._loop.run_forever,
+                    name="batch-mailer",
+                    daemon=True,
+                )
+                self._thread.start()
+            return self._loop
+
+    def send(
+        self, email: OutgoingEmail, timeout: Optional[float] = None
+    ) -> None:
+        loop = self._ensure_started()
+        future = asyncio.run_coroutine_threadsafe(
+            self.mailer.send(email), loop
+        )
+        future.result(timeout)
+
+    def stop(self, timeout: Optional[float] = None) -> None:
+        with self._lock:
+            if self._loop is None or self._pid != os.getpid():
+                return
+            asyncio.run_coroutine_threadsafe(
+                self.mailer.stop(), self._loop
+            ).result(timeout)
+            self._loop.call_soon_threadsafe(self._loop.stop)
+            self._thread.join(timeout)
+            self._loop.close()
+            self._loop = None
+
+
+def build_verification_email(
+    email_to: str, first_name: str, token: str
+) -> OutgoingEmail:
+    # TODO: insert link to frontend page resolve it.
+    verification_link = "https://github.com/wlsouza/fastapi-todolist"
+
+    return OutgoingEmail(
+        recipient=email_to,
+        subject="FastAPI-TodoList Email Verification",
+        template_name="verification_email.html",
+        context={
+            "first_name": first_name,
+            "verification_link": verification_link,
+            "token": token,
+        },
+    )
+
+
+def create_mailer() -> BatchMailer:
+    pool = SMTPConnectionPool(
+        hostname=settings.MAIL_SERVER,
+        port=settings.MAIL_PORT,
+        username=settings.MAIL_USERNAME,
+        password=settings.MAIL_PASSWORD,
+        use_tls=bool(settings.MAIL_SSL),
+        start_tls=bool(settings.MAIL_TLS),
+        timeout=settings.MAIL_TIMEOUT,
+        size=settings.MAIL_POOL_SIZE,
+    )
+    return BatchMailer(
+        pool,
+        TemplateCache(settings.EMAIL_TEMPLATES_DIR),
+        sender=settings.MAIL_FROM,
+        batch_size=settings.MAIL_BATCH_SIZE,
+        batch_window=settings.MAIL_BATCH_WINDOW,
+    )
+
+
+mailer_thread = MailerThread(create_mailer)
+
+
+# Mailer of the running event loop, used by the in-process background jobs.
+_loop_mailer: Optional[BatchMailer] = None
+
+
+async def send_email(email: OutgoingEmail) -> None:
+    global _loop_mailer
+    if _loop_mailer is None:
+        _loop_mailer = create_mailer()
+    await _loop_mailer.send(email)
+
+
+async def close_loop_mailer() -> None:
+    global _loop_mailer
+    if _loop_mailer is not None:
+        await _loop_mailer.stop()
+        _loop_mailer = None
@@ -0,0 +1,221 @@
+import time
+from contextvars import ContextVar
+from typing import Any, Awaitable, Callable, Dict, Iterator, Optional
+
+from prometheus_client import (
+    CollectorRegistry,
+    Counter,
+    Gauge,
+    Histogram,
+    ProcessCollector,
+)
+from prometheus_client.core import CounterMetricFamily, GaugeMetricFamily
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncEngine
+from starlette.routing import Match
+
+from app.core.security import token_cache
+from app.database.session import get_pool_status
+
+registry = CollectorRegistry()
+ProcessCollector(registry=registry)
+
+REQUEST_DURATION = Histogram(
+    "http_request_duration_seconds",
+    "Time spent answering the request.",
+    ["method", "route", "status"],
+    registry=registry,
+)
+REQUESTS_IN_PROGRESS = Gauge(
+    "http_requests_in_progress",
+    "Requests currently being answered.",
+    ["method", "route"],
+    registry=registry,
+)
+REQUEST_DB_STATEMENTS = Histogram(
+    "http_request_db_statements",
+    "SQL statements executed while answering the request.",
+    ["method", "route"],
+    buckets=(0, 1, 2, 3, 5, 10, 20, 50, 100),
+    registry=registry,
+)
+REQUEST_DB_DURATION = Histogram(
+    "http_request_db_duration_seconds",
+    "Time spent executing SQL statements while answering the request.",
+    ["method", "route"],
+    registry=registry,
+)
+DB_STATEMENTS = Counter(
+    "db_statements",
+    "SQL statements executed, inside or outside of a request.",
+    registry=registry,
+)
+
+UNMATCHED_ROUTE = "<unmatched>"
+
+
+class RequestDBStats:
+    def __init__(self) -> None:
+        self.statements = 0
+        self.seconds = 0.0
+
+
+# Stats of the request being answered in the current context, if any.
+request_db_stats: ContextVar[Optional[RequestDBStats]] = ContextVar(
+    "request_db_stats", default=None
+)
+
+
+def _before_cursor_execute(
+    conn: Any, cursor: Any, statement: str, parameters: Any, context: Any, *_
+) -> None:
+    context._metrics_query_start = time.perf_counter()
+
+
+def _after_cursor_execute(
+    conn: Any, cursor: Any, statement: str, parameters: Any, context: Any, *_
+) -> None:
+    elapsed = time.perf_counter() - context._metrics_query_start
+    DB_STATEMENTS.inc()
+    stats = request_db_stats.get()
+    if stats is not None:
+        stats.statements += 1
+        stats.seconds += elapsed
+
+
+class PoolCollector:
+    """Exports the connection pool status of `engine` on each scrape."""
+
+    def __init__(self, engine: AsyncEngine) -> None:
+        self.engine = engine
+
+    def collect(self) -> Iterator[Any]:
+        status = get_pool_status(self.engine)
+        for name in ("size", "checked_in", "checked_out", "overflow"):
+            yield GaugeMetricFamily(
+                f"db_pool_{name}",
+                f"Connection pool {name.replace('_', ' ')}.",
+                value=status[name],
+            )
+        if "checkouts" in status:
+            yield CounterMetricFamily(
+                "db_pool_checkouts",
+                "Connections handed out by the pool.",
+                value=status["checkouts"],
+            )
+            yield CounterMetricFamily(
+                "db_pool_timeouts",
+                "Checkouts that timed out waiting for a connection.",
+                value=status["timeouts"],
+            )
+            yield CounterMetricFamily(
+                "db_pool_wait_seconds",
+                "Time spent waiting for a free connection.",
+                value=status["wait_seconds_total"],
+            )
+
+
+class TokenCacheCollector:
+    """Exports the hit and miss counters of a TokenCache on each scrape."""
+
+    def __init__(self, cache: Any) -> None:
+        self.cache = cache
+
+    def collect(self) -> Iterator[Any]:
+        info = self.cache.info()
+        yield CounterMetricFamily(
+            "token_cache_hits",
+            "Tokens whose verified payload was found in the cache.",
+            value=info["hits"],
+        )
+        yield CounterMetricFamily(
+            "token_cache_misses",
+            "Tokens that had to be verified again.",
+            value=info["misses"],
+        )
+        yield GaugeMetricFamily(
+            "token_cache_size",
+            "Verified token payloads in the cache.",
+            value=info["size"],
+        )
+
+
+registry.register(TokenCacheCollector(token_cache))
+
+
+def instrument_engine(engine: AsyncEngine, collect_pool: bool = True) -> None:
+    """
+    Counts the statements of `engine`. Only one engine can export its pool
+    status, the metric names have no engine label.
+    """
+    sync_engine = engine.sync_engine
+    if not event.contains(
+        sync_engine, "before_cursor_execute", _before_cursor_execute
+    ):
+        event.listen(
+            sync_engine, "before_cursor_execute", _before_cursor_execute
+        )
+        event.listen(
+            sync_engine, "after_cursor_execute", _after_cursor_execute
+        )
+        if collect_pool:
+            registry.register(PoolCollector(engine))
+
+
+def get_route_name(scope: Dict[str, Any]) -> str:
+    """
+    Path template of the route that will answer the request, so the labels
+    don't grow with every id requested.
+    """
+    app = scope.get("app")
+    partial = None
+    for route in getattr(app, "routes", ()):
+        match, _ = route.matches(scope)
+        if match == Match.FULL:
+            return route.path
+        if match == Match.PARTIAL and partial is None:
+            partial = route.path
+    return partial or UNMATCHED_ROUTE
+
+
+class MetricsMiddleware:
+    """
+    ASGI middleware recording the latency, in progress requests and the SQL
+    statements executed (count and time) by each route.
+    """
+
+    def __init__(self, app: Callable[..., Awaitable[None]]) -> None:
+        self.app = app
+
+    async def __call__(self, scope, receive, send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        method = scope["method"]
+        route = get_route_name(scope)
+        status_code = 500
+
+        async def send_with_status(message: Dict[str, Any]) -> None:
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+
+        stats = RequestDBStats()
+        token = request_db_stats.set(stats)
+        in_progress = REQUESTS_IN_PROGRESS.labels(method, route)
+        in_progress.inc()
+        start = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            REQUEST_DURATION.labels(method, route, str(status_code)).observe(
+                time.perf_counter() - start
+            )
+            REQUEST_DB_STATEMENTS.labels(method, route).observe(
+                stats.statements
+            )
+            REQUEST_DB_DURATION.labels(method, route).observe(stats.seconds)
+            in_progress.dec()
+            request_db_stats.reset(token)
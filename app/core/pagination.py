@@ -0,0 +1,35 @@
+import base64
+import binascii
+import json
+from typing import Any, List, Sequence
+
+
+class InvalidCursor(ValueError):
+    pass
+
+
+def encode_cursor(values: Sequence[Any]) -> str:
+    """
+    Encodes the sort key values of the last returned row in an opaque,
+    url safe cursor.
+    """
+    raw = json.dumps(list(values), separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str, types: Sequence[type]) -> List[Any]:
+    """
+    Decodes a cursor made by encode_cursor, checking that it has one value
+    for each of the expected `types`.
+    """
+    padding = "=" * (-len(cursor) % 4)
+    try:
+        values = json.loads(base64.urlsafe_b64decode(cursor + padding))
+    except (binascii.Error, UnicodeDecodeError, ValueError):
+        raise InvalidCursor(cursor)
+    if not isinstance(values, list) or len(values) != len(types):
+        raise InvalidCursor(cursor)
+    # bool is a subclass of int, so compare the exact types.
+    if any(type(value) is not type_ for value, type_ in zip(values, types)):
+        raise InvalidCursor(cursor)
+    return values
@@ -0,0 +1,80 @@
+import math
+import time
+from typing import Callable, Optional
+
+from app.core.cache import CacheBackend, create_cache_backend
+from app.core.config import settings
+
+
+class RateLimiter:
+    """
+    Token bucket per key: each key starts with `burst` tokens, every hit
+    takes one and they are refilled at `per_minute` tokens per minute.
+
+    The buckets are kept in a cache backend, so they are bounded in memory
+    (a bucket dropped from the cache is a full one) and can be shared
+    between processes. With a shared backend the read and write of a
+    bucket are not atomic, so a burst spread over processes may get a few
+    extra hits through.
+    """
+
+    def __init__(
+        self,
+        backend: CacheBackend,
+        burst: int,
+        per_minute: float,
+        timer: Callable[[], float] = time.time,
+    ) -> None:
+        self.backend = backend
+        self.burst = burst
+        self.rate = per_minute / 60
+        self.timer = timer
+
+    @property
+    def refill_seconds(self) -> float:
+        """Time an empty bucket takes to be full again."""
+        return self.burst / self.rate
+
+    async def hit(self, key: str) -> Optional[float]:
+        """
+        Takes a token from the `key` bucket. Returns None when it was
+        allowed, otherwise the seconds until a token is available.
+        """
+        now = self.timer()
+        bucket = await self.backend.get(key)
+        if bucket is None:
+            tokens = float(self.burst)
+        else:
+            tokens, updated_at = bucket
+            tokens = min(self.burst, tokens + (now - updated_at) * self.rate)
+        if tokens < 1:
+            return (1 - tokens) / self.rate
+        await self.backend.set(key, [tokens - 1, now], ttl=self.refill_seconds)
+        return None
+
+
+def create_rate_limiter(
+    namespace: str, burst: int, per_minute: float
+) -> RateLimiter:
+    backend = create_cache_backend(
+        namespace,
+        maxsize=settings.RATE_LIMIT_MAXSIZE,
+        ttl=burst * 60 / per_minute,
+    )
+    return RateLimiter(backend, burst=burst, per_minute=per_minute)
+
+
+def retry_after_header(seconds: float) -> str:
+    return str(max(1, math.ceil(seconds)))
+
+
+login_ip_limiter = create_rate_limiter(
+    "login_ip",
+    burst=settings.LOGIN_RATE_LIMIT_IP_BURST,
+    per_minute=settings.LOGIN_RATE_LIMIT_IP_PER_MINUTE,
+)
+login_account_limiter = create_rate_limiter(
+    "login_account",
+    burst=settings.LOGIN_RATE_LIMIT_ACCOUNT_BURST,
+    per_minute=settings.LOGIN_RATE_LIMIT_ACCOUNT_PER_MINUTE,
+)
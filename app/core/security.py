@@ -1,12 +1,122 @@
+import asyncio
+import hashlib
+import secrets
+import time
+import uuid
+from concurrent.futures import (
+    Executor,
+    ProcessPoolExecutor,
+    ThreadPoolExecutor,
+)
 from datetime import datetime, timedelta
-from typing import Union
+from typing import Any, Callable, Dict, Optional, Tuple, Union
 
 import jwt
 from passlib.context import CryptContext
 
+from app.core.cache import (
+    CacheBackend,
+    ExpiringDict,
+    ExpiringSet,
+    LRUCache,
+    create_cache_backend,
+)
 from app.core.config import settings
 
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+PASSWORD_HASH_SCHEMES = ("bcrypt", "argon2")
+
+
+def create_pwd_context(
+    scheme: str,
+    bcrypt_rounds: int,
+    argon2_memory_cost: int,
+    argon2_time_cost: int,
+    argon2_parallelism: int,
+) -> CryptContext:
+    """
+    Hashes with `scheme` and the given cost. Hashes of the other schemes or
+    with another cost still verify, but are flagged to be updated.
+    """
+    if scheme not in PASSWORD_HASH_SCHEMES:
+        raise ValueError(f"Unknown password hash scheme: {scheme}")
+    return CryptContext(
+        schemes=[
+            scheme,
+            *(other for other in PASSWORD_HASH_SCHEMES if other != scheme),
+        ],
+        deprecated="auto",
+        bcrypt__rounds=bcrypt_rounds,
+        # bcrypt only flags the hashes out of the rounds range as outdated.
+        bcrypt__min_rounds=bcrypt_rounds,
+        bcrypt__max_rounds=bcrypt_rounds,
+        argon2__memory_cost=argon2_memory_cost,
+        argon2__time_cost=argon2_time_cost,
+        argon2__parallelism=argon2_parallelism,
+    )
+
+
+pwd_context = create_pwd_context(
+    scheme=settings.PASSWORD_HASH_SCHEME,
+    bcrypt_rounds=settings.PASSWORD_BCRYPT_ROUNDS,
+    argon2_memory_cost=settings.PASSWORD_ARGON2_MEMORY_COST,
+    argon2_time_cost=settings.PASSWORD_ARGON2_TIME_COST,
+    argon2_parallelism=settings.PASSWORD_ARGON2_PARALLELISM,
+)
+
+
+class PasswordHasherBusy(Exception):
+    pass
+
+
+class PasswordHasher:
+    """
+    Runs the CPU bound password hashing functions in a bounded executor, so
+    they don't block the event loop. When more than `max_workers` +
+    `max_queue` jobs are pending, PasswordHasherBusy is raised instead of
+    queueing even more work.
+    """
+
+    def __init__(
+        self, max_workers: int, max_queue: int, executor_type: str = "thread"
+    ) -> None:
+        self.max_workers = max_workers
+        self.max_queue = max_queue
+        self.executor_type = executor_type
+        self.pending = 0
+        self._executor: Optional[Executor] = None
+
+    @property
+    def executor(self) -> Executor:
+        if self._executor is None:
+            if self.executor_type == "process":
+                self._executor = ProcessPoolExecutor(self.max_workers)
+            else:
+                self._executor = ThreadPoolExecutor(
+                    self.max_workers, thread_name_prefix="password-hasher"
+                )
+        return self._executor
+
+    async def run(self, func: Callable[..., Any], *args: Any) -> Any:
+        if self.pending >= self.max_workers + self.max_queue:
+            raise PasswordHasherBusy()
+        self.pending += 1
+        try:
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(self.executor, func, *args)
+        finally:
+            self.pending -= 1
+
+    def shutdown(self) -> None:
+        if self._executor is not None:
+            self._executor.shutdown(wait=False)
+            self._executor = None
+
+
+password_hasher = PasswordHasher(
+    max_workers=settings.PASSWORD_HASH_WORKERS,
+    max_queue=settings.PASSWORD_HASH_MAX_QUEUE,
+    executor_type=settings.PASSWORD_HASH_EXECUTOR,
+)
 
 
 def get_password_hash(password: str) -> str:
@@ -17,10 +127,58 @@ def verify_password(raw_password: str, hashed_password: str) -> bool:
     return pwd_context.verify(raw_password, hashed_password)
 
 
+def verify_and_update_password(
+    raw_password: str, hashed_password: str
+) -> Tuple[bool, Optional[str]]:
+    """
+    Verifies the password and, when the hash uses an outdated scheme or
+    cost, also returns a new hash of it to be stored.
+    """
+    return pwd_context.verify_and_update(raw_password, hashed_password)
+
+
+async def get_password_hash_async(password: str) -> str:
+    return await password_hasher.run(get_password_hash, password)
+
+
+async def verify_password_async(
+    raw_password: str, hashed_password: str
+) -> bool:
+    return await password_hasher.run(
+        verify_password, raw_password, hashed_password
+    )
+
+
+async def verify_and_update_password_async(
+    raw_password: str, hashed_password: str
+) -> Tuple[bool, Optional[str]]:
+    return await password_hasher.run(
+        verify_and_update_password, raw_password, hashed_password
+    )
+
+
+_dummy_password_hash: Optional[str] = None
+
+
+async def verify_dummy_password(raw_password: str) -> bool:
+    """
+    Verifies the password against a throwaway hash, so logins of unknown
+    users take as long as the ones of known users.
+    """
+    global _dummy_password_hash
+    if _dummy_password_hash is None:
+        _dummy_password_hash = await get_password_hash_async(
+            secrets.token_urlsafe(16)
+        )
+    await verify_password_async(raw_password, _dummy_password_hash)
+    return False
+
+
 def create_jwt_token(
     subject: Union[str, int],
     starts_delta: timedelta = None,
     expires_delta: timedelta = None,
+    claims: Optional[Dict[str, Any]] = None,
 ) -> str:
     start = datetime.utcnow()
     if starts_delta:
@@ -33,17 +191,214 @@ def create_jwt_token(
             minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES
         )
 
-    payload = {"exp": expire, "nbf": start, "sub": subject}
+    payload = {**(claims or {}), "exp": expire, "nbf": start, "sub": subject}
     encoded_jwt = jwt.encode(
         payload, settings.SECRET_KEY, algorithm=settings.ACCESS_TOKEN_ALGORITHM
     )
     return encoded_jwt
 
 
+REFRESH_TOKEN_TYPE = "refresh"
+
+
+def create_refresh_token(
+    subject: Union[str, int], claims: Optional[Dict[str, Any]] = None
+) -> str:
+    """
+    Long lived token only accepted by /login/refresh. Its `jti` claim
+    identifies it in the refresh token revocation store.
+    """
+    return create_jwt_token(
+        subject=subject,
+        expires_delta=timedelta(minutes=settings.REFRESH_TOKEN_EXPIRE_MINUTES),
+        claims={
+            **(claims or {}),
+            "type": REFRESH_TOKEN_TYPE,
+            "jti": uuid.uuid4().hex,
+        },
+    )
+
+
+VERIFICATION_TOKEN_TYPE = "verification"
+
+
+def create_verification_token(subject: Union[str, int]) -> str:
+    """Token sent in the verification email, it can't be used to log in."""
+    return create_jwt_token(
+        subject=subject,
+        expires_delta=timedelta(
+            minutes=settings.EMAIL_VERIFICATION_TOKEN_EXPIRE_MINUTES
+        ),
+        claims={"type": VERIFICATION_TOKEN_TYPE},
+    )
+
+
+class TokenCache:
+    """
+    Keeps the payload of already verified tokens, keyed by the token digest,
+    until they expire. The `exp` and `nbf` claims are checked again on every
+    hit, raising the same errors jwt.decode would.
+    """
+
+    def __init__(self, maxsize: int) -> None:
+        self.cache = LRUCache(
+            maxsize=maxsize, ttl=settings.ACCESS_TOKEN_EXPIRE_MINUTES * 60
+        )
+        self.hits = 0
+        self.misses = 0
+
+    def _key(self, token: str) -> bytes:
+        return hashlib.sha256(token.encode()).digest()
+
+    def get(self, token: str) -> Optional[Dict[str, Any]]:
+        payload = self.cache.get(self._key(token))
+        if payload is None:
+            self.misses += 1
+            return None
+        now = time.time()
+        if "exp" in payload and payload["exp"] <= now:
+            raise jwt.ExpiredSignatureError("Signature has expired")
+        if "nbf" in payload and payload["nbf"] > now:
+            raise jwt.ImmatureSignatureError(
+                "The token is not yet valid (nbf)"
+            )
+        self.hits += 1
+        return dict(payload)
+
+    def set(self, token: str, payload: Dict[str, Any]) -> None:
+        ttl = None
+        if "exp" in payload:
+            ttl = payload["exp"] - time.time()
+        self.cache.set(self._key(token), dict(payload), ttl=ttl)
+
+    def clear(self) -> None:
+        self.cache.clear()
+        self.hits = 0
+        self.misses = 0
+
+    def info(self) -> Dict[str, int]:
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "size": len(self.cache),
+        }
+
+
+token_cache = TokenCache(maxsize=settings.TOKEN_CACHE_MAXSIZE)
+
+
 def decode_jwt_token(token: str):
+    payload = token_cache.get(token)
+    if payload is not None:
+        return payload
     payload = jwt.decode(
         token,
         settings.SECRET_KEY,
         algorithms=[settings.ACCESS_TOKEN_ALGORITHM],
     )
+    token_cache.set(token, payload)
     return payload
+
+
+class TokenVersionStore:
+    """
+    Latest token version of the users whose tokens were revoked. A token
+    is revoked when its `ver` claim is lower than the stored version. The
+    entries live as long as the tokens do (`ttl` seconds), so every revoked
+    token expires before its entry, and none is evicted before: a missing
+    entry would accept the revoked tokens again. It lives in the memory of
+    the process unless a shared cache `backend` is given, which must not
+    evict keys before they expire either. Not `shared`, it misses the
+    revocations made by the other processes: its callers must then read
+    the version from the database on each miss.
+    """
+
+    def __init__(
+        self, ttl: float, backend: Optional[CacheBackend] = None
+    ) -> None:
+        self.ttl = ttl
+        self.backend = backend
+        self.versions = ExpiringDict()
+
+    @property
+    def shared(self) -> bool:
+        return self.backend is not None
+
+    async def get(self, user_id: int) -> Optional[int]:
+        if self.backend is None:
+            return self.versions.get(user_id)
+        return await self.backend.get(str(user_id))
+
+    async def set(self, user_id: int, version: int) -> None:
+        if self.backend is None:
+            self.versions.set(user_id, version, time.time() + self.ttl)
+        else:
+            await self.backend.set(str(user_id), version)
+
+    async def is_revoked(self, user_id: int, version: int) -> bool:
+        latest = await self.get(user_id)
+        return latest is not None and version < latest
+
+
+def create_token_version_store(
+    namespace: str, ttl: float
+) -> TokenVersionStore:
+    if settings.CACHE_BACKEND == "redis":
+        return TokenVersionStore(
+            ttl, create_cache_backend(namespace, maxsize=0, ttl=ttl)
+        )
+    # The versions read from the database are only trusted as long as the
+    # user cache entries, the other processes may revoke tokens meanwhile.
+    return TokenVersionStore(settings.USER_CACHE_TTL_SECONDS)
+
+
+token_versions = create_token_version_store(
+    "token_version", ttl=settings.ACCESS_TOKEN_EXPIRE_MINUTES * 60
+)
+
+
+class RevocationStore:
+    """
+    Ids (`jti`) of the revoked tokens, each one kept until the token itself
+    expires. It lives in the memory of the process unless a shared cache
+    `backend` is given.
+    """
+
+    def __init__(self, backend: Optional[CacheBackend] = None) -> None:
+        self.backend = backend
+        self.revoked = ExpiringSet()
+
+    async def revoke(self, jti: str, expires_at: float) -> bool:
+        """
+        Revokes the token, checking and revoking in a single step. Returns
+        False if it was already revoked (or expired), so of the concurrent
+        requests using a token only one gets True.
+        """
+        if self.backend is None:
+            if jti in self.revoked:
+                return False
+            self.revoked.add(jti, expires_at)
+            return jti in self.revoked
+        ttl = expires_at - time.time()
+        if ttl <= 0:
+            return False
+        return await self.backend.add(jti, True, ttl=ttl)
+
+    async def is_revoked(self, jti: str) -> bool:
+        if self.backend is None:
+            return jti in self.revoked
+        return await self.backend.get(jti) is not None
+
+
+def create_revocation_store(namespace: str, ttl: float) -> RevocationStore:
+    if settings.CACHE_BACKEND == "redis":
+        # The shared backend doesn't evict, maxsize is not used.
+        return RevocationStore(
+            create_cache_backend(namespace, maxsize=0, ttl=ttl)
+        )
+    return RevocationStore()
+
+
+refresh_revocations = create_revocation_store(
+    "revoked_refresh_token", ttl=settings.REFRESH_TOKEN_EXPIRE_MINUTES * 60
+)
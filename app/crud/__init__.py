@@ -1 +1,2 @@
+from .crud_task import task
 from .crud_user import user
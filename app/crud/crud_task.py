@@ -0,0 +1,266 @@
+import re
+from typing import Any, Dict, List, Optional, Sequence, Tuple, Union
+
+from sqlalchemy import (
+    Boolean,
+    Integer,
+    Select,
+    String,
+    column,
+    delete,
+    func,
+    insert,
+    literal_column,
+    select,
+    table,
+    tuple_,
+    update,
+    values,
+)
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app import models, schemas
+
+# Columns returned by the API (schemas.Task), used by the row based reads.
+PUBLIC_COLUMNS = [
+    getattr(models.Task, name) for name in schemas.Task.__fields__
+]
+
+# Full text search structures created by the migrations, not mapped since
+# they only exist on their own dialect: the task.search_vector generated
+# tsvector column on Postgres and the task_fts FTS5 table on SQLite.
+SEARCH_VECTOR = literal_column("task.search_vector")
+SEARCH_CONFIG = literal_column("'english'")
+TASK_FTS = table("task_fts", column("rowid", Integer))
+
+
+class CrudTask:
+    # Every query filters by owner_id first, so all of them are served by
+    # the ix_task_owner_id_is_done_id index.
+
+    async def get_by_id(
+        self, db: AsyncSession, owner_id: int, id: Union[int, str]
+    ) -> Optional[models.Task]:
+        result = await db.execute(
+            select(models.Task).where(
+                models.Task.owner_id == owner_id, models.Task.id == id
+            )
+        )
+        return result.scalar()
+
+    async def get_multi_by_owner(
+        self,
+        db: AsyncSession,
+        owner_id: int,
+        limit: int = 100,
+        after: Optional[Tuple[bool, int]] = None,
+    ) -> List[models.Task]:
+        """
+        Returns the tasks ordered by (is_done, id), starting after the
+        `after` (is_done, id) key when given.
+        """
+        query = self._by_owner_query(select(models.Task), owner_id, after)
+        result = await db.execute(query.limit(limit))
+        return result.scalars().all()
+
+    async def get_multi_public_by_owner(
+        self,
+        db: AsyncSession,
+        owner_id: int,
+        limit: int = 100,
+        after: Optional[Tuple[bool, int]] = None,
+    ) -> List[Dict[str, Any]]:
+        """
+        Same as get_multi_by_owner, but returns plain dicts holding just the
+        public columns, ready to be serialized.
+        """
+        query = self._by_owner_query(select(*PUBLIC_COLUMNS), owner_id, after)
+        result = await db.execute(query.limit(limit))
+        return [dict(row) for row in result.mappings()]
+
+    def _by_owner_query(
+        self,
+        query: Select,
+        owner_id: int,
+        after: Optional[Tuple[bool, int]],
+    ) -> Select:
+        query = query.where(models.Task.owner_id == owner_id).order_by(
+            models.Task.is_done, models.Task.id
+        )
+        if after is not None:
+            query = query.where(
+                tuple_(models.Task.is_done, models.Task.id) > tuple_(*after)
+            )
+        return query
+
+    async def search_public_by_owner(
+        self, db: AsyncSession, owner_id: int, q: str, limit: int = 100
+    ) -> List[Dict[str, Any]]:
+        """
+        Returns the public columns of the owner tasks matching every word
+        of `q`, the best ranked first (a title match weighs more).
+        """
+        if db.get_bind().dialect.name == "postgresql":
+            ts_query = func.websearch_to_tsquery(SEARCH_CONFIG, q)
+            query = (
+                select(*PUBLIC_COLUMNS)
+                .where(
+                    models.Task.owner_id == owner_id,
+                    SEARCH_VECTOR.op("@@")(ts_query),
+                )
+                .order_by(
+                    func.ts_rank(SEARCH_VECTOR, ts_query).desc(),
+                    models.Task.id,
+                )
+            )
+        else:
+            words = re.findall(r"\w+", q)
+            if not words:
+                return []
+            # Each word quoted, so no FTS5 query syntax reaches MATCH.
+            fts_query = " ".join(f'"{word}"' for word in words)
+            fts_table = literal_column("task_fts")
+            query = (
+                select(*PUBLIC_COLUMNS)
+                .join(TASK_FTS, TASK_FTS.c.rowid == models.Task.id)
+                .where(
+                    models.Task.owner_id == owner_id,
+                    fts_table.op("MATCH")(fts_query),
+                )
+                .order_by(func.bm25(fts_table, 10.0, 1.0), models.Task.id)
+            )
+        result = await db.execute(query.limit(limit))
+        return [dict(row) for row in result.mappings()]
+
+    async def create(
+        self,
+        db: AsyncSession,
+        owner_id: int,
+        task_in: Union[schemas.TaskCreate, Dict[str, Any]],
+    ) -> models.Task:
+        if isinstance(task_in, dict):
+            task_data = task_in.copy()
+        else:
+            task_data = task_in.dict()
+        db_task = models.Task(**task_data, owner_id=owner_id)
+        db.add(db_task)
+        await db.commit()
+        await db.refresh(db_task)
+        return db_task
+
+    async def update(
+        self,
+        db: AsyncSession,
+        db_task: models.Task,
+        task_in: Union[schemas.TaskUpdate, Dict[str, Any]],
+    ) -> models.Task:
+        if isinstance(task_in, dict):
+            update_data = task_in.copy()
+        else:
+            update_data = task_in.dict()
+        for field, value in update_data.items():
+            if hasattr(db_task, field):
+                setattr(db_task, field, value)
+        await db.commit()
+        await db.refresh(db_task)
+        return db_task
+
+    async def delete(self, db: AsyncSession, db_task: models.Task) -> None:
+        await db.delete(db_task)
+        await db.commit()
+
+    # The bulk methods below run a single statement and commit once,
+    # whatever the number of tasks.
+
+    async def create_multi(
+        self,
+        db: AsyncSession,
+        owner_id: int,
+        tasks_in: Sequence[Union[schemas.TaskCreate, Dict[str, Any]]],
+    ) -> List[models.Task]:
+        """
+        INSERT ... VALUES (...), (...) RETURNING, the created tasks are
+        returned in the same order as `tasks_in`.
+        """
+        tasks_data = [
+            {
+                **(task_in if isinstance(task_in, dict) else task_in.dict()),
+                "owner_id": owner_id,
+            }
+            for task_in in tasks_in
+        ]
+        result = await db.scalars(
+            insert(models.Task).returning(
+                models.Task, sort_by_parameter_order=True
+            ),
+            tasks_data,
+        )
+        tasks = result.all()
+        await db.commit()
+        return tasks
+
+    async def update_multi(
+        self,
+        db: AsyncSession,
+        owner_id: int,
+        tasks_in: Sequence[schemas.TaskBulkUpdateItem],
+    ) -> List[models.Task]:
+        """
+        UPDATE ... FROM (VALUES ...) RETURNING, only the tasks of the owner
+        are updated and returned, in no particular order.
+        """
+        task_data = (
+            values(
+                column("id", Integer),
+                column("title", String),
+                column("description", String),
+                column("is_done", Boolean),
+                name="task_data",
+            ).data(
+                [
+                    (task.id, task.title, task.description, task.is_done)
+                    for task in tasks_in
+                ]
+            )
+            # SQLite only accepts the VALUES column names in a CTE.
+            .cte("task_data")
+        )
+        result = await db.scalars(
+            update(models.Task)
+            .where(
+                models.Task.id == task_data.c.id,
+                models.Task.owner_id == owner_id,
+            )
+            .values(
+                title=task_data.c.title,
+                description=task_data.c.description,
+                is_done=task_data.c.is_done,
+            )
+            .returning(models.Task)
+            .execution_options(
+                synchronize_session=False, populate_existing=True
+            )
+        )
+        tasks = result.all()
+        await db.commit()
+        return tasks
+
+    async def delete_multi(
+        self, db: AsyncSession, owner_id: int, ids: Sequence[int]
+    ) -> List[int]:
+        """
+        DELETE ... WHERE id IN (...) RETURNING id, only the tasks of the
+        owner are deleted, returns their ids.
+        """
+        result = await db.scalars(
+            delete(models.Task)
+            .where(models.Task.owner_id == owner_id, models.Task.id.in_(ids))
+            .returning(models.Task.id)
+            .execution_options(synchronize_session=False)
+        )
+        deleted_ids = result.all()
+        await db.commit()
+        return deleted_ids
+
+
+task = CrudTask()
@@ -1,10 +1,30 @@
-from typing import Any, Dict, List, Literal, Optional, Union
+from typing import Any, Dict, List, Literal, Optional, Sequence, Union
 
-from sqlalchemy import select
+from sqlalchemy import (
+    Select,
+    delete,
+    func,
+    insert,
+    inspect,
+    select,
+    update,
+)
+from sqlalchemy.exc import IntegrityError
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app import models, schemas
-from app.core.security import get_password_hash, verify_password
+from app.core.cache import user_cache
+from app.core.security import (
+    get_password_hash_async,
+    token_versions,
+    verify_and_update_password_async,
+    verify_dummy_password,
+)
+
+# Columns returned by the API (schemas.User), used by the row based reads.
+PUBLIC_COLUMNS = [
+    getattr(models.User, name) for name in schemas.User.__fields__
+]
 
 
 class CrudUser:
@@ -16,22 +36,95 @@ class CrudUser:
         )
         return result.scalar()
 
+    async def get_fields_by_id(
+        self, db: AsyncSession, id: Union[int, str], fields: Sequence[str]
+    ) -> Optional[Dict[str, Any]]:
+        """
+        Loads only the given columns of the user, e.g. ["id", "is_active"],
+        as a dict instead of a full ORM object.
+        """
+        return await self._get_fields(db, models.User.id == id, fields)
+
+    async def get_fields_by_email(
+        self, db: AsyncSession, email: str, fields: Sequence[str]
+    ) -> Optional[Dict[str, Any]]:
+        return await self._get_fields(db, self._email_matches(email), fields)
+
+    async def _get_fields(
+        self, db: AsyncSession, where: Any, fields: Sequence[str]
+    ) -> Optional[Dict[str, Any]]:
+        columns = [getattr(models.User, field) for field in fields]
+        result = await db.execute(select(*columns).where(where))
+        row = result.mappings().first()
+        return dict(row) if row is not None else None
+
+    async def get_principal(
+        self, db: AsyncSession, id: Union[int, str]
+    ) -> Optional[schemas.UserPrincipal]:
+        """
+        Loads the public columns of the user as an immutable UserPrincipal,
+        served from the user cache when possible.
+        """
+        user_data = await user_cache.get(str(id))
+        if user_data is None:
+            user_data = await self.get_fields_by_id(
+                db, id=id, fields=schemas.UserPrincipal._fields
+            )
+            if user_data is None:
+                return None
+            await user_cache.set(str(id), user_data)
+        return schemas.UserPrincipal(**user_data)
+
     async def get_multi(
-        self, db: AsyncSession, skip: int = 0, limit: int = 100
+        self,
+        db: AsyncSession,
+        skip: int = 0,
+        limit: int = 100,
+        after_id: Optional[int] = None,
     ) -> Optional[List[models.User]]:
-        result = await db.execute(
-            select(models.User).offset(skip).limit(limit)
-        )
+        """
+        Prefer `after_id` (keyset pagination) over `skip`, its cost doesn't
+        grow with the page depth.
+        """
+        query = self._multi_query(select(models.User), after_id)
+        result = await db.execute(query.offset(skip).limit(limit))
         return result.scalars().all()
 
+    async def get_multi_public(
+        self,
+        db: AsyncSession,
+        limit: int = 100,
+        after_id: Optional[int] = None,
+    ) -> List[Dict[str, Any]]:
+        """
+        Same as get_multi, but returns plain dicts holding just the public
+        columns, which can be serialized as they are, without building ORM
+        objects and validating them again through schemas.User.
+        """
+        query = self._multi_query(select(*PUBLIC_COLUMNS), after_id)
+        result = await db.execute(query.limit(limit))
+        return [dict(row) for row in result.mappings()]
+
+    def _multi_query(self, query: Select, after_id: Optional[int]) -> Select:
+        query = query.order_by(models.User.id)
+        if after_id is not None:
+            query = query.where(models.User.id > after_id)
+        return query
+
     async def get_by_email(
         self, db: AsyncSession, email: str
     ) -> Optional[models.User]:
         result = await db.execute(
-            select(models.User).where(models.User.email == email)
+            select(models.User).where(self._email_matches(email))
         )
         return result.scalar()
 
+    def _email_matches(self, email: str) -> Any:
+        # The emails are stored lowercased, but the lookups compare
+        # lower(email), the expression of the unique ix_user_email_lower
+        # index, so they are index seeks even for rows stored before.
+        return func.lower(models.User.email) == schemas.normalize_email(email)
+
     async def create(
         self,
         db: AsyncSession,
@@ -41,57 +134,150 @@ class CrudUser:
             user_data = user_in.copy()
         else:
             user_data = user_in.dict(exclude_unset=True)
+        if user_data.get("email"):
+            user_data["email"] = schemas.normalize_email(user_data["email"])
         if user_data.get("password"):
-            hashed_password = get_password_hash(user_data.pop("password"))
+            hashed_password = await get_password_hash_async(
+                user_data.pop("password")
+            )
             user_data["hashed_password"] = hashed_password
-        db_user = models.User(**user_data)
-        db.add(db_user)
-        await db.commit()
-        await db.refresh(db_user)
+        try:
+            result = await db.scalars(
+                insert(models.User)
+                .values(**self._column_values(user_data))
+                .returning(models.User)
+            )
+            db_user = result.one()
+            await db.commit()
+        except IntegrityError:
+            # e.g. the email is already in use (unique lower(email) index)
+            await db.rollback()
+            raise
         return db_user
 
     async def update(
         self,
         db: AsyncSession,
-        db_user: models.User,
+        db_user: Union[models.User, schemas.UserPrincipal],
         user_in: Union[
             schemas.UserUpdatePUT, schemas.UserUpdatePATCH, Dict[str, Any]
         ],
-    ) -> models.User:
+    ) -> Optional[models.User]:
+        """
+        Updates the user with the id of `db_user` through a single
+        UPDATE ... RETURNING, so `db_user` doesn't need to belong to `db`
+        (e.g. it can be a UserPrincipal). Returns the updated user, or None
+        if it no longer exists.
+        """
         if isinstance(user_in, dict):
             update_data = user_in.copy()
         elif isinstance(user_in, schemas.UserUpdatePUT):
             update_data = user_in.dict()
         else:
             update_data = user_in.dict(exclude_unset=True)
+        if update_data.get("email"):
+            update_data["email"] = schemas.normalize_email(
+                update_data["email"]
+            )
         if update_data.get("password"):
-            hashed_password = get_password_hash(update_data.pop("password"))
+            hashed_password = await get_password_hash_async(
+                update_data.pop("password")
+            )
             update_data["hashed_password"] = hashed_password
-        for field, value in update_data.items():
-            if hasattr(db_user, field):
-                setattr(db_user, field, value)
-        await db.commit()
-        await db.refresh(db_user)
-        return db_user
+        update_data = self._column_values(update_data)
+        if not update_data:
+            return db_user
+        try:
+            result = await db.scalars(
+                update(models.User)
+                .where(models.User.id == db_user.id)
+                .values(
+                    {
+                        **update_data,
+                        "token_version": models.User.token_version + 1,
+                    }
+                )
+                .returning(models.User)
+                .execution_options(
+                    synchronize_session=False, populate_existing=True
+                )
+            )
+            updated_user = result.one_or_none()
+            await db.commit()
+        except IntegrityError:
+            # e.g. the new email is already in use
+            await db.rollback()
+            raise
+        await user_cache.delete(str(db_user.id))
+        if updated_user:
+            # The claims of the stateless tokens issued before are stale now.
+            await token_versions.set(
+                updated_user.id, updated_user.token_version
+            )
+        return updated_user
 
     async def delete_by_id(
         self, db: AsyncSession, id: Union[int, str]
     ) -> Optional[models.User]:
-        user = await self.get_by_id(db=db, id=id)
-        await db.delete(user)
+        """
+        Deletes the user through a single DELETE ... RETURNING. Returns the
+        deleted user, or None if it didn't exist.
+        """
+        result = await db.scalars(
+            delete(models.User)
+            .where(models.User.id == id)
+            .returning(models.User)
+        )
+        user = result.one_or_none()
         await db.commit()
+        await user_cache.delete(str(id))
+        if user:
+            await token_versions.set(user.id, user.token_version + 1)
         return user
 
+    def _column_values(self, data: Dict[str, Any]) -> Dict[str, Any]:
+        columns = inspect(models.User).column_attrs.keys()
+        return {
+            field: value for field, value in data.items() if field in columns
+        }
+
     # TODO: Think if authenticate_user method should be in CrudUser class
     async def authenticate_user(
         self, db: AsyncSession, user_email: str, password: str
-    ) -> Union[Literal[False], models.User]:
-        user = await self.get_by_email(db, user_email)
-        if not user:
-            return False
-        if not verify_password(password, user.hashed_password):
+    ) -> Union[Literal[False], schemas.UserPrincipal]:
+        user_data = await self.get_fields_by_email(
+            db,
+            email=user_email,
+            fields=[*schemas.UserPrincipal._fields, "hashed_password"],
+        )
+        if not user_data:
+            return await verify_dummy_password(password)
+        hashed_password = user_data.pop("hashed_password")
+        verified, new_hash = await verify_and_update_password_async(
+            password, hashed_password
+        )
+        if not verified:
             return False
-        return user
+        if new_hash:
+            await self.update_password_hash(
+                db, id=user_data["id"], hashed_password=new_hash
+            )
+        return schemas.UserPrincipal(**user_data)
+
+    async def update_password_hash(
+        self, db: AsyncSession, id: int, hashed_password: str
+    ) -> None:
+        """
+        Stores the password rehashed with the current scheme and cost. The
+        password itself is the same, so the issued tokens stay valid.
+        """
+        await db.execute(
+            update(models.User)
+            .where(models.User.id == id)
+            .values(hashed_password=hashed_password)
+            .execution_options(synchronize_session=False)
+        )
+        await db.commit()
 
 
 user = CrudUser()
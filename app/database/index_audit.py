@@ -0,0 +1,264 @@
+"""
+Index audit: runs every CRUD query of the app once against the database,
+asks the database how it executes each one (EXPLAIN) and compares the
+indexes they use with the ones in the database and in the models.
+
+    python -m app.database.index_audit
+
+The exit status is 1 when some index is unused or some declared index is
+missing. On Postgres the sequential scans are disabled while explaining,
+so the plans show the index a big table would use.
+"""
+
+import asyncio
+import json
+import re
+import sys
+import uuid
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator, List, NamedTuple, Set
+
+from sqlalchemy import event, inspect
+from sqlalchemy.ext.asyncio import AsyncConnection, AsyncEngine, AsyncSession
+
+from app import crud, schemas
+from app.database.base import Base
+from app.database.session import engine
+
+# Indexes created by the migrations on columns the models don't map.
+UNMAPPED_INDEXES = {"ix_task_search_vector"}
+
+EXPLAINABLE = ("SELECT", "UPDATE", "DELETE", "WITH")
+
+SQLITE_PLAN_STEP = re.compile(r"^(SCAN|SEARCH) (\w+)(?: AS \w+)?(.*)$")
+
+
+class Statement(NamedTuple):
+    sql: str
+    parameters: Any
+
+
+class StatementPlan(NamedTuple):
+    sql: str
+    indexes: Set[str]
+    # Tables read entirely, without the help of any index
+    full_scans: Set[str]
+
+
+class IndexAudit(NamedTuple):
+    plans: List[StatementPlan]
+    used: Set[str]
+    # Non unique indexes in the database that no statement uses
+    unused: Set[str]
+    # Declared by the models but not in the database, and the opposite
+    missing: Set[str]
+    undeclared: Set[str]
+
+
+@contextmanager
+def record_statements(engine: AsyncEngine) -> Iterator[List[Statement]]:
+    statements: List[Statement] = []
+
+    def before_cursor_execute(conn, cursor, sql, parameters, context, many):
+        if not many and sql.lstrip().upper().startswith(EXPLAINABLE):
+            statements.append(Statement(sql, parameters))
+
+    sync_engine = engine.sync_engine
+    event.listen(sync_engine, "before_cursor_execute", before_cursor_execute)
+    try:
+        yield statements
+    finally:
+        event.remove(
+            sync_engine, "before_cursor_execute", before_cursor_execute
+        )
+
+
+async def run_workload(db: AsyncSession) -> None:
+    """Calls each query method of the CRUD objects once."""
+    user = await crud.user.create(
+        db=db,
+        user_in={
+            "full_name": "Index Audit",
+            "email": f"index-audit-{uuid.uuid4().hex}@example.com",
+            "password": uuid.uuid4().hex,
+            "is_active": True,
+            "is_superuser": False,
+        },
+    )
+    try:
+        await crud.user.get_by_id(db, id=user.id)
+        await crud.user.get_by_email(db, email=user.email)
+        await crud.user.get_fields_by_id(db, id=user.id, fields=["id"])
+        await crud.user.get_fields_by_email(
+            db, email=user.email, fields=["id"]
+        )
+        await crud.user.get_multi_public(db, after_id=user.id)
+        await crud.user.update(
+            db, db_user=user, user_in={"full_name": "Index Audit"}
+        )
+        tasks = await crud.task.create_multi(
+            db,
+            owner_id=user.id,
+            tasks_in=[{"title": "Index audit", "description": "audit"}] * 2,
+        )
+        await crud.task.get_by_id(db, owner_id=user.id, id=tasks[0].id)
+        await crud.task.get_multi_public_by_owner(
+            db, owner_id=user.id, after=(False, tasks[0].id)
+        )
+        await crud.task.search_public_by_owner(db, owner_id=user.id, q="audit")
+        await crud.task.update(db, db_task=tasks[0], task_in={"is_done": True})
+        await crud.task.update_multi(
+            db,
+            owner_id=user.id,
+            tasks_in=[
+                schemas.TaskBulkUpdateItem(
+                    id=tasks[0].id,
+                    title="Index audit",
+                    description="audit",
+                    is_done=True,
+                )
+            ],
+        )
+        await crud.task.delete_multi(db, owner_id=user.id, ids=[tasks[1].id])
+    finally:
+        await crud.user.delete_by_id(db, id=user.id)
+
+
+def parse_sqlite_plan(details: List[str]) -> Dict[str, Set[str]]:
+    """Indexes and fully scanned tables of an EXPLAIN QUERY PLAN."""
+    indexes: Set[str] = set()
+    full_scans: Set[str] = set()
+    for detail in details:
+        step = SQLITE_PLAN_STEP.match(detail)
+        if step is None:
+            continue
+        operation, table, rest = step.groups()
+        index = re.search(r"INDEX (\w+)", rest)
+        if index is not None and "VIRTUAL TABLE" not in rest:
+            indexes.add(index.group(1))
+        elif operation == "SCAN" and "VIRTUAL TABLE" not in rest:
+            full_scans.add(table)
+    return {"indexes": indexes, "full_scans": full_scans}
+
+
+def parse_postgres_plan(plan: Dict[str, Any]) -> Dict[str, Set[str]]:
+    """Indexes and fully scanned tables of an EXPLAIN (FORMAT JSON) plan."""
+    indexes: Set[str] = set()
+    full_scans: Set[str] = set()
+    nodes = [plan]
+    while nodes:
+        node = nodes.pop()
+        if "Index Name" in node:
+            indexes.add(node["Index Name"])
+        elif node["Node Type"] == "Seq Scan":
+            full_scans.add(node["Relation Name"])
+        nodes.extend(node.get("Plans", ()))
+    return {"indexes": indexes, "full_scans": full_scans}
+
+
+async def explain(
+    connection: AsyncConnection, statement: Statement
+) -> StatementPlan:
+    if connection.dialect.name == "postgresql":
+        result = await connection.exec_driver_sql(
+            f"EXPLAIN (FORMAT JSON) {statement.sql}", statement.parameters
+        )
+        plan = result.scalar()
+        if isinstance(plan, str):
+            plan = json.loads(plan)
+        parsed = parse_postgres_plan(plan[0]["Plan"])
+    else:
+        result = await connection.exec_driver_sql(
+            f"EXPLAIN QUERY PLAN {statement.sql}", statement.parameters
+        )
+        parsed = parse_sqlite_plan([row[-1] for row in result])
+    return StatementPlan(
+        sql=statement.sql,
+        indexes=parsed["indexes"],
+        full_scans=parsed["full_scans"] & set(Base.metadata.tables),
+    )
+
+
+def get_database_indexes(connection: Any) -> Dict[str, bool]:
+    """Names of the indexes of the mapped tables, and if they are unique."""
+    if connection.dialect.name == "sqlite":
+        # The SQLite reflection skips the expression indexes, and the
+        # automatic ones (origin "u" or "pk") belong to constraints.
+        return {
+            row[1]: bool(row[2])
+            for table in Base.metadata.tables
+            for row in connection.exec_driver_sql(
+                f'PRAGMA index_list("{table}")'
+            )
+            if row[3] == "c"
+        }
+    inspector = inspect(connection)
+    return {
+        index["name"]: bool(index["unique"])
+        for table in Base.metadata.tables
+        for index in inspector.get_indexes(table)
+    }
+
+
+async def audit_indexes(engine: AsyncEngine = engine) -> IndexAudit:
+    with record_statements(engine) as statements:
+        async with AsyncSession(engine, expire_on_commit=False) as db:
+            await run_workload(db)
+
+    async with engine.connect() as connection:
+        if connection.dialect.name == "postgresql":
+            # Rolled back with the transaction when the connection closes.
+            await connection.exec_driver_sql("SET LOCAL enable_seqscan = off")
+        plans = [
+            await explain(connection, statement) for statement in statements
+        ]
+        database_indexes = await connection.run_sync(get_database_indexes)
+
+    declared = {
+        index.name
+        for table in Base.metadata.tables.values()
+        for index in table.indexes
+    }
+    used = set().union(*(plan.indexes for plan in plans))
+    return IndexAudit(
+        plans=plans,
+        used=used,
+        unused={
+            name
+            for name, unique in database_indexes.items()
+            if not unique and name not in used
+        },
+        missing=declared - set(database_indexes),
+        undeclared=set(database_indexes) - declared - UNMAPPED_INDEXES,
+    )
+
+
+def format_report(audit: IndexAudit) -> str:
+    lines = []
+    for plan in audit.plans:
+        sql = " ".join(plan.sql.split())
+        lines.append(sql if len(sql) <= 100 else f"{sql[:97]}...")
+        lines.append(f"    indexes: {', '.join(sorted(plan.indexes)) or '-'}")
+        if plan.full_scans:
+            lines.append(
+                f"    FULL SCAN: {', '.join(sorted(plan.full_scans))}"
+            )
+    lines.append("")
+    for title, names in (
+        ("Used indexes", audit.used),
+        ("Unused indexes", audit.unused),
+        ("Declared in the models, missing in the database", audit.missing),
+        ("In the database, not declared in the models", audit.undeclared),
+    ):
+        lines.append(f"{title}: {', '.join(sorted(names)) or '-'}")
+    return "\n".join(lines)
+
+
+def main() -> int:
+    audit = asyncio.run(audit_indexes())
+    print(format_report(audit))
+    return 1 if audit.unused or audit.missing else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
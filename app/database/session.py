@@ -1,18 +1,297 @@
 # from sqlalchemy import create_engine
+import time
+from typing import Any, Dict, Optional
+
+from sqlalchemy import event
+from sqlalchemy.engine import make_url
 from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
-from sqlalchemy.orm import sessionmaker
+from sqlalchemy.ext.asyncio.engine import AsyncEngine
+from sqlalchemy.orm import Session, SessionTransactionOrigin, sessionmaker
+from sqlalchemy.pool import AsyncAdaptedQueuePool
 
+from app.core.cache import CacheBackend, create_cache_backend
 from app.core.config import settings
 
+
+class PoolMetrics:
+    def __init__(self) -> None:
+        self.checkouts = 0
+        self.timeouts = 0
+        self.wait_seconds_total = 0.0
+        self.wait_seconds_max = 0.0
+
+    def record_wait(self, seconds: float, timed_out: bool = False) -> None:
+        if timed_out:
+            self.timeouts += 1
+        else:
+            self.checkouts += 1
+        self.wait_seconds_total += seconds
+        self.wait_seconds_max = max(self.wait_seconds_max, seconds)
+
+
+class InstrumentedQueuePool(AsyncAdaptedQueuePool):
+    """
+    AsyncAdaptedQueuePool that measures how long each checkout waited for a
+    free connection.
+    """
+
+    def __init__(self, *args: Any, **kwargs: Any) -> None:
+        super().__init__(*args, **kwargs)
+        self.metrics = PoolMetrics()
+
+    def recreate(self) -> "InstrumentedQueuePool":
+        pool = super().recreate()
+        pool.metrics = self.metrics
+        return pool
+
+    def _do_get(self):
+        start = time.perf_counter()
+        try:
+            connection = super()._do_get()
+        except Exception:
+            self.metrics.record_wait(
+                time.perf_counter() - start, timed_out=True
+            )
+            raise
+        self.metrics.record_wait(time.perf_counter() - start)
+        return connection
+
+
+def get_engine_options(database_uri: str) -> Dict[str, Any]:
+    options: Dict[str, Any] = {
+        "echo": settings.SQLALCHEMY_ECHO,
+        "poolclass": InstrumentedQueuePool,
+        "pool_size": settings.DATABASE_POOL_SIZE,
+        "max_overflow": settings.DATABASE_MAX_OVERFLOW,
+        "pool_timeout": settings.DATABASE_POOL_TIMEOUT,
+        "pool_recycle": settings.DATABASE_POOL_RECYCLE,
+        "pool_pre_ping": settings.DATABASE_POOL_PRE_PING,
+    }
+    if make_url(database_uri).get_dialect().driver == "asyncpg":
+        connect_args: Dict[str, Any] = {
+            "prepared_statement_cache_size": (
+                settings.DATABASE_STATEMENT_CACHE_SIZE
+            ),
+        }
+        if settings.DATABASE_STATEMENT_TIMEOUT_MS:
+            connect_args["server_settings"] = {
+                "statement_timeout": str(
+                    settings.DATABASE_STATEMENT_TIMEOUT_MS
+                )
+            }
+        options["connect_args"] = connect_args
+    return options
+
+
+def _enable_foreign_keys(
+    dbapi_connection: Any, connection_record: Any
+) -> None:
+    cursor = dbapi_connection.cursor()
+    cursor.execute("PRAGMA foreign_keys=ON")
+    cursor.close()
+
+
+def enable_sqlite_foreign_keys(engine: AsyncEngine) -> None:
+    """
+    SQLite only enforces the foreign keys (and so their ON DELETE CASCADE)
+    on the connections that turn them on.
+    """
+    if engine.dialect.name == "sqlite":
+        event.listen(engine.sync_engine, "connect", _enable_foreign_keys)
+
+
+def get_pool_status(engine: AsyncEngine) -> Dict[str, Any]:
+    pool = engine.pool
+    status = {
+        "size": pool.size(),
+        "checked_in": pool.checkedin(),
+        "checked_out": pool.checkedout(),
+        "overflow": pool.overflow(),
+    }
+    metrics = getattr(pool, "metrics", None)
+    if metrics is not None:
+        status.update(
+            checkouts=metrics.checkouts,
+            timeouts=metrics.timeouts,
+            wait_seconds_total=metrics.wait_seconds_total,
+            wait_seconds_max=metrics.wait_seconds_max,
+        )
+    return status
+
+
 # Sync
 # engine = create_engine(settings.SQLALCHEMY_DATABASE_URI, pool_pre_ping=True)
 # SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
+
+class ShortTransactionSyncSession(Session):
+    """
+    Sync session of ShortTransactionSession, tracking whether its current
+    transaction wrote something (or will flush).
+    """
+
+    writing = False
+
+
+def _after_flush(session: Any, flush_context: Any) -> None:
+    session.writing = True
+
+
+def _after_transaction_end(session: Any, transaction: Any) -> None:
+    if transaction.parent is None:
+        session.writing = False
+
+
+# Registered once for all the sessions, not on each one.
+event.listen(ShortTransactionSyncSession, "after_flush", _after_flush)
+event.listen(
+    ShortTransactionSyncSession,
+    "after_transaction_end",
+    _after_transaction_end,
+)
+
+
+class ShortTransactionSession(AsyncSession):
+    """
+    AsyncSession that gives its connection back to the pool as soon as it
+    is idle, instead of holding it until the session is closed at the end
+    of the request: a transaction that only read is committed right after
+    each read (SELECT, get, refresh), and one that wrote (or flushed) ends
+    with its commit as usual. The transactions opened with `begin()` are
+    never committed early either, nor the ones holding row locks (SELECT
+    ... FOR UPDATE). Like any session, the connection is only checked out
+    on the first statement.
+    """
+
+    sync_session_class = ShortTransactionSyncSession
+
+    @property
+    def writing(self) -> bool:
+        return self.sync_session.writing
+
+    def _track(self, statement: Any = None) -> None:
+        if statement is not None and (
+            not getattr(statement, "is_select", False)
+            # The row locks are held until the transaction ends.
+            or getattr(statement, "_for_update_arg", None) is not None
+        ):
+            self.sync_session.writing = True
+        if self.new or self.dirty or self.deleted:
+            # They are flushed by the autoflush of the next statement.
+            self.sync_session.writing = True
+
+    async def _release_if_idle(self) -> None:
+        transaction = self.sync_session.get_transaction()
+        if (
+            not self.writing
+            and transaction is not None
+            and transaction.origin is SessionTransactionOrigin.AUTOBEGIN
+        ):
+            await super().commit()
+
+    async def execute(self, statement: Any, *args: Any, **kwargs: Any) -> Any:
+        self._track(statement)
+        result = await super().execute(statement, *args, **kwargs)
+        await self._release_if_idle()
+        return result
+
+    async def scalar(self, statement: Any, *args: Any, **kwargs: Any) -> Any:
+        self._track(statement)
+        result = await super().scalar(statement, *args, **kwargs)
+        await self._release_if_idle()
+        return result
+
+    async def get(self, *args: Any, **kwargs: Any) -> Any:
+        self._track()
+        result = await super().get(*args, **kwargs)
+        await self._release_if_idle()
+        return result
+
+    async def refresh(self, *args: Any, **kwargs: Any) -> None:
+        self._track()
+        await super().refresh(*args, **kwargs)
+        await self._release_if_idle()
+
+
+class SessionRouter:
+    """
+    Picks the session factory of each request: the `reader` one for the
+    safe methods and the `writer` one for the others. The reads of a client
+    that wrote in the last `lag` seconds also go to the writer, so they see
+    their own writes even if the replica is behind.
+    """
+
+    SAFE_METHODS = ("GET", "HEAD", "OPTIONS")
+
+    def __init__(
+        self,
+        writer: sessionmaker,
+        reader: sessionmaker,
+        recent_writers: CacheBackend,
+    ) -> None:
+        self.writer = writer
+        self.reader = reader
+        self.recent_writers = recent_writers
+
+    async def mark_writer(self, client_key: str) -> None:
+        """Sends the reads of `client_key` to the writer for `lag` seconds."""
+        await self.recent_writers.set(client_key, True)
+
+    async def session_for(
+        self, method: str, client_key: Optional[str] = None
+    ) -> sessionmaker:
+        if method.upper() not in self.SAFE_METHODS:
+            if client_key is not None:
+                await self.mark_writer(client_key)
+            return self.writer
+        if client_key is not None and await self.recent_writers.get(
+            client_key
+        ):
+            return self.writer
+        return self.reader
+
+
+def create_session_factory(engine: AsyncEngine) -> sessionmaker:
+    return sessionmaker(
+        engine,
+        expire_on_commit=False,
+        future=True,  # 2.0 Style
+        # Async sessions holding their connection only while in use
+        class_=ShortTransactionSession,
+    )
+
+
+def read_only(engine: AsyncEngine) -> AsyncEngine:
+    """Same engine (and pool), with read only transactions on Postgres."""
+    if engine.dialect.name == "postgresql":
+        return engine.execution_options(postgresql_readonly=True)
+    return engine
+
+
 # Async
-engine = create_async_engine(settings.SQLALCHEMY_DATABASE_URI, echo=True)
-async_session = sessionmaker(
-    engine,
-    expire_on_commit=False,
-    future=True,  # 2.0 Style
-    class_=AsyncSession,  # Make a async session
+engine = create_async_engine(
+    settings.SQLALCHEMY_DATABASE_URI,
+    **get_engine_options(settings.SQLALCHEMY_DATABASE_URI),
+)
+enable_sqlite_foreign_keys(engine)
+async_session = create_session_factory(engine)
+
+if settings.SQLALCHEMY_REPLICA_URI:
+    reader_engine = create_async_engine(
+        settings.SQLALCHEMY_REPLICA_URI,
+        **get_engine_options(settings.SQLALCHEMY_REPLICA_URI),
+    )
+    enable_sqlite_foreign_keys(reader_engine)
+else:
+    reader_engine = engine
+reader_session = create_session_factory(read_only(reader_engine))
+
+session_router = SessionRouter(
+    writer=async_session,
+    reader=reader_session,
+    recent_writers=create_cache_backend(
+        "recent_writers",
+        maxsize=settings.RECENT_WRITERS_MAXSIZE,
+        ttl=settings.DATABASE_REPLICA_LAG_SECONDS,
+    ),
 )
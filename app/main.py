@@ -1,18 +1,71 @@
 import uvicorn
-from fastapi import FastAPI
+from fastapi import FastAPI, Request, status
+from fastapi.responses import JSONResponse, ORJSONResponse
 
+from app.api import health, metrics
 from app.api.api_v1.api import api_v1_router
-from app.celery_worker import send_verification_email
 from app.core.config import settings
+from app.core.jobs import job_queue
+from app.core.mail import close_loop_mailer
+from app.core.metrics import MetricsMiddleware, instrument_engine
+from app.core.pagination import InvalidCursor
+from app.core.security import PasswordHasherBusy, password_hasher
+from app.database.session import engine, reader_engine
 
-app = FastAPI()
+app = FastAPI(default_response_class=ORJSONResponse)
 
 app.include_router(api_v1_router, prefix=settings.API_V1_STR)
+app.include_router(health.router, prefix="/health", tags=["health"])
+
+if settings.METRICS_ENABLED:
+    instrument_engine(engine)
+    if reader_engine is not engine:
+        instrument_engine(reader_engine, collect_pool=False)
+    app.add_middleware(MetricsMiddleware)
+    app.include_router(metrics.router)
+
+
+@app.exception_handler(PasswordHasherBusy)
+async def password_hasher_busy_handler(
+    request: Request, exc: PasswordHasherBusy
+) -> JSONResponse:
+    return JSONResponse(
+        status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+        content={"detail": "Server is busy, try again later."},
+        headers={"Retry-After": "1"},
+    )
+
+
+@app.exception_handler(InvalidCursor)
+async def invalid_cursor_handler(
+    request: Request, exc: InvalidCursor
+) -> JSONResponse:
+    return JSONResponse(
+        status_code=status.HTTP_400_BAD_REQUEST,
+        content={"detail": "Invalid cursor"},
+    )
+
+
+@app.on_event("shutdown")
+def shutdown_password_hasher() -> None:
+    password_hasher.shutdown()
+
+
+@app.on_event("startup")
+async def start_job_queue() -> None:
+    if settings.JOB_BACKEND == "asyncio":
+        job_queue.start()
+
+
+@app.on_event("shutdown")
+async def stop_job_queue() -> None:
+    await job_queue.stop(settings.JOB_DRAIN_TIMEOUT)
+    await close_loop_mailer()
 
 
 @app.get("/")
-def im_alive():
-    send_verification_email.delay("faranes767@whecode.com", "Joandel", "1232")
+async def im_alive():
+    # Liveness only: it must not touch the database, broker or anything else.
     return "I'am alive!"
 
 
@@ -1,4 +1,4 @@
-from sqlalchemy import Boolean, Column, ForeignKey, Integer, String
+from sqlalchemy import Boolean, Column, ForeignKey, Index, Integer, String
 from sqlalchemy.orm import relationship
 
 from app.database.base import Base
@@ -7,11 +7,15 @@ from app.database.base import Base
 class Task(Base):
 
     __tablename__ = "task"
+    __table_args__ = (
+        # Serves every task query: filter by owner, order by is_done and id.
+        Index("ix_task_owner_id_is_done_id", "owner_id", "is_done", "id"),
+    )
 
-    id = Column(Integer, primary_key=True, index=True)
-    title = Column(String, index=True)
-    description = Column(String, index=True)
-    is_done = Column(Boolean)
-    owner_id = Column(Integer, ForeignKey("user.id"))
+    id = Column(Integer, primary_key=True)
+    title = Column(String)
+    description = Column(String)
+    is_done = Column(Boolean, default=False)
+    owner_id = Column(Integer, ForeignKey("user.id", ondelete="CASCADE"))
 
     owner = relationship("User", back_populates="tasks")
@@ -1,4 +1,4 @@
-from sqlalchemy import Boolean, Column, Integer, String
+from sqlalchemy import Boolean, Column, Index, Integer, String, func
 from sqlalchemy.orm import relationship
 
 from app.database.base import Base
@@ -8,11 +8,23 @@ class User(Base):
 
     __tablename__ = "user"
 
-    id = Column(Integer, primary_key=True, index=True)
-    full_name = Column(String, index=True)
-    email = Column(String, unique=True, index=True, nullable=False)
+    id = Column(Integer, primary_key=True)
+    full_name = Column(String)
+    # Stored lowercased, see schemas.normalize_email
+    email = Column(String, nullable=False)
     hashed_password = Column(String, nullable=False)
     is_active = Column(Boolean, default=False)
     is_superuser = Column(Boolean, default=False)
+    # Incremented on every update, revoking the stateless tokens issued
+    # before it (see STATELESS_AUTH).
+    token_version = Column(
+        Integer, nullable=False, default=0, server_default="0"
+    )
 
-    tasks = relationship("Task", back_populates="owner")
+    tasks = relationship(
+        "Task", back_populates="owner", passive_deletes=True
+    )
+
+
+# The emails are unique whatever their case, and looked up by lower(email).
+Index("ix_user_email_lower", func.lower(User.email), unique=True)
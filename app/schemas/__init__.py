@@ -1,5 +1,22 @@
 from .error import HTTPError
 from .message import Message
-from .task import Task, TaskCreate, TaskUpdate
-from .token import Token, TokenPayload
-from .user import User, UserCreate, UserUpdatePATCH, UserUpdatePUT
+from .page import Page
+from .task import (
+    Task,
+    TaskBulkCreate,
+    TaskBulkDelete,
+    TaskBulkResult,
+    TaskBulkUpdate,
+    TaskBulkUpdateItem,
+    TaskCreate,
+    TaskUpdate,
+)
+from .token import RefreshTokenRequest, Token, TokenPayload
+from .user import (
+    User,
+    UserCreate,
+    UserPrincipal,
+    UserUpdatePATCH,
+    UserUpdatePUT,
+    normalize_email,
+)
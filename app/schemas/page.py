@@ -0,0 +1,11 @@
+from typing import Generic, List, Optional, TypeVar
+
+from pydantic.generics import GenericModel
+
+ItemT = TypeVar("ItemT")
+
+
+class Page(GenericModel, Generic[ItemT]):
+    items: List[ItemT]
+    # Pass it as `cursor` to get the next page, None on the last page.
+    next_cursor: Optional[str] = None
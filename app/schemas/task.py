@@ -1,11 +1,15 @@
-from pydantic import BaseModel, Field
+from typing import List, Literal, Optional
+
+from pydantic import BaseModel, Field, conlist, validator
+
+from app.core.config import settings
 
 
 # Shared properties
 class TaskBase(BaseModel):
     title: str = Field(min_length=3, max_length=50)
     description: str = Field(max_length=140)
-    is_done: bool
+    is_done: bool = False
 
 
 # Properties to receive on item creation
@@ -19,11 +23,8 @@ class TaskUpdate(TaskBase):
 
 
 # Properties shared by models stored in DB
-class TaskInDBBase:
-    id: str
-    title: str
-    description: str
-    is_done: bool
+class TaskInDBBase(TaskBase):
+    id: int
     owner_id: int
 
     class Config:
@@ -38,3 +39,52 @@ class Task(TaskInDBBase):
 # Properties properties stored in DB
 class TaskInDB(TaskInDBBase):
     pass
+
+
+# Properties to receive on bulk operations
+class TaskBulkCreate(BaseModel):
+    items: conlist(
+        TaskCreate, min_items=1, max_items=settings.TASKS_BULK_MAX_ITEMS
+    )
+
+
+class TaskBulkUpdateItem(TaskUpdate):
+    id: int
+
+
+class TaskBulkUpdate(BaseModel):
+    items: conlist(
+        TaskBulkUpdateItem,
+        min_items=1,
+        max_items=settings.TASKS_BULK_MAX_ITEMS,
+    )
+
+    @validator("items")
+    def check_unique_ids(
+        cls, v: List[TaskBulkUpdateItem]
+    ) -> List[TaskBulkUpdateItem]:
+        if len({item.id for item in v}) != len(v):
+            raise ValueError("the task ids must be unique")
+        return v
+
+
+class TaskBulkDelete(BaseModel):
+    ids: conlist(int, min_items=1, max_items=settings.TASKS_BULK_MAX_ITEMS)
+
+    @validator("ids")
+    def check_unique_ids(cls, v: List[int]) -> List[int]:
+        if len(set(v)) != len(v):
+            raise ValueError("the task ids must be unique")
+        return v
+
+
+# Properties to return to client on bulk operations, one item per
+# received item and in the same order.
+class TaskBulkResultItem(BaseModel):
+    id: int
+    status: Literal["created", "updated", "deleted", "not_found"]
+    task: Optional[Task] = None
+
+
+class TaskBulkResult(BaseModel):
+    items: List[TaskBulkResultItem]
@@ -1,6 +1,11 @@
-from typing import Optional
+from typing import NamedTuple, Optional
 
-from pydantic import BaseModel, EmailStr
+from pydantic import BaseModel, EmailStr, validator
+
+
+def normalize_email(email: str) -> str:
+    """Emails are stored and looked up lowercased."""
+    return email.strip().lower()
 
 
 # Shared properties
@@ -8,6 +13,10 @@ class UserBase(BaseModel):
     full_name: Optional[str] = None
     email: Optional[EmailStr] = None
 
+    @validator("email")
+    def normalize_email_case(cls, v: Optional[str]) -> Optional[str]:
+        return normalize_email(v) if v is not None else None
+
 
 # Properties to receive via API on creation
 class UserCreate(UserBase):
@@ -56,3 +65,14 @@ class User(UserInDBBase):
 # Properties properties stored in DB
 class UserInDB(UserInDBBase):
     hashed_password: str
+
+
+# Lightweight immutable user, loaded by the auth dependencies without
+# building an ORM object. It holds the User fields plus the token version.
+class UserPrincipal(NamedTuple):
+    id: int
+    full_name: Optional[str]
+    email: str
+    is_active: bool
+    is_superuser: bool
+    token_version: int = 0
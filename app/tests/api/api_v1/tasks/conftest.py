@@ -0,0 +1,15 @@
+import pytest
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app import crud, models
+from app.tests.utils.task import random_task_dict
+
+
+@pytest.fixture()
+async def active_user_task(
+    db: AsyncSession, active_user: models.User
+) -> models.Task:
+    task = await crud.task.create(
+        db=db, owner_id=active_user.id, task_in=random_task_dict()
+    )
+    return task
@@ -0,0 +1,235 @@
+import pytest
+from fastapi import status
+from httpx import AsyncClient
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app import crud, models
+from app.core.config import settings
+from app.tests.utils.auth import get_user_token_headers
+from app.tests.utils.task import random_done_task_dict, random_task_dict
+from app.tests.utils.user import random_active_user_dict
+
+# region bulk create tasks - POST /tasks/bulk
+
+
+@pytest.mark.asyncio
+async def test_when_tasks_are_bulk_created_returns_status_201(
+    async_client: AsyncClient, active_user: models.User
+) -> None:
+    headers = get_user_token_headers(active_user)
+    response = await async_client.post(
+        f"{settings.API_V1_STR}/tasks/bulk",
+        headers=headers,
+        json={"items": [random_task_dict() for _ in range(3)]},
+    )
+    assert response.status_code == status.HTTP_201_CREATED
+
+
+@pytest.mark.asyncio
+async def test_when_tasks_are_bulk_created_they_must_be_returned_in_order(
+    async_client: AsyncClient, active_user: models.User
+) -> None:
+    payload = {"items": [random_task_dict() for _ in range(3)]}
+    headers = get_user_token_headers(active_user)
+    response = await async_client.post(
+        f"{settings.API_V1_STR}/tasks/bulk", headers=headers, json=payload
+    )
+    results = response.json()["items"]
+    assert [result["status"] for result in results] == ["created"] * 3
+    assert [result["task"]["title"] for result in results] == [
+        task["title"] for task in payload["items"]
+    ]
+
+
+@pytest.mark.asyncio
+async def test_when_tasks_are_bulk_created_they_must_be_persisted(
+    async_client: AsyncClient, db: AsyncSession, active_user: models.User
+) -> None:
+    headers = get_user_token_headers(active_user)
+    response = await async_client.post(
+        f"{settings.API_V1_STR}/tasks/bulk",
+        headers=headers,
+        json={"items": [random_task_dict() for _ in range(2)]},
+    )
+    for result in response.json()["items"]:
+        assert await crud.task.get_by_id(
+            db=db, owner_id=active_user.id, id=result["id"]
+        )
+
+
+@pytest.mark.asyncio
+async def test_when_bulk_creating_more_than_max_items_must_return_422(
+    async_client: AsyncClient, active_user: models.User
+) -> None:
+    items = [random_task_dict()] * (settings.TASKS_BULK_MAX_ITEMS + 1)
+    headers = get_user_token_headers(active_user)
+    response = await async_client.post(
+        f"{settings.API_V1_STR}/tasks/bulk",
+        headers=headers,
+        json={"items": items},
+    )
+    assert response.status_code == status.HTTP_422_UNPROCESSABLE_ENTITY
+
+
+@pytest.mark.asyncio
+async def test_when_bulk_creating_if_an_item_is_invalid_must_return_422(
+    async_client: AsyncClient, active_user: models.User
+) -> None:
+    invalid_task = random_task_dict()
+    invalid_task["title"] = "AA"
+    headers = get_user_token_headers(active_user)
+    response = await async_client.post(
+        f"{settings.API_V1_STR}/tasks/bulk",
+        headers=headers,
+        json={"items": [random_task_dict(), invalid_task]},
+    )
+    assert response.status_code == status.HTTP_422_UNPROCESSABLE_ENTITY
+
+
+# endregion
+
+# region bulk update tasks - PATCH /tasks/bulk
+
+
+@pytest.mark.asyncio
+async def test_when_tasks_are_bulk_updated_they_must_be_returned(
+    async_client: AsyncClient,
+    active_user: models.User,
+    active_user_task: models.Task,
+) -> None:
+    item = {"id": active_user_task.id, **random_done_task_dict()}
+    headers = get_user_token_headers(active_user)
+    response = await async_client.patch(
+        f"{settings.API_V1_STR}/tasks/bulk",
+        headers=headers,
+        json={"items": [item]},
+    )
+    result = response.json()["items"][0]
+    assert result["status"] == "updated"
+    assert item.items() <= result["task"].items()
+
+
+@pytest.mark.asyncio
+async def test_when_tasks_are_bulk_updated_they_must_be_persisted(
+    async_client: AsyncClient,
+    db: AsyncSession,
+    active_user: models.User,
+    active_user_task: models.Task,
+) -> None:
+    item = {"id": active_user_task.id, **random_done_task_dict()}
+    headers = get_user_token_headers(active_user)
+    await async_client.patch(
+        f"{settings.API_V1_STR}/tasks/bulk",
+        headers=headers,
+        json={"items": [item]},
+    )
+    await db.refresh(active_user_task)
+    assert active_user_task.title == item["title"]
+    assert active_user_task.is_done is True
+
+
+@pytest.mark.asyncio
+async def test_when_bulk_updating_tasks_of_other_user_must_report_not_found(
+    async_client: AsyncClient,
+    db: AsyncSession,
+    active_user_task: models.Task,
+) -> None:
+    other_user = await crud.user.create(
+        db=db, user_in=random_active_user_dict()
+    )
+    item = {"id": active_user_task.id, **random_done_task_dict()}
+    headers = get_user_token_headers(other_user)
+    response = await async_client.patch(
+        f"{settings.API_V1_STR}/tasks/bulk",
+        headers=headers,
+        json={"items": [item]},
+    )
+    assert response.json()["items"] == [
+        {"id": active_user_task.id, "status": "not_found", "task": None}
+    ]
+
+
+@pytest.mark.asyncio
+async def test_when_bulk_updating_with_repeated_ids_must_return_422(
+    async_client: AsyncClient,
+    active_user: models.User,
+    active_user_task: models.Task,
+) -> None:
+    item = {"id": active_user_task.id, **random_done_task_dict()}
+    headers = get_user_token_headers(active_user)
+    response = await async_client.patch(
+        f"{settings.API_V1_STR}/tasks/bulk",
+        headers=headers,
+        json={"items": [item, item]},
+    )
+    assert response.status_code == status.HTTP_422_UNPROCESSABLE_ENTITY
+
+
+# endregion
+
+# region bulk delete tasks - DELETE /tasks/bulk
+
+
+@pytest.mark.asyncio
+async def test_when_tasks_are_bulk_deleted_they_must_be_reported(
+    async_client: AsyncClient,
+    active_user: models.User,
+    active_user_task: models.Task,
+) -> None:
+    headers = get_user_token_headers(active_user)
+    response = await async_client.request(
+        "DELETE",
+        f"{settings.API_V1_STR}/tasks/bulk",
+        headers=headers,
+        json={"ids": [active_user_task.id, 0]},
+    )
+    assert [result["status"] for result in response.json()["items"]] == [
+        "deleted",
+        "not_found",
+    ]
+
+
+@pytest.mark.asyncio
+async def test_when_tasks_are_bulk_deleted_they_must_be_persisted(
+    async_client: AsyncClient,
+    db: AsyncSession,
+    active_user: models.User,
+    active_user_task: models.Task,
+) -> None:
+    headers = get_user_token_headers(active_user)
+    await async_client.request(
+        "DELETE",
+        f"{settings.API_V1_STR}/tasks/bulk",
+        headers=headers,
+        json={"ids": [active_user_task.id]},
+    )
+    db_task = await crud.task.get_by_id(
+        db=db, owner_id=active_user.id, id=active_user_task.id
+    )
+    assert db_task is None
+
+
+@pytest.mark.asyncio
+async def test_when_bulk_deleting_tasks_of_other_user_they_must_be_kept(
+    async_client: AsyncClient,
+    db: AsyncSession,
+    active_user: models.User,
+    active_user_task: models.Task,
+) -> None:
+    other_user = await crud.user.create(
+        db=db, user_in=random_active_user_dict()
+    )
+    headers = get_user_token_headers(other_user)
+    await async_client.request(
+        "DELETE",
+        f"{settings.API_V1_STR}/tasks/bulk",
+        headers=headers,
+        json={"ids": [active_user_task.id]},
+    )
+    db_task = await crud.task.get_by_id(
+        db=db, owner_id=active_user.id, id=active_user_task.id
+    )
+    assert db_task
+
+
+# endregion
@@ -0,0 +1,60 @@
+import pytest
+from fastapi import status
+from httpx import AsyncClient
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app import crud, models
+from app.core.config import settings
+from app.tests.utils.auth import get_user_token_headers
+from app.tests.utils.user import random_active_user_dict
+
+# region delete own task - DELETE /tasks/{task_id}
+
+
+@pytest.mark.asyncio
+async def test_when_successfully_delete_task_by_id_must_return_204(
+    async_client: AsyncClient,
+    active_user: models.User,
+    active_user_task: models.Task,
+) -> None:
+    headers = get_user_token_headers(active_user)
+    response = await async_client.delete(
+        f"{settings.API_V1_STR}/tasks/{active_user_task.id}", headers=headers
+    )
+    assert response.status_code == status.HTTP_204_NO_CONTENT
+
+
+@pytest.mark.asyncio
+async def test_when_successfully_delete_task_by_id_it_must_be_persisted(
+    async_client: AsyncClient,
+    db: AsyncSession,
+    active_user: models.User,
+    active_user_task: models.Task,
+) -> None:
+    headers = get_user_token_headers(active_user)
+    await async_client.delete(
+        f"{settings.API_V1_STR}/tasks/{active_user_task.id}", headers=headers
+    )
+    db_task = await crud.task.get_by_id(
+        db=db, owner_id=active_user.id, id=active_user_task.id
+    )
+    assert db_task is None
+
+
+@pytest.mark.asyncio
+async def test_when_deleting_task_of_other_user_must_return_404(
+    async_client: AsyncClient,
+    db: AsyncSession,
+    active_user_task: models.Task,
+) -> None:
+    other_user = await crud.user.create(
+        db=db, user_in=random_active_user_dict()
+    )
+    headers = get_user_token_headers(other_user)
+    response = await async_client.delete(
+        f"{settings.API_V1_STR}/tasks/{active_user_task.id}", headers=headers
+    )
+    assert response.status_code == status.HTTP_404_NOT_FOUND
+
+
+# endregion
@@ -0,0 +1,200 @@
+import pytest
+from fastapi import status
+from httpx import AsyncClient
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app import crud, models
+from app.core.config import settings
+from app.tests.utils.auth import (
+    get_expired_user_token_headers,
+    get_user_token_headers,
+)
+from app.tests.utils.task import random_done_task_dict, random_task_dict
+from app.tests.utils.user import random_active_user_dict
+
+# region list own tasks - GET /tasks/
+
+
+@pytest.mark.asyncio
+async def test_when_listing_tasks_returns_status_200(
+    async_client: AsyncClient, active_user: models.User
+) -> None:
+    headers = get_user_token_headers(active_user)
+    response = await async_client.get(
+        f"{settings.API_V1_STR}/tasks/", headers=headers
+    )
+    assert response.status_code == status.HTTP_200_OK
+
+
+@pytest.mark.asyncio
+async def test_when_listing_tasks_returns_only_own_tasks(
+    async_client: AsyncClient,
+    db: AsyncSession,
+    active_user_task: models.Task,
+) -> None:
+    other_user = await crud.user.create(
+        db=db, user_in=random_active_user_dict()
+    )
+    await crud.task.create(
+        db=db, owner_id=other_user.id, task_in=random_task_dict()
+    )
+    headers = get_user_token_headers(other_user)
+    response = await async_client.get(
+        f"{settings.API_V1_STR}/tasks/", headers=headers
+    )
+    tasks = response.json()["items"]
+    assert all(task["owner_id"] == other_user.id for task in tasks)
+    assert len(tasks) == 1
+
+
+@pytest.mark.asyncio
+async def test_when_listing_tasks_the_not_done_tasks_must_come_first(
+    async_client: AsyncClient, db: AsyncSession, active_user: models.User
+) -> None:
+    done_task = await crud.task.create(
+        db=db, owner_id=active_user.id, task_in=random_done_task_dict()
+    )
+    not_done_task = await crud.task.create(
+        db=db, owner_id=active_user.id, task_in=random_task_dict()
+    )
+    headers = get_user_token_headers(active_user)
+    response = await async_client.get(
+        f"{settings.API_V1_STR}/tasks/", headers=headers
+    )
+    ids = [task["id"] for task in response.json()["items"]]
+    assert ids == [not_done_task.id, done_task.id]
+
+
+@pytest.mark.asyncio
+async def test_when_listing_tasks_the_next_cursor_must_return_the_next_page(
+    async_client: AsyncClient, db: AsyncSession, active_user: models.User
+) -> None:
+    task_ids = []
+    for task_in in [random_done_task_dict(), random_task_dict()] * 2:
+        task = await crud.task.create(
+            db=db, owner_id=active_user.id, task_in=task_in
+        )
+        task_ids.append((task.is_done, task.id))
+    headers = get_user_token_headers(active_user)
+    ids = []
+    cursor = None
+    while True:
+        params = {"limit": 3} | ({"cursor": cursor} if cursor else {})
+        response = await async_client.get(
+            f"{settings.API_V1_STR}/tasks/", headers=headers, params=params
+        )
+        ids.extend(task["id"] for task in response.json()["items"])
+        cursor = response.json()["next_cursor"]
+        if not cursor:
+            break
+    assert ids == [task_id for _, task_id in sorted(task_ids)]
+
+
+@pytest.mark.asyncio
+async def test_when_listing_tasks_if_cursor_is_invalid_must_return_400(
+    async_client: AsyncClient, active_user: models.User
+) -> None:
+    headers = get_user_token_headers(active_user)
+    response = await async_client.get(
+        f"{settings.API_V1_STR}/tasks/",
+        headers=headers,
+        params={"cursor": "invalid"},
+    )
+    assert response.status_code == status.HTTP_400_BAD_REQUEST
+
+
+@pytest.mark.asyncio
+async def test_when_listing_tasks_if_user_is_not_authenticated_must_return_401(
+    async_client: AsyncClient,
+) -> None:
+    response = await async_client.get(f"{settings.API_V1_STR}/tasks/")
+    assert response.status_code == status.HTTP_401_UNAUTHORIZED
+
+
+@pytest.mark.asyncio
+async def test_when_listing_tasks_if_token_is_expired_must_return_403(
+    async_client: AsyncClient, active_user: models.User
+) -> None:
+    headers = get_expired_user_token_headers(active_user)
+    response = await async_client.get(
+        f"{settings.API_V1_STR}/tasks/", headers=headers
+    )
+    assert response.status_code == status.HTTP_403_FORBIDDEN
+
+
+@pytest.mark.asyncio
+async def test_when_listing_tasks_if_token_user_is_not_active_must_return_403(
+    async_client: AsyncClient, inactive_user: models.User
+) -> None:
+    headers = get_user_token_headers(inactive_user)
+    response = await async_client.get(
+        f"{settings.API_V1_STR}/tasks/", headers=headers
+    )
+    assert response.status_code == status.HTTP_403_FORBIDDEN
+
+
+# endregion
+
+# region get own task - GET /tasks/{task_id}
+
+
+@pytest.mark.asyncio
+async def test_when_successfully_get_task_by_id_must_return_200(
+    async_client: AsyncClient,
+    active_user: models.User,
+    active_user_task: models.Task,
+) -> None:
+    headers = get_user_token_headers(active_user)
+    response = await async_client.get(
+        f"{settings.API_V1_STR}/tasks/{active_user_task.id}", headers=headers
+    )
+    assert response.status_code == status.HTTP_200_OK
+
+
+@pytest.mark.asyncio
+async def test_when_successfully_get_task_by_id_it_must_be_returned(
+    async_client: AsyncClient,
+    active_user: models.User,
+    active_user_task: models.Task,
+) -> None:
+    headers = get_user_token_headers(active_user)
+    response = await async_client.get(
+        f"{settings.API_V1_STR}/tasks/{active_user_task.id}", headers=headers
+    )
+    assert response.json() == {
+        "id": active_user_task.id,
+        "title": active_user_task.title,
+        "description": active_user_task.description,
+        "is_done": active_user_task.is_done,
+        "owner_id": active_user.id,
+    }
+
+
+@pytest.mark.asyncio
+async def test_when_getting_task_of_other_user_by_id_must_return_404(
+    async_client: AsyncClient,
+    db: AsyncSession,
+    active_user_task: models.Task,
+) -> None:
+    other_user = await crud.user.create(
+        db=db, user_in=random_active_user_dict()
+    )
+    headers = get_user_token_headers(other_user)
+    response = await async_client.get(
+        f"{settings.API_V1_STR}/tasks/{active_user_task.id}", headers=headers
+    )
+    assert response.status_code == status.HTTP_404_NOT_FOUND
+
+
+@pytest.mark.asyncio
+async def test_when_getting_task_by_id_if_not_found_must_return_404(
+    async_client: AsyncClient, active_user: models.User
+) -> None:
+    headers = get_user_token_headers(active_user)
+    response = await async_client.get(
+        f"{settings.API_V1_STR}/tasks/0", headers=headers
+    )
+    assert response.status_code == status.HTTP_404_NOT_FOUND
+
+
+# endregion
@@ -0,0 +1,104 @@
+import pytest
+from fastapi import status
+from httpx import AsyncClient
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app import crud, models
+from app.core.config import settings
+from app.tests.utils.auth import get_user_token_headers
+from app.tests.utils.task import random_task_dict
+
+# region create task - POST /tasks/
+
+
+@pytest.mark.asyncio
+async def test_when_task_is_created_returns_status_201(
+    async_client: AsyncClient, active_user: models.User
+) -> None:
+    headers = get_user_token_headers(active_user)
+    response = await async_client.post(
+        f"{settings.API_V1_STR}/tasks/",
+        headers=headers,
+        json=random_task_dict(),
+    )
+    assert response.status_code == status.HTTP_201_CREATED
+
+
+@pytest.mark.asyncio
+async def test_when_task_is_created_it_must_be_returned(
+    async_client: AsyncClient, active_user: models.User
+) -> None:
+    payload = random_task_dict()
+    headers = get_user_token_headers(active_user)
+    response = await async_client.post(
+        f"{settings.API_V1_STR}/tasks/", headers=headers, json=payload
+    )
+    assert payload.items() <= response.json().items()
+
+
+@pytest.mark.asyncio
+async def test_when_task_is_created_it_must_be_persisted(
+    async_client: AsyncClient, db: AsyncSession, active_user: models.User
+) -> None:
+    headers = get_user_token_headers(active_user)
+    response = await async_client.post(
+        f"{settings.API_V1_STR}/tasks/",
+        headers=headers,
+        json=random_task_dict(),
+    )
+    db_task = await crud.task.get_by_id(
+        db=db, owner_id=active_user.id, id=response.json()["id"]
+    )
+    assert db_task
+
+
+@pytest.mark.asyncio
+async def test_when_task_is_created_the_default_is_done_must_be_false(
+    async_client: AsyncClient, active_user: models.User
+) -> None:
+    payload = random_task_dict()
+    del payload["is_done"]
+    headers = get_user_token_headers(active_user)
+    response = await async_client.post(
+        f"{settings.API_V1_STR}/tasks/", headers=headers, json=payload
+    )
+    assert response.json()["is_done"] is False
+
+
+@pytest.mark.asyncio
+async def test_when_creating_task_the_title_must_have_more_than_2_characters(
+    async_client: AsyncClient, active_user: models.User
+) -> None:
+    payload = random_task_dict()
+    payload["title"] = "AA"
+    headers = get_user_token_headers(active_user)
+    response = await async_client.post(
+        f"{settings.API_V1_STR}/tasks/", headers=headers, json=payload
+    )
+    assert response.status_code == status.HTTP_422_UNPROCESSABLE_ENTITY
+
+
+@pytest.mark.asyncio
+async def test_when_creating_task_description_must_be_up_to_140_chars(
+    async_client: AsyncClient, active_user: models.User
+) -> None:
+    payload = random_task_dict()
+    payload["description"] = "A" * 141
+    headers = get_user_token_headers(active_user)
+    response = await async_client.post(
+        f"{settings.API_V1_STR}/tasks/", headers=headers, json=payload
+    )
+    assert response.status_code == status.HTTP_422_UNPROCESSABLE_ENTITY
+
+
+@pytest.mark.asyncio
+async def test_when_creating_task_if_user_is_not_authenticated_must_return_401(
+    async_client: AsyncClient,
+) -> None:
+    response = await async_client.post(
+        f"{settings.API_V1_STR}/tasks/", json=random_task_dict()
+    )
+    assert response.status_code == status.HTTP_401_UNAUTHORIZED
+
+
+# endregion
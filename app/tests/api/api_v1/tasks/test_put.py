@@ -0,0 +1,97 @@
+import pytest
+from fastapi import status
+from httpx import AsyncClient
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app import crud, models
+from app.core.config import settings
+from app.tests.utils.auth import get_user_token_headers
+from app.tests.utils.task import random_done_task_dict
+from app.tests.utils.user import random_active_user_dict
+
+# region update own task - PUT /tasks/{task_id}
+
+
+@pytest.mark.asyncio
+async def test_when_successfully_update_task_by_id_must_return_200(
+    async_client: AsyncClient,
+    active_user: models.User,
+    active_user_task: models.Task,
+) -> None:
+    headers = get_user_token_headers(active_user)
+    response = await async_client.put(
+        f"{settings.API_V1_STR}/tasks/{active_user_task.id}",
+        headers=headers,
+        json=random_done_task_dict(),
+    )
+    assert response.status_code == status.HTTP_200_OK
+
+
+@pytest.mark.asyncio
+async def test_when_successfully_update_task_by_id_it_must_be_returned(
+    async_client: AsyncClient,
+    active_user: models.User,
+    active_user_task: models.Task,
+) -> None:
+    payload = random_done_task_dict()
+    headers = get_user_token_headers(active_user)
+    response = await async_client.put(
+        f"{settings.API_V1_STR}/tasks/{active_user_task.id}",
+        headers=headers,
+        json=payload,
+    )
+    assert payload.items() <= response.json().items()
+
+
+@pytest.mark.asyncio
+async def test_when_successfully_update_task_by_id_it_must_be_persisted(
+    async_client: AsyncClient,
+    db: AsyncSession,
+    active_user: models.User,
+    active_user_task: models.Task,
+) -> None:
+    payload = random_done_task_dict()
+    headers = get_user_token_headers(active_user)
+    await async_client.put(
+        f"{settings.API_V1_STR}/tasks/{active_user_task.id}",
+        headers=headers,
+        json=payload,
+    )
+    await db.refresh(active_user_task)
+    assert active_user_task.title == payload["title"]
+
+
+@pytest.mark.asyncio
+async def test_when_updating_task_of_other_user_must_return_404(
+    async_client: AsyncClient,
+    db: AsyncSession,
+    active_user_task: models.Task,
+) -> None:
+    other_user = await crud.user.create(
+        db=db, user_in=random_active_user_dict()
+    )
+    headers = get_user_token_headers(other_user)
+    response = await async_client.put(
+        f"{settings.API_V1_STR}/tasks/{active_user_task.id}",
+        headers=headers,
+        json=random_done_task_dict(),
+    )
+    assert response.status_code == status.HTTP_404_NOT_FOUND
+
+
+@pytest.mark.asyncio
+async def test_when_updating_task_if_payload_is_incomplete_must_return_422(
+    async_client: AsyncClient,
+    active_user: models.User,
+    active_user_task: models.Task,
+) -> None:
+    headers = get_user_token_headers(active_user)
+    response = await async_client.put(
+        f"{settings.API_V1_STR}/tasks/{active_user_task.id}",
+        headers=headers,
+        json={"is_done": True},
+    )
+    assert response.status_code == status.HTTP_422_UNPROCESSABLE_ENTITY
+
+
+# endregion
@@ -0,0 +1,87 @@
+import pytest
+from fastapi import status
+from httpx import AsyncClient
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app import crud, models
+from app.core.config import settings
+from app.tests.utils.auth import get_user_token_headers
+from app.tests.utils.task import random_task_dict
+from app.tests.utils.user import random_active_user_dict
+
+# region search own tasks - GET /tasks/search
+
+
+@pytest.mark.asyncio
+async def test_when_searching_tasks_returns_the_matching_tasks(
+    async_client: AsyncClient, db: AsyncSession, active_user: models.User
+) -> None:
+    task = await crud.task.create(
+        db=db,
+        owner_id=active_user.id,
+        task_in={"title": "Renew passport", "description": "at the office"},
+    )
+    await crud.task.create(
+        db=db, owner_id=active_user.id, task_in=random_task_dict()
+    )
+    headers = get_user_token_headers(active_user)
+    response = await async_client.get(
+        f"{settings.API_V1_STR}/tasks/search",
+        params={"q": "passport"},
+        headers=headers,
+    )
+    assert response.status_code == status.HTTP_200_OK
+    assert response.json() == [
+        {
+            "id": task.id,
+            "title": "Renew passport",
+            "description": "at the office",
+            "is_done": False,
+            "owner_id": active_user.id,
+        }
+    ]
+
+
+@pytest.mark.asyncio
+async def test_when_searching_tasks_returns_only_own_tasks(
+    async_client: AsyncClient, db: AsyncSession, active_user: models.User
+) -> None:
+    other_user = await crud.user.create(
+        db=db, user_in=random_active_user_dict()
+    )
+    await crud.task.create(
+        db=db,
+        owner_id=other_user.id,
+        task_in={"title": "Secret armadillo", "description": None},
+    )
+    headers = get_user_token_headers(active_user)
+    response = await async_client.get(
+        f"{settings.API_V1_STR}/tasks/search",
+        params={"q": "armadillo"},
+        headers=headers,
+    )
+    assert response.json() == []
+
+
+@pytest.mark.asyncio
+async def test_when_searching_tasks_without_query_returns_status_422(
+    async_client: AsyncClient, active_user: models.User
+) -> None:
+    headers = get_user_token_headers(active_user)
+    response = await async_client.get(
+        f"{settings.API_V1_STR}/tasks/search", headers=headers
+    )
+    assert response.status_code == status.HTTP_422_UNPROCESSABLE_ENTITY
+
+
+@pytest.mark.asyncio
+async def test_when_searching_tasks_without_token_returns_status_401(
+    async_client: AsyncClient,
+) -> None:
+    response = await async_client.get(
+        f"{settings.API_V1_STR}/tasks/search", params={"q": "passport"}
+    )
+    assert response.status_code == status.HTTP_401_UNAUTHORIZED
+
+
+# endregion
@@ -1,10 +1,16 @@
+import asyncio
+
 import pytest
 from fastapi import status
 from httpx import AsyncClient
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app import crud
+from app.core import rate_limit, security
+from app.core.cache import ExpiringDict, MemoryCacheBackend
 from app.core.config import settings
+from app.tests.utils.auth import get_stateless_user_token_headers
+from app.tests.utils.db import capture_statements
 from app.tests.utils.user import random_active_user_dict, random_user_dict
 
 
@@ -34,6 +40,22 @@ async def test_when_credentials_are_valid_returns_status_200(
     assert response.status_code == status.HTTP_200_OK
 
 
+@pytest.mark.asyncio
+async def test_when_email_is_in_another_case_returns_status_200(
+    async_client: AsyncClient, db: AsyncSession
+) -> None:
+    user_dict = random_active_user_dict()
+    await crud.user.create(db=db, user_in=user_dict)
+    payload = {
+        "username": user_dict["email"].upper(),
+        "password": user_dict["password"],
+    }
+    response = await async_client.post(
+        f"{settings.API_V1_STR}/login/access-token", data=payload
+    )
+    assert response.status_code == status.HTTP_200_OK
+
+
 @pytest.mark.asyncio
 async def test_when_credentials_are_invalid_returns_status_401(
     async_client: AsyncClient, db: AsyncSession
@@ -64,3 +86,301 @@ async def test_when_user_is_inactive_returns_status_400(
         f"{settings.API_V1_STR}/login/access-token", data=payload
     )
     assert response.status_code == status.HTTP_400_BAD_REQUEST
+
+
+@pytest.mark.asyncio
+async def test_when_password_hasher_is_busy_returns_status_503(
+    async_client: AsyncClient,
+    db: AsyncSession,
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    user_dict = random_active_user_dict()
+    await crud.user.create(db=db, user_in=user_dict)
+    monkeypatch.setattr(
+        security.password_hasher, "pending", settings.PASSWORD_HASH_WORKERS
+    )
+    monkeypatch.setattr(security.password_hasher, "max_queue", 0)
+    payload = {
+        "username": user_dict.get("email"),
+        "password": user_dict.get("password"),
+    }
+    response = await async_client.post(
+        f"{settings.API_V1_STR}/login/access-token", data=payload
+    )
+    assert response.status_code == status.HTTP_503_SERVICE_UNAVAILABLE
+
+
+# region stateless auth - STATELESS_AUTH
+
+
+@pytest.fixture
+def stateless_auth(monkeypatch) -> None:
+    monkeypatch.setattr(settings, "STATELESS_AUTH", True)
+
+
+@pytest.mark.asyncio
+async def test_when_stateless_auth_the_token_must_carry_the_user_claims(
+    async_client: AsyncClient, db: AsyncSession, stateless_auth
+) -> None:
+    user_dict = random_active_user_dict()
+    user = await crud.user.create(db=db, user_in=user_dict)
+    response = await async_client.post(
+        f"{settings.API_V1_STR}/login/access-token",
+        data={
+            "username": user_dict["email"],
+            "password": user_dict["password"],
+        },
+    )
+    payload = security.decode_jwt_token(response.json()["access_token"])
+    assert payload["email"] == user.email
+    assert payload["is_active"] is True
+    assert payload["is_superuser"] is False
+    assert payload["ver"] == user.token_version
+
+
+@pytest.mark.asyncio
+async def test_when_stateless_auth_reading_own_user_must_not_query_the_db(
+    async_client: AsyncClient, db: AsyncSession, stateless_auth
+) -> None:
+    user = await crud.user.create(db=db, user_in=random_active_user_dict())
+    headers = get_stateless_user_token_headers(user)
+    # The first one reads the token version, unless the store is shared.
+    await async_client.get(f"{settings.API_V1_STR}/users/me", headers=headers)
+    with capture_statements() as statements:
+        response = await async_client.get(
+            f"{settings.API_V1_STR}/users/me", headers=headers
+        )
+    assert response.status_code == status.HTTP_200_OK
+    assert response.json()["email"] == user.email
+    assert statements == []
+
+
+@pytest.mark.asyncio
+async def test_stateless_tokens_issued_before_an_update_must_be_revoked(
+    async_client: AsyncClient, db: AsyncSession, stateless_auth
+) -> None:
+    user = await crud.user.create(db=db, user_in=random_active_user_dict())
+    headers = get_stateless_user_token_headers(user)
+    updated_user = await crud.user.update(
+        db=db, db_user=user, user_in={"is_active": False}
+    )
+    response = await async_client.get(
+        f"{settings.API_V1_STR}/users/me", headers=headers
+    )
+    assert response.status_code == status.HTTP_403_FORBIDDEN
+    new_headers = get_stateless_user_token_headers(updated_user)
+    response = await async_client.get(
+        f"{settings.API_V1_STR}/tasks/", headers=new_headers
+    )
+    assert response.status_code == status.HTTP_403_FORBIDDEN
+    assert response.json()["detail"] == "Inactive user"
+
+
+@pytest.mark.asyncio
+async def test_when_stateless_auth_revocations_of_other_processes_must_apply(
+    async_client: AsyncClient, db: AsyncSession, stateless_auth, monkeypatch
+) -> None:
+    user = await crud.user.create(db=db, user_in=random_active_user_dict())
+    headers = get_stateless_user_token_headers(user)
+    await crud.user.update(db=db, db_user=user, user_in={"full_name": "x"})
+    # Versions of a process that didn't make the update
+    monkeypatch.setattr(security.token_versions, "versions", ExpiringDict())
+    response = await async_client.get(
+        f"{settings.API_V1_STR}/users/me", headers=headers
+    )
+    assert response.status_code == status.HTTP_403_FORBIDDEN
+
+
+# endregion
+
+
+# region refresh token - POST /login/refresh
+
+
+async def login(async_client: AsyncClient, user_dict: dict) -> dict:
+    response = await async_client.post(
+        f"{settings.API_V1_STR}/login/access-token",
+        data={
+            "username": user_dict["email"],
+            "password": user_dict["password"],
+        },
+    )
+    return response.json()
+
+
+@pytest.mark.asyncio
+async def test_when_credentials_are_valid_a_refresh_token_must_be_returned(
+    async_client: AsyncClient, db: AsyncSession
+) -> None:
+    user_dict = random_active_user_dict()
+    await crud.user.create(db=db, user_in=user_dict)
+    tokens = await login(async_client, user_dict)
+    payload = security.decode_jwt_token(tokens["refresh_token"])
+    assert payload["type"] == security.REFRESH_TOKEN_TYPE
+
+
+@pytest.mark.asyncio
+async def test_when_refreshing_the_password_must_not_be_verified(
+    async_client: AsyncClient, db: AsyncSession, monkeypatch
+) -> None:
+    user_dict = random_active_user_dict()
+    await crud.user.create(db=db, user_in=user_dict)
+    tokens = await login(async_client, user_dict)
+
+    async def verify_and_update_password_async(*args):
+        raise AssertionError("The password must not be verified")
+
+    monkeypatch.setattr(
+        crud.crud_user,
+        "verify_and_update_password_async",
+        verify_and_update_password_async,
+    )
+    response = await async_client.post(
+        f"{settings.API_V1_STR}/login/refresh",
+        json={"refresh_token": tokens["refresh_token"]},
+    )
+    assert response.status_code == status.HTTP_200_OK
+    new_tokens = response.json()
+    assert new_tokens["refresh_token"] != tokens["refresh_token"]
+    response = await async_client.get(
+        f"{settings.API_V1_STR}/users/me",
+        headers={"Authorization": f"Bearer {new_tokens['access_token']}"},
+    )
+    assert response.json()["email"] == user_dict["email"]
+
+
+@pytest.mark.asyncio
+async def test_when_refresh_token_is_reused_must_return_403(
+    async_client: AsyncClient, db: AsyncSession
+) -> None:
+    user_dict = random_active_user_dict()
+    await crud.user.create(db=db, user_in=user_dict)
+    tokens = await login(async_client, user_dict)
+    body = {"refresh_token": tokens["refresh_token"]}
+    await async_client.post(f"{settings.API_V1_STR}/login/refresh", json=body)
+    response = await async_client.post(
+        f"{settings.API_V1_STR}/login/refresh", json=body
+    )
+    assert response.status_code == status.HTTP_403_FORBIDDEN
+
+
+@pytest.mark.asyncio
+async def test_when_refresh_token_is_reused_concurrently_only_one_must_pass(
+    async_client: AsyncClient, db: AsyncSession
+) -> None:
+    user_dict = random_active_user_dict()
+    await crud.user.create(db=db, user_in=user_dict)
+    tokens = await login(async_client, user_dict)
+    body = {"refresh_token": tokens["refresh_token"]}
+    responses = await asyncio.gather(
+        *(
+            async_client.post(
+                f"{settings.API_V1_STR}/login/refresh", json=body
+            )
+            for _ in range(5)
+        )
+    )
+    status_codes = [response.status_code for response in responses]
+    assert status_codes.count(status.HTTP_200_OK) == 1
+    assert status_codes.count(status.HTTP_403_FORBIDDEN) == 4
+
+
+@pytest.mark.asyncio
+async def test_when_refreshing_with_an_access_token_must_return_403(
+    async_client: AsyncClient, db: AsyncSession
+) -> None:
+    user_dict = random_active_user_dict()
+    await crud.user.create(db=db, user_in=user_dict)
+    tokens = await login(async_client, user_dict)
+    response = await async_client.post(
+        f"{settings.API_V1_STR}/login/refresh",
+        json={"refresh_token": tokens["access_token"]},
+    )
+    assert response.status_code == status.HTTP_403_FORBIDDEN
+
+
+@pytest.mark.asyncio
+async def test_when_refresh_token_is_used_as_access_token_must_return_403(
+    async_client: AsyncClient, db: AsyncSession
+) -> None:
+    user_dict = random_active_user_dict()
+    await crud.user.create(db=db, user_in=user_dict)
+    tokens = await login(async_client, user_dict)
+    response = await async_client.get(
+        f"{settings.API_V1_STR}/users/me",
+        headers={"Authorization": f"Bearer {tokens['refresh_token']}"},
+    )
+    assert response.status_code == status.HTTP_403_FORBIDDEN
+
+
+@pytest.mark.asyncio
+async def test_when_user_was_updated_after_login_refresh_must_return_403(
+    async_client: AsyncClient, db: AsyncSession
+) -> None:
+    user_dict = random_active_user_dict()
+    user = await crud.user.create(db=db, user_in=user_dict)
+    tokens = await login(async_client, user_dict)
+    await crud.user.update(
+        db=db, db_user=user, user_in={"password": "new-password"}
+    )
+    response = await async_client.post(
+        f"{settings.API_V1_STR}/login/refresh",
+        json={"refresh_token": tokens["refresh_token"]},
+    )
+    assert response.status_code == status.HTTP_403_FORBIDDEN
+
+
+# endregion
+
+
+# region rate limit - POST /login/access-token
+
+
+@pytest.mark.asyncio
+async def test_when_account_runs_out_of_attempts_must_return_429(
+    async_client: AsyncClient, db: AsyncSession, monkeypatch
+) -> None:
+    user_dict = random_active_user_dict()
+    await crud.user.create(db=db, user_in=user_dict)
+    payload = {"username": user_dict["email"], "password": "wrong-password"}
+    for _ in range(settings.LOGIN_RATE_LIMIT_ACCOUNT_BURST):
+        await async_client.post(
+            f"{settings.API_V1_STR}/login/access-token", data=payload
+        )
+
+    async def verify_and_update_password_async(*args):
+        raise AssertionError("The password must not be verified")
+
+    monkeypatch.setattr(
+        crud.crud_user,
+        "verify_and_update_password_async",
+        verify_and_update_password_async,
+    )
+    response = await async_client.post(
+        f"{settings.API_V1_STR}/login/access-token",
+        data={**payload, "username": user_dict["email"].upper()},
+    )
+    assert response.status_code == status.HTTP_429_TOO_MANY_REQUESTS
+    assert int(response.headers["Retry-After"]) > 0
+
+
+@pytest.mark.asyncio
+async def test_when_ip_runs_out_of_attempts_must_return_429(
+    async_client: AsyncClient, monkeypatch
+) -> None:
+    monkeypatch.setattr(
+        rate_limit,
+        "login_ip_limiter",
+        rate_limit.RateLimiter(
+            MemoryCacheBackend(maxsize=10, ttl=60), burst=1, per_minute=1
+        ),
+    )
+    for number in range(2):
+        response = await async_client.post(
+            f"{settings.API_V1_STR}/login/access-token",
+            data={"username": f"{number}@test.com", "password": "password"},
+        )
+    assert response.status_code == status.HTTP_429_TOO_MANY_REQUESTS
+
+
+# endregion
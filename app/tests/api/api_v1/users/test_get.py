@@ -3,7 +3,7 @@ from fastapi import status
 from httpx import AsyncClient
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from app import crud, models
+from app import crud, models, schemas
 from app.core.config import settings
 from app.tests.utils.user import random_active_user_dict
 from app.tests.utils.auth import (
@@ -185,3 +185,76 @@ async def test_when_getting_own_user_if_user_not_exist_must_return_404(
 
 
 # endregion
+
+# region list users - GET /users/
+
+
+@pytest.mark.asyncio
+async def test_when_listing_users_if_token_user_is_superuser_must_return_200(
+    async_client: AsyncClient, active_superuser: models.User
+) -> None:
+    headers = get_user_token_headers(active_superuser)
+    response = await async_client.get(
+        f"{settings.API_V1_STR}/users/", headers=headers
+    )
+    assert response.status_code == status.HTTP_200_OK
+
+
+@pytest.mark.asyncio
+async def test_when_listing_users_as_a_non_superuser_must_return_403(
+    async_client: AsyncClient, active_user: models.User
+) -> None:
+    headers = get_user_token_headers(active_user)
+    response = await async_client.get(
+        f"{settings.API_V1_STR}/users/", headers=headers
+    )
+    assert response.status_code == status.HTTP_403_FORBIDDEN
+
+
+@pytest.mark.asyncio
+async def test_when_listing_users_the_next_cursor_must_return_the_next_page(
+    async_client: AsyncClient, db: AsyncSession, active_superuser: models.User
+) -> None:
+    for _ in range(2):
+        await crud.user.create(db=db, user_in=random_active_user_dict())
+    headers = get_user_token_headers(active_superuser)
+    first_page = await async_client.get(
+        f"{settings.API_V1_STR}/users/", headers=headers, params={"limit": 1}
+    )
+    second_page = await async_client.get(
+        f"{settings.API_V1_STR}/users/",
+        headers=headers,
+        params={"limit": 1, "cursor": first_page.json()["next_cursor"]},
+    )
+    first_id = first_page.json()["items"][0]["id"]
+    second_id = second_page.json()["items"][0]["id"]
+    assert second_id > first_id
+
+
+@pytest.mark.asyncio
+async def test_when_listing_users_the_last_page_must_not_have_next_cursor(
+    async_client: AsyncClient, active_superuser: models.User
+) -> None:
+    headers = get_user_token_headers(active_superuser)
+    response = await async_client.get(
+        f"{settings.API_V1_STR}/users/",
+        headers=headers,
+        params={"limit": 1000},
+    )
+    assert response.json()["next_cursor"] is None
+
+
+@pytest.mark.asyncio
+async def test_when_listing_users_the_items_must_have_only_the_public_fields(
+    async_client: AsyncClient, active_superuser: models.User
+) -> None:
+    headers = get_user_token_headers(active_superuser)
+    response = await async_client.get(
+        f"{settings.API_V1_STR}/users/", headers=headers
+    )
+    assert response.headers["content-type"] == "application/json"
+    for item in response.json()["items"]:
+        assert set(item) == set(schemas.User.__fields__)
+
+
+# endregion
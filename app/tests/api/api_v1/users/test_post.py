@@ -4,6 +4,7 @@ from httpx import AsyncClient
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app import crud
+from app.core import security
 from app.core.config import settings
 from app.tests.utils.user import random_user_dict
 
@@ -62,4 +63,35 @@ async def test_when_creating_user_if_that_user_already_exist_returns_status_400(
     assert response.status_code == status.HTTP_400_BAD_REQUEST
 
 
+@pytest.mark.asyncio
+async def test_when_user_is_created_a_verification_email_must_be_enqueued(
+    async_client: AsyncClient, verification_emails
+) -> None:
+    user_dict = random_user_dict()
+    response = await async_client.post(
+        f"{settings.API_V1_STR}/users/", json=user_dict
+    )
+    [(email_to, first_name, token)] = verification_emails
+    assert email_to == user_dict["email"]
+    assert user_dict["full_name"].startswith(first_name)
+    payload = security.decode_jwt_token(token)
+    assert payload["type"] == security.VERIFICATION_TOKEN_TYPE
+    assert payload["sub"] == response.json()["id"]
+
+
+@pytest.mark.asyncio
+async def test_verification_token_must_not_be_accepted_as_access_token(
+    async_client: AsyncClient, verification_emails
+) -> None:
+    await async_client.post(
+        f"{settings.API_V1_STR}/users/", json=random_user_dict()
+    )
+    [(_, _, token)] = verification_emails
+    response = await async_client.get(
+        f"{settings.API_V1_STR}/users/me",
+        headers={"Authorization": f"Bearer {token}"},
+    )
+    assert response.status_code == status.HTTP_403_FORBIDDEN
+
+
 # endregion
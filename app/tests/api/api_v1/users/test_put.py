@@ -381,6 +381,49 @@ async def test_when_updating_own_user_to_superuser_if_user_is_superuser_must_ret
     assert response.status_code == status.HTTP_200_OK
 
 
+@pytest.mark.asyncio
+async def test_when_updating_own_user_to_an_email_in_use_must_return_400(
+    async_client: AsyncClient, db: AsyncSession, active_user: models.User
+) -> None:
+    other_user = await crud.user.create(
+        db=db, user_in=random_active_user_dict()
+    )
+    payload = random_active_user_dict()
+    payload["email"] = other_user.email.upper()
+    headers = get_user_token_headers(active_user)
+    response = await async_client.put(
+        f"{settings.API_V1_STR}/users/me", headers=headers, json=payload
+    )
+    assert response.status_code == status.HTTP_400_BAD_REQUEST
+    response = await async_client.get(
+        f"{settings.API_V1_STR}/users/me", headers=headers
+    )
+    assert response.json()["email"] == active_user.email
+
+
+# endregion
+
+# region user cache
+
+
+@pytest.mark.asyncio
+async def test_when_own_user_is_deactivated_it_must_take_effect_immediately(
+    async_client: AsyncClient, active_user: models.User
+) -> None:
+    headers = get_user_token_headers(active_user)
+    # Warm up the user cache
+    await async_client.get(f"{settings.API_V1_STR}/users/me", headers=headers)
+    await async_client.put(
+        f"{settings.API_V1_STR}/users/me",
+        headers=headers,
+        json=random_user_dict(),
+    )
+    response = await async_client.get(
+        f"{settings.API_V1_STR}/users/{active_user.id}", headers=headers
+    )
+    assert response.status_code == status.HTTP_403_FORBIDDEN
+
+
 # endregion
 
 # region send verification email - POST /users/{id}/verification -- talvez?
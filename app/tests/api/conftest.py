@@ -1,7 +1,10 @@
+from typing import List, Tuple
+
 import pytest
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app import crud, models
+from app.core import jobs
 from app.tests.utils.user import (
     random_active_superuser_dict,
     random_active_user_dict,
@@ -9,6 +12,20 @@ from app.tests.utils.user import (
 )
 
 
+@pytest.fixture(autouse=True)
+def verification_emails(monkeypatch) -> List[Tuple[str, str, str]]:
+    # Recorded instead of sent, the tests have no broker nor SMTP server.
+    emails = []
+
+    async def enqueue_verification_email(*args: str) -> None:
+        emails.append(args)
+
+    monkeypatch.setattr(
+        jobs, "enqueue_verification_email", enqueue_verification_email
+    )
+    return emails
+
+
 @pytest.fixture()
 async def active_user(db: AsyncSession) -> models.User:
     user_dict = random_active_user_dict()
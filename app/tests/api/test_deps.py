@@ -0,0 +1,119 @@
+from contextlib import asynccontextmanager
+from typing import AsyncIterator
+
+import pytest
+from fastapi import status
+from httpx import AsyncClient
+from sqlalchemy.ext.asyncio import AsyncSession
+from starlette.requests import Request
+
+from app import crud, models
+from app.api import deps
+from app.core.cache import MemoryCacheBackend, user_cache
+from app.core.config import settings
+from app.core.security import create_jwt_token
+from app.database.session import SessionRouter, async_session
+from app.tests.utils.auth import get_user_token_headers
+from app.tests.utils.user import random_active_user_dict
+
+
+def create_request(method: str, authorization: str = "") -> Request:
+    headers = []
+    if authorization:
+        headers.append((b"authorization", authorization.encode()))
+    return Request({"type": "http", "method": method, "headers": headers})
+
+
+def test_client_key_must_be_the_token_subject() -> None:
+    token = create_jwt_token(subject=42)
+    request = create_request("GET", f"Bearer {token}")
+    assert deps.get_client_key(request) == "42"
+
+
+@pytest.mark.parametrize("authorization", ["", "Bearer invalid", "Basic x"])
+def test_client_key_must_be_none_without_a_valid_token(
+    authorization: str,
+) -> None:
+    assert deps.get_client_key(create_request("GET", authorization)) is None
+
+
+class FakeSessionFactory:
+    def __init__(self, name: str) -> None:
+        self.name = name
+
+    @asynccontextmanager
+    async def __call__(self) -> AsyncIterator[str]:
+        yield self.name
+
+
+@pytest.mark.asyncio
+async def test_get_db_must_route_the_reads_after_a_write_to_the_writer(
+    monkeypatch,
+) -> None:
+    monkeypatch.setattr(
+        deps,
+        "session_router",
+        SessionRouter(
+            writer=FakeSessionFactory("writer"),
+            reader=FakeSessionFactory("reader"),
+            recent_writers=MemoryCacheBackend(maxsize=10, ttl=60),
+        ),
+    )
+    headers = f"Bearer {create_jwt_token(subject=1)}"
+    sessions = []
+    for method in ("GET", "POST", "GET"):
+        async for db in deps.get_db(create_request(method, headers)):
+            sessions.append(db)
+    assert sessions == ["reader", "writer", "writer"]
+
+
+@pytest.fixture
+def broken_replica(monkeypatch) -> SessionRouter:
+    """Routes to the primary the requests that must not use the replica."""
+    router = SessionRouter(
+        writer=async_session,
+        reader=FakeSessionFactory("reader"),
+        recent_writers=MemoryCacheBackend(maxsize=10, ttl=60),
+    )
+    monkeypatch.setattr(deps, "session_router", router)
+    return router
+
+
+@pytest.mark.asyncio
+async def test_token_user_must_be_loaded_from_the_writer(
+    async_client: AsyncClient,
+    active_user: models.User,
+    broken_replica: SessionRouter,
+) -> None:
+    await user_cache.delete(str(active_user.id))
+    response = await async_client.get(
+        f"{settings.API_V1_STR}/users/me",
+        headers=get_user_token_headers(active_user),
+    )
+    assert response.status_code == status.HTTP_200_OK
+    assert response.json()["id"] == active_user.id
+
+
+@pytest.mark.asyncio
+async def test_created_user_must_be_marked_as_recent_writer(
+    async_client: AsyncClient, broken_replica: SessionRouter
+) -> None:
+    response = await async_client.post(
+        f"{settings.API_V1_STR}/users/", json=random_active_user_dict()
+    )
+    user_id = str(response.json()["id"])
+    assert await broken_replica.recent_writers.get(user_id)
+
+
+@pytest.mark.asyncio
+async def test_logged_in_user_must_be_marked_as_recent_writer(
+    async_client: AsyncClient, db: AsyncSession, broken_replica: SessionRouter
+) -> None:
+    user_dict = random_active_user_dict()
+    user = await crud.user.create(db=db, user_in=user_dict)
+    response = await async_client.post(
+        f"{settings.API_V1_STR}/login/access-token",
+        data={"username": user.email, "password": user_dict["password"]},
+    )
+    assert response.status_code == status.HTTP_200_OK
+    assert await broken_replica.recent_writers.get(str(user.id))
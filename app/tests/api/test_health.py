@@ -0,0 +1,142 @@
+import asyncio
+from typing import Callable, Dict, Generator
+
+import pytest
+from fastapi import status
+from httpx import AsyncClient
+
+from app import celery_worker
+from app.api import health
+from app.core.config import settings
+
+
+class CountingCheck:
+    def __init__(self, error: bool = False, delay: float = 0) -> None:
+        self.error = error
+        self.delay = delay
+        self.calls = 0
+
+    async def __call__(self) -> None:
+        self.calls += 1
+        if self.delay:
+            await asyncio.sleep(self.delay)
+        if self.error:
+            raise ConnectionError()
+
+
+@pytest.fixture
+def set_checks(monkeypatch) -> Generator:
+    def _set_checks(checks: Dict[str, Callable]) -> None:
+        monkeypatch.setattr(health.readiness, "checks", checks)
+        health.readiness.clear()
+
+    yield _set_checks
+    health.readiness.clear()
+
+
+# region liveness - GET /
+
+
+@pytest.mark.asyncio
+async def test_im_alive_must_return_200(async_client: AsyncClient) -> None:
+    response = await async_client.get("/")
+    assert response.status_code == status.HTTP_200_OK
+
+
+@pytest.mark.asyncio
+async def test_im_alive_must_not_enqueue_any_email(
+    async_client: AsyncClient, monkeypatch
+) -> None:
+    calls = []
+    monkeypatch.setattr(
+        celery_worker.send_verification_email, "delay", calls.append
+    )
+    await async_client.get("/")
+    assert calls == []
+
+
+# endregion
+
+# region readiness - GET /health/ready
+
+
+@pytest.mark.asyncio
+async def test_when_all_checks_pass_ready_must_return_200(
+    async_client: AsyncClient, set_checks
+) -> None:
+    set_checks({"database": health.check_database, "broker": CountingCheck()})
+    response = await async_client.get("/health/ready")
+    assert response.status_code == status.HTTP_200_OK
+    assert response.json() == {
+        "status": "ok",
+        "checks": {"database": "ok", "broker": "ok"},
+    }
+
+
+@pytest.mark.asyncio
+async def test_when_some_check_fails_ready_must_return_503(
+    async_client: AsyncClient, set_checks
+) -> None:
+    set_checks(
+        {"database": CountingCheck(), "broker": CountingCheck(error=True)}
+    )
+    response = await async_client.get("/health/ready")
+    assert response.status_code == status.HTTP_503_SERVICE_UNAVAILABLE
+    assert response.json()["checks"] == {"database": "ok", "broker": "error"}
+
+
+@pytest.mark.asyncio
+async def test_when_some_check_is_too_slow_ready_must_return_503(
+    async_client: AsyncClient, set_checks, monkeypatch
+) -> None:
+    monkeypatch.setattr(health.readiness, "timeout", 0.01)
+    set_checks({"database": CountingCheck(delay=1)})
+    response = await async_client.get("/health/ready")
+    assert response.status_code == status.HTTP_503_SERVICE_UNAVAILABLE
+    assert response.json()["checks"] == {"database": "timeout"}
+
+
+def test_with_the_celery_job_backend_the_broker_must_be_checked(
+    monkeypatch,
+) -> None:
+    monkeypatch.setattr(settings, "JOB_BACKEND", "celery")
+    assert health.get_readiness_checks()["broker"] is health.check_broker
+
+
+@pytest.mark.asyncio
+async def test_with_the_asyncio_job_backend_the_broker_must_not_be_checked(
+    async_client: AsyncClient, set_checks, monkeypatch
+) -> None:
+    monkeypatch.setattr(settings, "JOB_BACKEND", "asyncio")
+    checks = health.get_readiness_checks()
+    assert "broker" not in checks
+    set_checks(checks)
+    response = await async_client.get("/health/ready")
+    assert response.status_code == status.HTTP_200_OK
+
+
+@pytest.mark.asyncio
+async def test_ready_must_reuse_the_cached_result(
+    async_client: AsyncClient, set_checks
+) -> None:
+    check = CountingCheck()
+    set_checks({"database": check})
+    for _ in range(3):
+        await async_client.get("/health/ready")
+    assert check.calls == 1
+
+
+@pytest.mark.asyncio
+async def test_concurrent_ready_requests_must_run_the_checks_once(
+    async_client: AsyncClient, set_checks
+) -> None:
+    check = CountingCheck(delay=0.05)
+    set_checks({"database": check})
+    responses = await asyncio.gather(
+        *(async_client.get("/health/ready") for _ in range(5))
+    )
+    assert all(r.status_code == status.HTTP_200_OK for r in responses)
+    assert check.calls == 1
+
+
+# endregion
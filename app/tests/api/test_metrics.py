@@ -0,0 +1,97 @@
+import pytest
+from fastapi import status
+from httpx import AsyncClient
+
+from app import models
+from app.core.config import settings
+from app.core.metrics import UNMATCHED_ROUTE, registry
+from app.tests.utils.auth import get_user_token_headers
+
+
+def sample(name: str, **labels: str) -> float:
+    return registry.get_sample_value(name, labels) or 0
+
+
+# region metrics - GET /metrics
+
+
+@pytest.mark.asyncio
+async def test_metrics_must_return_prometheus_text_format(
+    async_client: AsyncClient,
+) -> None:
+    response = await async_client.get("/metrics")
+    assert response.status_code == status.HTTP_200_OK
+    assert response.headers["content-type"].startswith("text/plain")
+    assert "http_request_duration_seconds" in response.text
+    assert "db_pool_size" in response.text
+
+
+@pytest.mark.asyncio
+async def test_request_latency_must_be_labeled_by_route_template(
+    async_client: AsyncClient, active_user: models.User
+) -> None:
+    route = f"{settings.API_V1_STR}/tasks/{{task_id}}"
+    labels = {"method": "GET", "route": route, "status": "404"}
+    before = sample("http_request_duration_seconds_count", **labels)
+    headers = get_user_token_headers(active_user)
+    await async_client.get(
+        f"{settings.API_V1_STR}/tasks/999999", headers=headers
+    )
+    after = sample("http_request_duration_seconds_count", **labels)
+    assert after == before + 1
+
+
+@pytest.mark.asyncio
+async def test_request_db_statements_must_be_recorded(
+    async_client: AsyncClient, active_user: models.User
+) -> None:
+    labels = {"method": "GET", "route": f"{settings.API_V1_STR}/tasks/"}
+    before_count = sample("http_request_db_statements_count", **labels)
+    before_sum = sample("http_request_db_statements_sum", **labels)
+    headers = get_user_token_headers(active_user)
+    await async_client.get(f"{settings.API_V1_STR}/tasks/", headers=headers)
+    assert sample("http_request_db_statements_count", **labels) == (
+        before_count + 1
+    )
+    assert sample("http_request_db_statements_sum", **labels) > before_sum
+    assert sample("http_request_db_duration_seconds_sum", **labels) > 0
+
+
+@pytest.mark.asyncio
+async def test_unknown_paths_must_share_a_single_route_label(
+    async_client: AsyncClient,
+) -> None:
+    labels = {"method": "GET", "route": UNMATCHED_ROUTE, "status": "404"}
+    before = sample("http_request_duration_seconds_count", **labels)
+    await async_client.get("/not-found/1")
+    await async_client.get("/not-found/2")
+    after = sample("http_request_duration_seconds_count", **labels)
+    assert after == before + 2
+
+
+@pytest.mark.asyncio
+async def test_token_cache_hits_and_misses_must_be_exported(
+    async_client: AsyncClient, active_user: models.User
+) -> None:
+    hits = sample("token_cache_hits_total")
+    misses = sample("token_cache_misses_total")
+    headers = get_user_token_headers(active_user)
+    for _ in range(2):
+        await async_client.get(
+            f"{settings.API_V1_STR}/tasks/", headers=headers
+        )
+    assert sample("token_cache_misses_total") == misses + 1
+    assert sample("token_cache_hits_total") > hits
+    assert sample("token_cache_size") >= 1
+
+
+@pytest.mark.asyncio
+async def test_requests_in_progress_must_go_back_to_zero(
+    async_client: AsyncClient,
+) -> None:
+    await async_client.get("/")
+    in_progress = sample("http_requests_in_progress", method="GET", route="/")
+    assert in_progress == 0
+
+
+# endregion
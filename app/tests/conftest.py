@@ -4,6 +4,8 @@ from typing import AsyncGenerator
 import pytest
 from httpx import AsyncClient
 
+from app.core import rate_limit
+from app.core.cache import MemoryCacheBackend
 from app.core.config import settings
 from app.database.session import async_session
 from app.main import app
@@ -17,6 +19,22 @@ async def async_client() -> AsyncGenerator:
         yield async_client
 
 
+@pytest.fixture(autouse=True)
+def login_rate_limiters(monkeypatch) -> None:
+    # Fresh buckets for each test, the suite logs in from the same client IP.
+    for name in ("login_ip_limiter", "login_account_limiter"):
+        limiter = getattr(rate_limit, name)
+        monkeypatch.setattr(
+            rate_limit,
+            name,
+            rate_limit.RateLimiter(
+                MemoryCacheBackend(maxsize=1000, ttl=limiter.refill_seconds),
+                burst=limiter.burst,
+                per_minute=limiter.rate * 60,
+            ),
+        )
+
+
 @pytest.fixture(scope="session")
 async def db() -> AsyncGenerator:
     async with async_session() as db:
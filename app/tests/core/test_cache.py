@@ -0,0 +1,152 @@
+import pytest
+
+from app.core.cache import (
+    CacheBackend,
+    ExpiringDict,
+    ExpiringSet,
+    LRUCache,
+    MemoryCacheBackend,
+    SharedCacheBackend,
+)
+from app.tests.utils.cache import FakeSharedStore
+
+
+class FakeTimer:
+    def __init__(self) -> None:
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def test_lru_cache_returns_the_stored_value() -> None:
+    cache = LRUCache(maxsize=2, ttl=10)
+    cache.set("a", 1)
+    assert cache.get("a") == 1
+
+
+def test_lru_cache_entry_must_expire_after_ttl() -> None:
+    timer = FakeTimer()
+    cache = LRUCache(maxsize=2, ttl=10, timer=timer)
+    cache.set("a", 1)
+    timer.now = 10
+    assert cache.get("a") is None
+
+
+def test_lru_cache_must_evict_the_least_recently_used_entry() -> None:
+    cache = LRUCache(maxsize=2, ttl=10)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    cache.get("a")
+    cache.set("c", 3)
+    assert cache.get("b") is None
+    assert cache.get("a") == 1
+
+
+def test_lru_cache_delete_must_remove_the_entry() -> None:
+    cache = LRUCache(maxsize=2, ttl=10)
+    cache.set("a", 1)
+    cache.delete("a")
+    assert len(cache) == 0
+
+
+def test_cache_backend_missing_a_method_must_fail_when_created() -> None:
+    class IncompleteBackend(CacheBackend):
+        async def get(self, key: str) -> None:
+            return None
+
+    with pytest.raises(TypeError):
+        IncompleteBackend()
+
+
+@pytest.mark.asyncio
+async def test_memory_cache_backend_set_and_get() -> None:
+    backend = MemoryCacheBackend(maxsize=10, ttl=10)
+    await backend.set("1", {"id": 1})
+    assert await backend.get("1") == {"id": 1}
+
+
+@pytest.mark.parametrize(
+    "backend",
+    [
+        MemoryCacheBackend(maxsize=10, ttl=10),
+        SharedCacheBackend(FakeSharedStore(), namespace="user", ttl=10),
+    ],
+)
+@pytest.mark.asyncio
+async def test_cache_backend_add_must_only_set_a_missing_key(
+    backend: CacheBackend,
+) -> None:
+    assert await backend.add("1", 1)
+    assert not await backend.add("1", 2)
+    assert await backend.get("1") == 1
+
+
+@pytest.mark.asyncio
+async def test_shared_cache_backend_set_and_get() -> None:
+    backend = SharedCacheBackend(FakeSharedStore(), namespace="user", ttl=10)
+    await backend.set("1", {"id": 1, "email": "test@test.com"})
+    assert await backend.get("1") == {"id": 1, "email": "test@test.com"}
+
+
+@pytest.mark.asyncio
+async def test_shared_cache_backend_must_namespace_the_keys() -> None:
+    store = FakeSharedStore()
+    backend = SharedCacheBackend(store, namespace="user", ttl=10)
+    await backend.set("1", {"id": 1})
+    assert "user:1" in store.data
+
+
+@pytest.mark.asyncio
+async def test_shared_cache_backend_delete_must_remove_the_entry() -> None:
+    backend = SharedCacheBackend(FakeSharedStore(), namespace="user", ttl=10)
+    await backend.set("1", {"id": 1})
+    await backend.delete("1")
+    assert await backend.get("1") is None
+
+
+def test_expiring_dict_must_keep_every_entry_until_it_expires() -> None:
+    timer = FakeTimer()
+    items = ExpiringDict(timer=timer)
+    for key in range(1000):
+        items.set(key, key * 2, expires_at=10)
+    assert items.get(0) == 0
+    assert len(items) == 1000
+    timer.now = 10
+    assert items.get(0) is None
+    assert len(items) == 0
+
+
+def test_expiring_set_must_contain_the_added_member() -> None:
+    members = ExpiringSet(timer=FakeTimer())
+    members.add("a", expires_at=10)
+    assert "a" in members
+    assert "b" not in members
+
+
+def test_expiring_set_member_must_expire() -> None:
+    timer = FakeTimer()
+    members = ExpiringSet(timer=timer)
+    members.add("a", expires_at=10)
+    timer.now = 10
+    assert "a" not in members
+    assert len(members) == 0
+
+
+def test_expiring_set_must_keep_the_latest_expiration() -> None:
+    timer = FakeTimer()
+    members = ExpiringSet(timer=timer)
+    members.add("a", expires_at=10)
+    members.add("a", expires_at=20)
+    timer.now = 15
+    members.add("b", expires_at=30)
+    assert "a" in members
+    assert len(members) == 2
+
+
+def test_expiring_set_must_ignore_already_expired_members() -> None:
+    timer = FakeTimer()
+    timer.now = 10
+    members = ExpiringSet(timer=timer)
+    members.add("a", expires_at=5)
+    assert len(members) == 0
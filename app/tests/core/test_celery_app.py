@@ -0,0 +1,38 @@
+from app import celery_worker
+from app.core.celery_app import celery_app, get_celery_config
+from app.core.config import settings
+
+
+def test_celery_config_must_route_the_tasks_to_their_queues() -> None:
+    config = get_celery_config(
+        settings.copy(
+            update={
+                "CELERY_DEFAULT_QUEUE": "default",
+                "CELERY_TASK_QUEUES": {"a": "emails", "b": "emails"},
+            }
+        )
+    )
+    assert config["task_routes"] == {
+        "a": {"queue": "emails"},
+        "b": {"queue": "emails"},
+    }
+    assert [queue.name for queue in config["task_queues"]] == [
+        "default",
+        "emails",
+    ]
+
+
+def test_celery_config_must_still_accept_json_messages() -> None:
+    config = get_celery_config(
+        settings.copy(update={"CELERY_SERIALIZER": "msgpack"})
+    )
+    assert config["task_serializer"] == "msgpack"
+    assert config["accept_content"] == ["json", "msgpack"]
+
+
+def test_verification_email_task_must_ignore_its_result() -> None:
+    assert celery_worker.send_verification_email.ignore_result
+    route = celery_app.amqp.router.route(
+        {}, celery_worker.send_verification_email.name
+    )
+    assert route["queue"].name == "emails"
@@ -0,0 +1,122 @@
+import asyncio
+
+import pytest
+
+from app import celery_worker
+from app.core import jobs
+from app.core.config import settings
+from app.core.jobs import JobQueue
+from app.core.mail import send_email
+
+
+class FlakyJob:
+    """Coroutine function failing its first `failures` calls."""
+
+    def __init__(self, failures: int = 0) -> None:
+        self.failures = failures
+        self.calls = 0
+        self.__name__ = "flaky_job"
+
+    async def __call__(self) -> None:
+        self.calls += 1
+        if self.calls <= self.failures:
+            raise RuntimeError("failed")
+
+
+@pytest.mark.asyncio
+async def test_job_queue_must_run_the_queued_jobs() -> None:
+    queue = JobQueue(workers=2)
+    results = []
+
+    async def job(value: int) -> None:
+        results.append(value)
+
+    for value in range(5):
+        await queue.enqueue(job, value)
+    await queue.stop()
+    assert sorted(results) == [0, 1, 2, 3, 4]
+    assert queue.processed == 5
+
+
+@pytest.mark.asyncio
+async def test_job_queue_must_retry_a_failed_job() -> None:
+    queue = JobQueue(max_retries=3, backoff=0)
+    job = FlakyJob(failures=2)
+    await queue.enqueue(job)
+    await queue.stop()
+    assert job.calls == 3
+    assert queue.processed == 1
+    assert queue.failed == 0
+
+
+@pytest.mark.asyncio
+async def test_job_queue_must_give_up_after_max_retries() -> None:
+    queue = JobQueue(max_retries=2, backoff=0)
+    job = FlakyJob(failures=10)
+    await queue.enqueue(job)
+    await queue.stop()
+    assert job.calls == 3
+    assert queue.failed == 1
+
+
+def test_job_queue_retry_delay_must_grow_up_to_max_backoff() -> None:
+    queue = JobQueue(backoff=1, max_backoff=5)
+    delays = [queue.retry_delay(attempt) for attempt in range(1, 5)]
+    assert delays == [1, 2, 4, 5]
+
+
+@pytest.mark.asyncio
+async def test_job_queue_stop_must_drain_the_queue() -> None:
+    queue = JobQueue(workers=1)
+    done = []
+
+    async def job(value: int) -> None:
+        await asyncio.sleep(0.01)
+        done.append(value)
+
+    for value in range(3):
+        await queue.enqueue(job, value)
+    await queue.stop(timeout=5)
+    assert done == [0, 1, 2]
+    assert not queue.running
+
+
+@pytest.mark.asyncio
+async def test_job_queue_stop_must_not_wait_longer_than_timeout() -> None:
+    queue = JobQueue(workers=1)
+    await queue.enqueue(asyncio.sleep, 10)
+    await asyncio.wait_for(queue.stop(timeout=0.01), 1)
+    assert not queue.running
+
+
+@pytest.mark.asyncio
+async def test_verification_email_must_be_enqueued_in_process_with_asyncio(
+    monkeypatch,
+) -> None:
+    queued = []
+
+    async def enqueue(func, *args):
+        queued.append((func, args))
+
+    monkeypatch.setattr(settings, "JOB_BACKEND", "asyncio")
+    monkeypatch.setattr(jobs.job_queue, "enqueue", enqueue)
+    await jobs.enqueue_verification_email("a@test.com", "A", "token")
+    [(func, (email,))] = queued
+    assert func is send_email
+    assert email.recipient == "a@test.com"
+    assert email.context["token"] == "token"
+
+
+@pytest.mark.asyncio
+async def test_verification_email_must_be_sent_to_celery_by_default(
+    monkeypatch,
+) -> None:
+    calls = []
+    monkeypatch.setattr(settings, "JOB_BACKEND", "celery")
+    monkeypatch.setattr(
+        celery_worker.send_verification_email,
+        "delay",
+        lambda *args: calls.append(args),
+    )
+    await jobs.enqueue_verification_email("a@test.com", "A", "token")
+    assert calls == [("a@test.com", "A", "token")]
@@ -0,0 +1,154 @@
+import asyncio
+import time
+from pathlib import Path
+from typing import Generator
+
+import aiosmtplib
+import pytest
+from aiosmtpd.controller import Controller
+
+from app.core.mail import (
+    BatchMailer,
+    MailerThread,
+    OutgoingEmail,
+    SMTPConnectionPool,
+    TemplateCache,
+)
+from app.tests.utils.mail import (
+    RecordingHandler,
+    get_free_port,
+    start_smtp_server,
+)
+
+TEMPLATE = "<p>Hi {{ first_name }}, your token is {{ token }}</p>"
+
+
+@pytest.fixture
+def templates_dir(tmp_path: Path) -> Path:
+    (tmp_path / "verification_email.html").write_text(TEMPLATE)
+    return tmp_path
+
+
+@pytest.fixture
+def smtp_server() -> Generator:
+    controller = start_smtp_server(RecordingHandler())
+    yield controller
+    controller.stop()
+
+
+def create_mailer(
+    port: int,
+    templates_dir: Path,
+    pool_size: int = 2,
+    batch_window: float = 0.01,
+) -> BatchMailer:
+    pool = SMTPConnectionPool(hostname="127.0.0.1", port=port, size=pool_size)
+    return BatchMailer(
+        pool,
+        TemplateCache(templates_dir),
+        sender="noreply@example.com",
+        batch_size=50,
+        batch_window=batch_window,
+    )
+
+
+def random_email(number: int) -> OutgoingEmail:
+    return OutgoingEmail(
+        recipient=f"user{number}@example.com",
+        subject="FastAPI-TodoList Email Verification",
+        template_name="verification_email.html",
+        context={"first_name": f"User {number}", "token": str(number)},
+    )
+
+
+def test_template_cache_must_compile_each_template_once(
+    templates_dir: Path,
+) -> None:
+    templates = TemplateCache(templates_dir)
+    template = templates.get("verification_email.html")
+    (templates_dir / "verification_email.html").write_text("changed")
+    assert templates.get("verification_email.html") is template
+    rendered = templates.render(
+        "verification_email.html", {"first_name": "Ana", "token": "123"}
+    )
+    assert rendered == "<p>Hi Ana, your token is 123</p>"
+
+
+@pytest.mark.asyncio
+async def test_batch_mailer_must_send_all_emails_over_the_pooled_connections(
+    record_property, smtp_server: Controller, templates_dir: Path
+) -> None:
+    mailer = create_mailer(smtp_server.port, templates_dir, pool_size=2)
+    total = 200
+    started = time.perf_counter()
+    await asyncio.gather(*(mailer.send(random_email(n)) for n in range(total)))
+    elapsed = time.perf_counter() - started
+    await mailer.stop()
+    record_property("messages_per_second", round(total / elapsed))
+    assert len(smtp_server.handler.messages) == total
+    assert mailer.sent == total
+    assert mailer.pool.connects <= 2
+    assert len(smtp_server.handler.sessions) <= 2
+
+
+@pytest.mark.asyncio
+async def test_batch_mailer_must_render_the_template_in_the_message(
+    smtp_server: Controller, templates_dir: Path
+) -> None:
+    mailer = create_mailer(smtp_server.port, templates_dir)
+    await mailer.send(random_email(7))
+    await mailer.stop()
+    envelope = smtp_server.handler.messages[0]
+    assert envelope.rcpt_tos == ["user7@example.com"]
+    assert b"<p>Hi User 7, your token is 7</p>" in envelope.content
+
+
+@pytest.mark.asyncio
+async def test_batch_mailer_must_not_hold_a_lone_email_for_the_window(
+    smtp_server: Controller, templates_dir: Path
+) -> None:
+    mailer = create_mailer(smtp_server.port, templates_dir, batch_window=5)
+    await mailer.send(random_email(1))
+    started = time.perf_counter()
+    await asyncio.wait_for(mailer.send(random_email(2)), timeout=2)
+    elapsed = time.perf_counter() - started
+    await mailer.stop()
+    assert len(smtp_server.handler.messages) == 2
+    assert elapsed < 1
+
+
+@pytest.mark.asyncio
+async def test_smtp_pool_must_reconnect_when_the_connection_was_dropped(
+    smtp_server: Controller, templates_dir: Path
+) -> None:
+    mailer = create_mailer(smtp_server.port, templates_dir, pool_size=1)
+    await mailer.send(random_email(1))
+    async with mailer.pool.connection() as smtp:
+        smtp.close()
+    await mailer.send(random_email(2))
+    await mailer.stop()
+    assert len(smtp_server.handler.messages) == 2
+    assert mailer.pool.connects == 2
+
+
+@pytest.mark.asyncio
+async def test_when_smtp_server_is_unreachable_send_must_raise(
+    templates_dir: Path,
+) -> None:
+    mailer = create_mailer(get_free_port(), templates_dir)
+    with pytest.raises(aiosmtplib.SMTPException):
+        await mailer.send(random_email(1))
+    await mailer.stop()
+
+
+def test_mailer_thread_must_send_from_synchronous_code(
+    smtp_server: Controller, templates_dir: Path
+) -> None:
+    mailer_thread = MailerThread(
+        lambda: create_mailer(smtp_server.port, templates_dir)
+    )
+    mailer_thread.send(random_email(1), timeout=10)
+    mailer_thread.send(random_email(2), timeout=10)
+    mailer_thread.stop(timeout=10)
+    assert len(smtp_server.handler.messages) == 2
+    assert len(smtp_server.handler.sessions) == 1
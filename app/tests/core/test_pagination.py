@@ -0,0 +1,23 @@
+import pytest
+
+from app.core.pagination import InvalidCursor, decode_cursor, encode_cursor
+
+
+def test_decoded_cursor_must_return_the_encoded_values() -> None:
+    cursor = encode_cursor([False, 42])
+    assert decode_cursor(cursor, [bool, int]) == [False, 42]
+
+
+def test_when_cursor_is_not_base64_json_it_must_raise_invalid_cursor() -> None:
+    with pytest.raises(InvalidCursor):
+        decode_cursor("not a cursor", [int])
+
+
+def test_when_cursor_has_wrong_length_it_must_raise_invalid_cursor() -> None:
+    with pytest.raises(InvalidCursor):
+        decode_cursor(encode_cursor([1, 2]), [int])
+
+
+def test_when_cursor_has_wrong_type_it_must_raise_invalid_cursor() -> None:
+    with pytest.raises(InvalidCursor):
+        decode_cursor(encode_cursor([1]), [bool])
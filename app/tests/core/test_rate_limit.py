@@ -0,0 +1,65 @@
+import pytest
+
+from app.core.cache import MemoryCacheBackend, SharedCacheBackend
+from app.core.rate_limit import RateLimiter, retry_after_header
+from app.tests.utils.cache import FakeSharedStore
+
+
+class FakeTimer:
+    def __init__(self) -> None:
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def create_limiter(timer: FakeTimer, backend=None) -> RateLimiter:
+    if backend is None:
+        backend = MemoryCacheBackend(maxsize=10, ttl=60)
+    return RateLimiter(backend, burst=3, per_minute=6, timer=timer)
+
+
+@pytest.mark.asyncio
+async def test_rate_limiter_must_allow_up_to_burst_hits() -> None:
+    limiter = create_limiter(FakeTimer())
+    for _ in range(3):
+        assert await limiter.hit("key") is None
+    assert await limiter.hit("key") == pytest.approx(10)
+
+
+@pytest.mark.asyncio
+async def test_rate_limiter_must_keep_a_bucket_per_key() -> None:
+    limiter = create_limiter(FakeTimer())
+    for _ in range(3):
+        await limiter.hit("a")
+    assert await limiter.hit("a") is not None
+    assert await limiter.hit("b") is None
+
+
+@pytest.mark.asyncio
+async def test_rate_limiter_must_refill_the_bucket_over_time() -> None:
+    timer = FakeTimer()
+    limiter = create_limiter(timer)
+    for _ in range(3):
+        await limiter.hit("key")
+    timer.now = 4
+    assert await limiter.hit("key") == pytest.approx(6)
+    timer.now = 10
+    assert await limiter.hit("key") is None
+    assert await limiter.hit("key") is not None
+
+
+@pytest.mark.asyncio
+async def test_rate_limiter_must_work_with_a_shared_backend() -> None:
+    timer = FakeTimer()
+    backend = SharedCacheBackend(FakeSharedStore(), namespace="login", ttl=30)
+    first = create_limiter(timer, backend)
+    second = create_limiter(timer, backend)
+    for _ in range(3):
+        await first.hit("key")
+    assert await second.hit("key") is not None
+
+
+def test_retry_after_header_must_round_up_to_whole_seconds() -> None:
+    assert retry_after_header(0.2) == "1"
+    assert retry_after_header(6.1) == "7"
@@ -0,0 +1,189 @@
+import asyncio
+import threading
+import time
+from datetime import timedelta
+
+import jwt
+import pytest
+
+from app.core import security
+from app.core.cache import SharedCacheBackend
+from app.core.security import (
+    PasswordHasher,
+    PasswordHasherBusy,
+    RevocationStore,
+    TokenVersionStore,
+    create_jwt_token,
+    create_pwd_context,
+    decode_jwt_token,
+    get_password_hash_async,
+    token_cache,
+    verify_password_async,
+)
+from app.tests.utils.cache import FakeSharedStore
+
+
+@pytest.mark.asyncio
+async def test_password_hashed_async_must_be_verified_async() -> None:
+    hashed_password = await get_password_hash_async("secret")
+    assert await verify_password_async("secret", hashed_password)
+
+
+@pytest.mark.asyncio
+async def test_wrong_password_must_not_be_verified_async() -> None:
+    hashed_password = await get_password_hash_async("secret")
+    assert not await verify_password_async("wrong", hashed_password)
+
+
+def fast_pwd_context(scheme: str = "bcrypt", bcrypt_rounds: int = 4):
+    return create_pwd_context(
+        scheme=scheme,
+        bcrypt_rounds=bcrypt_rounds,
+        argon2_memory_cost=1024,
+        argon2_time_cost=1,
+        argon2_parallelism=1,
+    )
+
+
+def test_hash_with_another_cost_must_be_verified_and_updated() -> None:
+    hashed_password = fast_pwd_context(bcrypt_rounds=4).hash("secret")
+    pwd_context = fast_pwd_context(bcrypt_rounds=5)
+    verified, new_hash = pwd_context.verify_and_update(
+        "secret", hashed_password
+    )
+    assert verified
+    assert new_hash.startswith("$2b$05$")
+    assert pwd_context.verify_and_update("secret", new_hash) == (True, None)
+
+
+def test_hash_with_another_scheme_must_be_verified_and_updated() -> None:
+    hashed_password = fast_pwd_context("bcrypt").hash("secret")
+    verified, new_hash = fast_pwd_context("argon2").verify_and_update(
+        "secret", hashed_password
+    )
+    assert verified
+    assert new_hash.startswith("$argon2")
+
+
+def test_wrong_password_must_not_be_updated() -> None:
+    hashed_password = fast_pwd_context(bcrypt_rounds=4).hash("secret")
+    pwd_context = fast_pwd_context(bcrypt_rounds=5)
+    assert pwd_context.verify_and_update("wrong", hashed_password) == (
+        False,
+        None,
+    )
+
+
+def test_unknown_password_hash_scheme_must_raise() -> None:
+    with pytest.raises(ValueError):
+        fast_pwd_context("md5_crypt")
+
+
+@pytest.mark.asyncio
+async def test_when_password_hasher_is_saturated_it_must_raise_busy() -> None:
+    hasher = PasswordHasher(max_workers=1, max_queue=1)
+    release = threading.Event()
+    jobs = [
+        asyncio.ensure_future(hasher.run(release.wait)) for _ in range(2)
+    ]
+    await asyncio.sleep(0)
+    with pytest.raises(PasswordHasherBusy):
+        await hasher.run(release.wait)
+    release.set()
+    await asyncio.gather(*jobs)
+    hasher.shutdown()
+
+
+@pytest.mark.asyncio
+async def test_when_hasher_jobs_finish_new_jobs_must_be_accepted() -> None:
+    hasher = PasswordHasher(max_workers=1, max_queue=0)
+    await hasher.run(sum, [1, 2])
+    assert await hasher.run(sum, [1, 2]) == 3
+    hasher.shutdown()
+
+
+def test_decoded_token_must_be_served_from_the_token_cache() -> None:
+    token = create_jwt_token(subject=1)
+    decode_jwt_token(token)
+    hits = token_cache.hits
+    payload = decode_jwt_token(token)
+    assert token_cache.hits == hits + 1
+    assert payload["sub"] == 1
+
+
+def test_first_decode_of_a_token_must_count_a_miss() -> None:
+    token = create_jwt_token(subject=2)
+    misses = token_cache.misses
+    decode_jwt_token(token)
+    assert token_cache.misses == misses + 1
+
+
+def test_cached_token_must_raise_when_it_expires(
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    token = create_jwt_token(subject=1, expires_delta=timedelta(minutes=1))
+    decode_jwt_token(token)
+    later = time.time() + 120
+    monkeypatch.setattr(security.time, "time", lambda: later)
+    with pytest.raises(jwt.ExpiredSignatureError):
+        decode_jwt_token(token)
+
+
+def test_invalid_token_must_not_be_cached() -> None:
+    token = create_jwt_token(subject=1) + "invalid"
+    with pytest.raises(jwt.InvalidTokenError):
+        decode_jwt_token(token)
+    assert token_cache.get(token) is None
+
+
+def test_token_claims_must_be_embedded_in_the_token() -> None:
+    token = create_jwt_token(subject=1, claims={"ver": 3})
+    payload = decode_jwt_token(token)
+    assert payload["ver"] == 3
+    assert payload["sub"] == 1
+
+
+@pytest.mark.asyncio
+async def test_older_token_version_must_be_revoked() -> None:
+    store = TokenVersionStore(ttl=60)
+    await store.set(1, 2)
+    assert await store.is_revoked(1, 1)
+    assert not await store.is_revoked(1, 2)
+
+
+@pytest.mark.asyncio
+async def test_token_version_of_unknown_user_must_not_be_revoked() -> None:
+    store = TokenVersionStore(ttl=60)
+    assert not await store.is_revoked(1, 0)
+
+
+@pytest.mark.asyncio
+async def test_token_versions_must_not_be_evicted_before_they_expire() -> None:
+    store = TokenVersionStore(ttl=60)
+    for user_id in range(1, 100_001):
+        await store.set(user_id, 2)
+    assert await store.is_revoked(1, 1)
+
+
+@pytest.mark.asyncio
+async def test_token_versions_must_be_shared_through_the_backend() -> None:
+    backend = SharedCacheBackend(FakeSharedStore(), namespace="v", ttl=60)
+    await TokenVersionStore(60, backend).set(1, 2)
+    assert await TokenVersionStore(60, backend).is_revoked(1, 1)
+
+
+@pytest.mark.asyncio
+async def test_revoked_token_id_must_be_revoked() -> None:
+    store = RevocationStore()
+    assert await store.revoke("jti", expires_at=time.time() + 60)
+    assert await store.is_revoked("jti")
+    assert not await store.is_revoked("other-jti")
+    assert not await store.revoke("jti", expires_at=time.time() + 60)
+
+
+@pytest.mark.asyncio
+async def test_revoked_token_id_must_be_shared_through_the_backend() -> None:
+    backend = SharedCacheBackend(FakeSharedStore(), namespace="r", ttl=60)
+    assert await RevocationStore(backend).revoke("jti", time.time() + 60)
+    assert await RevocationStore(backend).is_revoked("jti")
+    assert not await RevocationStore(backend).revoke("jti", time.time() + 60)
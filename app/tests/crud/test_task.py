@@ -0,0 +1,199 @@
+import pytest
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app import crud, schemas
+from app.schemas.task import TaskBulkUpdateItem, TaskCreate, TaskUpdate
+from app.tests.utils.task import random_done_task_dict, random_task_dict
+from app.tests.utils.user import random_active_user_dict
+
+
+@pytest.mark.asyncio
+async def test_create_task_by_schema(db: AsyncSession) -> None:
+    user = await crud.user.create(db=db, user_in=random_active_user_dict())
+    task_in = TaskCreate(**random_task_dict())
+    new_task = await crud.task.create(db=db, owner_id=user.id, task_in=task_in)
+    assert new_task.title == task_in.title
+    assert new_task.owner_id == user.id
+
+
+@pytest.mark.asyncio
+async def test_if_get_by_id_return_only_tasks_of_the_owner(
+    db: AsyncSession,
+) -> None:
+    user = await crud.user.create(db=db, user_in=random_active_user_dict())
+    other_user = await crud.user.create(
+        db=db, user_in=random_active_user_dict()
+    )
+    new_task = await crud.task.create(
+        db=db, owner_id=user.id, task_in=random_task_dict()
+    )
+    returned_task = await crud.task.get_by_id(
+        db=db, owner_id=other_user.id, id=new_task.id
+    )
+    assert returned_task is None
+
+
+@pytest.mark.asyncio
+async def test_if_get_multi_by_owner_return_not_done_tasks_first(
+    db: AsyncSession,
+) -> None:
+    user = await crud.user.create(db=db, user_in=random_active_user_dict())
+    done_task = await crud.task.create(
+        db=db, owner_id=user.id, task_in=random_done_task_dict()
+    )
+    not_done_task = await crud.task.create(
+        db=db, owner_id=user.id, task_in=random_task_dict()
+    )
+    tasks = await crud.task.get_multi_by_owner(db=db, owner_id=user.id)
+    assert [task.id for task in tasks] == [not_done_task.id, done_task.id]
+
+
+@pytest.mark.asyncio
+async def test_if_get_multi_public_by_owner_return_the_schema_fields(
+    db: AsyncSession,
+) -> None:
+    user = await crud.user.create(db=db, user_in=random_active_user_dict())
+    new_task = await crud.task.create(
+        db=db, owner_id=user.id, task_in=random_task_dict()
+    )
+    tasks = await crud.task.get_multi_public_by_owner(
+        db=db, owner_id=user.id
+    )
+    assert tasks == [schemas.Task.from_orm(new_task).dict()]
+
+
+@pytest.mark.asyncio
+async def test_update_task_by_schema(db: AsyncSession) -> None:
+    user = await crud.user.create(db=db, user_in=random_active_user_dict())
+    new_task = await crud.task.create(
+        db=db, owner_id=user.id, task_in=random_task_dict()
+    )
+    task_update_in = TaskUpdate(**random_done_task_dict())
+    updated_task = await crud.task.update(
+        db=db, db_task=new_task, task_in=task_update_in
+    )
+    assert updated_task.is_done is True
+
+
+@pytest.mark.asyncio
+async def test_if_delete_really_delete_the_task(db: AsyncSession) -> None:
+    user = await crud.user.create(db=db, user_in=random_active_user_dict())
+    new_task = await crud.task.create(
+        db=db, owner_id=user.id, task_in=random_task_dict()
+    )
+    await crud.task.delete(db=db, db_task=new_task)
+    returned_task = await crud.task.get_by_id(
+        db=db, owner_id=user.id, id=new_task.id
+    )
+    assert returned_task is None
+
+
+@pytest.mark.asyncio
+async def test_create_multi_return_the_tasks_in_order(
+    db: AsyncSession,
+) -> None:
+    user = await crud.user.create(db=db, user_in=random_active_user_dict())
+    tasks_in = [TaskCreate(**random_task_dict()) for _ in range(3)]
+    new_tasks = await crud.task.create_multi(
+        db=db, owner_id=user.id, tasks_in=tasks_in
+    )
+    assert [task.title for task in new_tasks] == [
+        task_in.title for task_in in tasks_in
+    ]
+
+
+@pytest.mark.asyncio
+async def test_update_multi_update_only_tasks_of_the_owner(
+    db: AsyncSession,
+) -> None:
+    user = await crud.user.create(db=db, user_in=random_active_user_dict())
+    other_user = await crud.user.create(
+        db=db, user_in=random_active_user_dict()
+    )
+    new_tasks = await crud.task.create_multi(
+        db=db,
+        owner_id=user.id,
+        tasks_in=[random_task_dict(), random_task_dict()],
+    )
+    other_task = await crud.task.create(
+        db=db, owner_id=other_user.id, task_in=random_task_dict()
+    )
+    tasks_in = [
+        TaskBulkUpdateItem(id=task.id, **random_done_task_dict())
+        for task in [*new_tasks, other_task]
+    ]
+    updated_tasks = await crud.task.update_multi(
+        db=db, owner_id=user.id, tasks_in=tasks_in
+    )
+    assert sorted(task.id for task in updated_tasks) == sorted(
+        task.id for task in new_tasks
+    )
+    assert all(task.is_done for task in updated_tasks)
+
+
+@pytest.mark.asyncio
+async def test_delete_multi_return_the_deleted_ids(db: AsyncSession) -> None:
+    user = await crud.user.create(db=db, user_in=random_active_user_dict())
+    new_tasks = await crud.task.create_multi(
+        db=db,
+        owner_id=user.id,
+        tasks_in=[random_task_dict(), random_task_dict()],
+    )
+    deleted_ids = await crud.task.delete_multi(
+        db=db, owner_id=user.id, ids=[new_tasks[0].id, 0]
+    )
+    assert deleted_ids == [new_tasks[0].id]
+
+
+@pytest.mark.asyncio
+async def test_search_must_rank_title_matches_first(db: AsyncSession) -> None:
+    user = await crud.user.create(db=db, user_in=random_active_user_dict())
+    in_description, in_title, _ = await crud.task.create_multi(
+        db=db,
+        owner_id=user.id,
+        tasks_in=[
+            {"title": "Groceries", "description": "buy zucchini bread"},
+            {"title": "Zucchini bread", "description": "bake it"},
+            {"title": "Laundry", "description": "wash the clothes"},
+        ],
+    )
+    tasks = await crud.task.search_public_by_owner(
+        db=db, owner_id=user.id, q="zucchini bread"
+    )
+    assert [task["id"] for task in tasks] == [in_title.id, in_description.id]
+
+
+@pytest.mark.asyncio
+async def test_search_must_see_updated_and_deleted_tasks(
+    db: AsyncSession,
+) -> None:
+    user = await crud.user.create(db=db, user_in=random_active_user_dict())
+    task = await crud.task.create(
+        db=db,
+        owner_id=user.id,
+        task_in={"title": "Walk the dog", "description": "quokka"},
+    )
+    await crud.task.update(
+        db=db, db_task=task, task_in={"description": "platypus"}
+    )
+    for q, found in (("quokka", []), ("platypus", [task.id])):
+        tasks = await crud.task.search_public_by_owner(
+            db=db, owner_id=user.id, q=q
+        )
+        assert [task["id"] for task in tasks] == found
+    await crud.task.delete(db=db, db_task=task)
+    assert not await crud.task.search_public_by_owner(
+        db=db, owner_id=user.id, q="platypus"
+    )
+
+
+@pytest.mark.asyncio
+async def test_search_must_ignore_the_query_syntax(db: AsyncSession) -> None:
+    user = await crud.user.create(db=db, user_in=random_active_user_dict())
+    await crud.task.create(
+        db=db,
+        owner_id=user.id,
+        task_in={"title": "Pay the bills", "description": "OR NOT"},
+    )
+    for q in ('bills" OR "x', "NOT", "*", "-bills"):
+        await crud.task.search_public_by_owner(db=db, owner_id=user.id, q=q)
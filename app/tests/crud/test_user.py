@@ -1,8 +1,14 @@
 import pytest
+from sqlalchemy import insert, select
+from sqlalchemy.exc import IntegrityError
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from app import crud
+from app import crud, models, schemas
+from app.core import security
+from app.core.security import token_versions
 from app.schemas.user import UserCreate, UserUpdatePATCH, UserUpdatePUT
+from app.tests.utils.db import capture_statements
+from app.tests.utils.task import random_task_dict
 from app.tests.utils.user import (
     fake,
     random_active_superuser_dict,
@@ -80,6 +86,20 @@ async def test_if_delete_by_id_really_delete_the_user(db: AsyncSession):
     assert returned_user is None
 
 
+@pytest.mark.asyncio
+async def test_delete_by_id_must_delete_the_user_tasks(db: AsyncSession):
+    user = await crud.user.create(db=db, user_in=random_user_dict())
+    task = await crud.task.create(
+        db, owner_id=user.id, task_in=random_task_dict()
+    )
+    await crud.user.delete_by_id(db=db, id=user.id)
+    assert await crud.task.get_by_id(db, owner_id=user.id, id=task.id) is None
+    # A task left behind would belong to the next user reusing the id.
+    assert not await db.scalar(
+        select(models.Task.id).where(models.Task.owner_id == user.id)
+    )
+
+
 @pytest.mark.asyncio
 async def test_update_user_by_userupdateput_schema(db: AsyncSession) -> None:
     user_dict = random_user_dict()
@@ -141,3 +161,273 @@ async def test_if_get_multi_skip_the_correct_quantity_of_user(
         await crud.user.create(db=db, user_in=user_dict)
     users = await crud.user.get_multi(db=db, skip=2, limit=1)
     assert users[0].id == 3
+
+
+@pytest.mark.asyncio
+async def test_if_get_principal_return_correct_user(
+    db: AsyncSession,
+) -> None:
+    new_user = await crud.user.create(db=db, user_in=random_user_dict())
+    await crud.user.get_principal(db=db, id=new_user.id)
+    returned_user = await crud.user.get_principal(db=db, id=new_user.id)
+    assert returned_user == schemas.UserPrincipal(
+        id=new_user.id,
+        full_name=new_user.full_name,
+        email=new_user.email,
+        is_active=new_user.is_active,
+        is_superuser=new_user.is_superuser,
+    )
+
+
+@pytest.mark.asyncio
+async def test_when_update_user_the_cached_user_must_be_invalidated(
+    db: AsyncSession,
+) -> None:
+    new_user = await crud.user.create(db=db, user_in=random_user_dict())
+    cached_user = await crud.user.get_principal(db=db, id=new_user.id)
+    user_update_in = {"email": fake.free_email()}
+    await crud.user.update(db=db, db_user=cached_user, user_in=user_update_in)
+    returned_user = await crud.user.get_principal(db=db, id=new_user.id)
+    assert returned_user.email == user_update_in["email"]
+
+
+@pytest.mark.asyncio
+async def test_when_delete_user_the_cached_user_must_be_invalidated(
+    db: AsyncSession,
+) -> None:
+    new_user = await crud.user.create(db=db, user_in=random_user_dict())
+    await crud.user.get_principal(db=db, id=new_user.id)
+    await crud.user.delete_by_id(db=db, id=new_user.id)
+    returned_user = await crud.user.get_principal(db=db, id=new_user.id)
+    assert returned_user is None
+
+
+@pytest.mark.asyncio
+async def test_if_get_multi_return_the_users_after_the_given_id(
+    db: AsyncSession,
+) -> None:
+    new_users = [
+        await crud.user.create(db=db, user_in=random_user_dict())
+        for _ in range(2)
+    ]
+    users = await crud.user.get_multi(db=db, after_id=new_users[0].id)
+    assert [user.id for user in users] == [new_users[1].id]
+
+
+@pytest.mark.asyncio
+async def test_create_user_must_issue_a_single_statement(
+    db: AsyncSession,
+) -> None:
+    with capture_statements() as statements:
+        await crud.user.create(db=db, user_in=random_user_dict())
+    assert len(statements) == 1
+
+
+@pytest.mark.asyncio
+async def test_update_user_must_issue_a_single_statement(
+    db: AsyncSession,
+) -> None:
+    new_user = await crud.user.create(db=db, user_in=random_user_dict())
+    with capture_statements() as statements:
+        await crud.user.update(
+            db=db, db_user=new_user, user_in={"full_name": fake.name()}
+        )
+    assert len(statements) == 1
+
+
+@pytest.mark.asyncio
+async def test_delete_by_id_must_issue_a_single_statement(
+    db: AsyncSession,
+) -> None:
+    new_user = await crud.user.create(db=db, user_in=random_user_dict())
+    with capture_statements() as statements:
+        await crud.user.delete_by_id(db=db, id=new_user.id)
+    assert len(statements) == 1
+
+
+@pytest.mark.asyncio
+async def test_when_create_user_with_existing_email_it_must_raise(
+    db: AsyncSession,
+) -> None:
+    user_dict = random_user_dict()
+    await crud.user.create(db=db, user_in=user_dict)
+    with pytest.raises(IntegrityError):
+        await crud.user.create(db=db, user_in=user_dict)
+    # The session must remain usable
+    assert await crud.user.get_by_email(db=db, email=user_dict["email"])
+
+
+@pytest.mark.asyncio
+async def test_create_user_must_store_the_email_lowercased(
+    db: AsyncSession,
+) -> None:
+    user_dict = random_user_dict()
+    user_dict["email"] = user_dict["email"].upper()
+    new_user = await crud.user.create(db=db, user_in=user_dict)
+    assert new_user.email == user_dict["email"].lower()
+
+
+@pytest.mark.asyncio
+async def test_get_by_email_must_ignore_the_email_case(
+    db: AsyncSession,
+) -> None:
+    user_dict = random_user_dict()
+    new_user = await crud.user.create(db=db, user_in=user_dict)
+    user = await crud.user.get_by_email(
+        db=db, email=user_dict["email"].upper()
+    )
+    assert user.id == new_user.id
+
+
+@pytest.mark.asyncio
+async def test_create_user_with_email_in_another_case_must_raise(
+    db: AsyncSession,
+) -> None:
+    user_dict = random_user_dict()
+    await crud.user.create(db=db, user_in=user_dict)
+    # Inserted as is, bypassing the normalization of crud.user.create
+    with pytest.raises(IntegrityError):
+        await db.execute(
+            insert(models.User).values(
+                email=user_dict["email"].upper(), hashed_password="x"
+            )
+        )
+    await db.rollback()
+
+
+@pytest.mark.asyncio
+async def test_authenticate_user_must_ignore_the_email_case(
+    db: AsyncSession,
+) -> None:
+    user_dict = random_user_dict()
+    new_user = await crud.user.create(db=db, user_in=user_dict)
+    principal = await crud.user.authenticate_user(
+        db=db,
+        user_email=user_dict["email"].upper(),
+        password=user_dict["password"],
+    )
+    assert principal.id == new_user.id
+
+
+@pytest.mark.asyncio
+async def test_if_delete_by_id_return_none_when_user_not_exist(
+    db: AsyncSession,
+) -> None:
+    new_user = await crud.user.create(db=db, user_in=random_user_dict())
+    await crud.user.delete_by_id(db=db, id=new_user.id)
+    assert await crud.user.delete_by_id(db=db, id=new_user.id) is None
+
+
+@pytest.mark.asyncio
+async def test_if_get_multi_public_return_the_schema_fields(
+    db: AsyncSession,
+) -> None:
+    new_user = await crud.user.create(db=db, user_in=random_user_dict())
+    users = await crud.user.get_multi_public(
+        db=db, after_id=new_user.id - 1, limit=1
+    )
+    assert users == [schemas.User.from_orm(new_user).dict()]
+
+
+@pytest.mark.asyncio
+async def test_if_get_fields_by_id_load_only_the_given_fields(
+    db: AsyncSession,
+) -> None:
+    new_user = await crud.user.create(db=db, user_in=random_user_dict())
+    with capture_statements() as statements:
+        user_data = await crud.user.get_fields_by_id(
+            db=db, id=new_user.id, fields=["id", "is_active"]
+        )
+    assert user_data == {"id": new_user.id, "is_active": new_user.is_active}
+    assert "hashed_password" not in statements[0]
+
+
+@pytest.mark.asyncio
+async def test_if_get_fields_by_id_return_none_when_user_not_exist(
+    db: AsyncSession,
+) -> None:
+    user_data = await crud.user.get_fields_by_id(db=db, id=0, fields=["id"])
+    assert user_data is None
+
+
+@pytest.mark.asyncio
+async def test_if_authenticate_user_return_the_principal(
+    db: AsyncSession,
+) -> None:
+    user_dict = random_user_dict()
+    new_user = await crud.user.create(db=db, user_in=user_dict)
+    principal = await crud.user.authenticate_user(
+        db=db, user_email=user_dict["email"], password=user_dict["password"]
+    )
+    assert isinstance(principal, schemas.UserPrincipal)
+    assert principal.id == new_user.id
+
+
+@pytest.mark.asyncio
+async def test_if_authenticate_user_return_false_on_wrong_password(
+    db: AsyncSession,
+) -> None:
+    user_dict = random_user_dict()
+    await crud.user.create(db=db, user_in=user_dict)
+    authenticated = await crud.user.authenticate_user(
+        db=db, user_email=user_dict["email"], password="wrong-password"
+    )
+    assert authenticated is False
+
+
+@pytest.mark.asyncio
+async def test_authenticate_user_must_rehash_an_outdated_password_hash(
+    db: AsyncSession, monkeypatch
+) -> None:
+    user_dict = random_user_dict()
+    new_user = await crud.user.create(db=db, user_in=user_dict)
+    old_context = security.create_pwd_context("bcrypt", 4, 1024, 1, 1)
+    await crud.user.update_password_hash(
+        db, id=new_user.id, hashed_password=old_context.hash("password")
+    )
+    monkeypatch.setattr(
+        security,
+        "pwd_context",
+        security.create_pwd_context("argon2", 4, 1024, 1, 1),
+    )
+    principal = await crud.user.authenticate_user(
+        db=db, user_email=user_dict["email"], password="password"
+    )
+    assert principal.token_version == new_user.token_version
+    user_data = await crud.user.get_fields_by_id(
+        db, id=new_user.id, fields=["hashed_password"]
+    )
+    assert user_data["hashed_password"].startswith("$argon2")
+
+
+@pytest.mark.asyncio
+async def test_authenticate_unknown_user_must_still_verify_a_password(
+    db: AsyncSession, monkeypatch
+) -> None:
+    verified = []
+
+    async def verify_password_async(raw_password, hashed_password):
+        verified.append(raw_password)
+        return True
+
+    monkeypatch.setattr(
+        security, "verify_password_async", verify_password_async
+    )
+    authenticated = await crud.user.authenticate_user(
+        db=db, user_email=f"unknown-{fake.email()}", password="a-password"
+    )
+    assert authenticated is False
+    assert verified == ["a-password"]
+
+
+@pytest.mark.asyncio
+async def test_update_user_must_increment_the_token_version(
+    db: AsyncSession,
+) -> None:
+    new_user = await crud.user.create(db=db, user_in=random_user_dict())
+    token_version = new_user.token_version
+    updated_user = await crud.user.update(
+        db=db, db_user=new_user, user_in={"full_name": fake.name()}
+    )
+    assert updated_user.token_version == token_version + 1
+    assert await token_versions.get(new_user.id) == updated_user.token_version
@@ -0,0 +1,66 @@
+import pytest
+
+from app.database.index_audit import (
+    audit_indexes,
+    format_report,
+    parse_postgres_plan,
+    parse_sqlite_plan,
+)
+
+
+def test_sqlite_plan_must_report_the_indexes_and_full_scans() -> None:
+    parsed = parse_sqlite_plan(
+        [
+            "SEARCH task USING INDEX ix_task_owner_id_is_done_id (owner_id=?)",
+            "SEARCH user USING INTEGER PRIMARY KEY (rowid=?)",
+            "SCAN task_fts VIRTUAL TABLE INDEX 0:M1",
+            "SCAN user",
+            "USE TEMP B-TREE FOR ORDER BY",
+        ]
+    )
+    assert parsed == {
+        "indexes": {"ix_task_owner_id_is_done_id"},
+        "full_scans": {"user"},
+    }
+
+
+def test_postgres_plan_must_report_the_indexes_and_full_scans() -> None:
+    parsed = parse_postgres_plan(
+        {
+            "Node Type": "Nested Loop",
+            "Plans": [
+                {
+                    "Node Type": "Bitmap Heap Scan",
+                    "Relation Name": "task",
+                    "Plans": [
+                        {
+                            "Node Type": "Bitmap Index Scan",
+                            "Index Name": "ix_task_search_vector",
+                        }
+                    ],
+                },
+                {"Node Type": "Seq Scan", "Relation Name": "user"},
+            ],
+        }
+    )
+    assert parsed == {
+        "indexes": {"ix_task_search_vector"},
+        "full_scans": {"user"},
+    }
+
+
+@pytest.mark.asyncio
+async def test_every_index_must_be_used_by_the_crud_queries() -> None:
+    audit = await audit_indexes()
+    assert audit.unused == set(), format_report(audit)
+    assert audit.missing == set()
+    assert audit.undeclared == set()
+    assert "ix_task_owner_id_is_done_id" in audit.used
+    # The email lookups must be served by the lower(email) index.
+    assert "ix_user_email_lower" in audit.used
+
+
+@pytest.mark.asyncio
+async def test_the_crud_queries_must_not_scan_whole_tables() -> None:
+    audit = await audit_indexes()
+    assert [plan.sql for plan in audit.plans if plan.full_scans] == []
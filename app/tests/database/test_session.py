@@ -0,0 +1,166 @@
+import pytest
+from sqlalchemy import select, text, update
+
+from app import crud, models
+from app.core.cache import MemoryCacheBackend
+from app.core.config import settings
+from app.database.session import (
+    InstrumentedQueuePool,
+    SessionRouter,
+    async_session,
+    engine,
+    get_engine_options,
+    get_pool_status,
+    read_only,
+)
+
+
+def test_engine_options_must_use_the_configured_pool() -> None:
+    options = get_engine_options("sqlite+aiosqlite:///test.db")
+    assert options["poolclass"] is InstrumentedQueuePool
+    assert options["pool_size"] == settings.DATABASE_POOL_SIZE
+    assert options["echo"] is settings.SQLALCHEMY_ECHO
+
+
+def test_engine_options_for_asyncpg_must_set_statement_cache_size() -> None:
+    options = get_engine_options("postgresql+asyncpg://u:p@localhost/db")
+    assert (
+        options["connect_args"]["prepared_statement_cache_size"]
+        == settings.DATABASE_STATEMENT_CACHE_SIZE
+    )
+
+
+def test_engine_options_for_asyncpg_must_set_statement_timeout(
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    monkeypatch.setattr(settings, "DATABASE_STATEMENT_TIMEOUT_MS", 5000)
+    options = get_engine_options("postgresql+asyncpg://u:p@localhost/db")
+    server_settings = options["connect_args"]["server_settings"]
+    assert server_settings["statement_timeout"] == "5000"
+
+
+def test_engine_options_for_sqlite_must_not_set_connect_args() -> None:
+    options = get_engine_options("sqlite+aiosqlite:///test.db")
+    assert "connect_args" not in options
+
+
+@pytest.mark.asyncio
+async def test_pool_status_must_count_the_checkouts() -> None:
+    checkouts = get_pool_status(engine)["checkouts"]
+    async with engine.connect() as connection:
+        await connection.execute(text("SELECT 1"))
+    assert get_pool_status(engine)["checkouts"] == checkouts + 1
+
+
+def create_router() -> SessionRouter:
+    return SessionRouter(
+        writer="writer",
+        reader="reader",
+        recent_writers=MemoryCacheBackend(maxsize=10, ttl=60),
+    )
+
+
+@pytest.mark.asyncio
+async def test_session_router_must_send_safe_methods_to_reader() -> None:
+    router = create_router()
+    for method in ("GET", "HEAD", "OPTIONS", "get"):
+        assert await router.session_for(method, "1") == "reader"
+    for method in ("POST", "PUT", "PATCH", "DELETE"):
+        assert await router.session_for(method) == "writer"
+
+
+@pytest.mark.asyncio
+async def test_session_router_must_send_reads_after_write_to_writer() -> None:
+    router = create_router()
+    await router.session_for("POST", "1")
+    assert await router.session_for("GET", "1") == "writer"
+    assert await router.session_for("GET", "2") == "reader"
+    assert await router.session_for("GET") == "reader"
+
+
+@pytest.mark.asyncio
+async def test_session_router_must_send_reads_to_reader_after_lag() -> None:
+    router = create_router()
+    await router.session_for("POST", "1")
+    await router.recent_writers.delete("1")  # as if the lag had passed
+    assert await router.session_for("GET", "1") == "reader"
+
+
+def test_read_only_must_keep_the_sqlite_engine() -> None:
+    assert read_only(engine) is engine
+
+
+@pytest.mark.asyncio
+async def test_session_must_release_the_connection_after_a_read() -> None:
+    async with async_session() as db:
+        checked_out = get_pool_status(engine)["checked_out"]
+        await db.execute(select(models.User.id).limit(1))
+        await db.scalar(select(models.User.id).limit(1))
+        await crud.user.get_principal(db, id=0)
+        assert not db.in_transaction()
+        assert get_pool_status(engine)["checked_out"] == checked_out
+
+
+@pytest.mark.asyncio
+async def test_session_must_hold_the_connection_until_the_commit() -> None:
+    async with async_session() as db:
+        await db.execute(
+            update(models.User)
+            .where(models.User.id == 0)
+            .values(full_name="x")
+        )
+        await db.execute(select(models.User.id).limit(1))
+        assert db.in_transaction()
+        await db.commit()
+        assert not db.in_transaction()
+
+
+@pytest.mark.asyncio
+async def test_session_must_hold_the_row_locks_until_the_commit() -> None:
+    async with async_session() as db:
+        await db.execute(select(models.User.id).limit(1).with_for_update())
+        assert db.in_transaction()
+        await db.execute(select(models.User.id).limit(1))
+        assert db.in_transaction()
+        await db.commit()
+        assert not db.in_transaction()
+
+
+@pytest.mark.asyncio
+async def test_session_must_not_commit_the_changes_flushed_by_a_read() -> None:
+    async with async_session() as db:
+        db.add(models.User(email="autoflush@example.com", hashed_password="x"))
+        await db.execute(select(models.User.id).limit(1))
+        assert db.in_transaction()
+        await db.rollback()
+        assert not await crud.user.get_by_email(
+            db, email="autoflush@example.com"
+        )
+
+
+@pytest.mark.asyncio
+async def test_session_must_not_commit_explicitly_flushed_changes() -> None:
+    async with async_session() as db:
+        db.add(models.User(email="flush@example.com", hashed_password="x"))
+        await db.flush()
+        await db.execute(select(models.User.id).limit(1))
+        assert db.in_transaction()
+        await db.rollback()
+        assert not await crud.user.get_by_email(db, email="flush@example.com")
+
+
+@pytest.mark.asyncio
+async def test_session_must_not_commit_inside_a_begin_block() -> None:
+    async with async_session() as db:
+        with pytest.raises(RuntimeError):
+            async with db.begin():
+                await db.execute(select(models.User.id).limit(1))
+                assert db.in_transaction()
+                db.add(
+                    models.User(email="begin@example.com", hashed_password="x")
+                )
+                await db.flush()
+                await db.execute(select(models.User.id).limit(1))
+                raise RuntimeError("rolls the block back")
+        assert not await crud.user.get_by_email(db, email="begin@example.com")
+        assert not db.writing
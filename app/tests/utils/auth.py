@@ -2,6 +2,7 @@ from datetime import timedelta
 from typing import Dict
 
 from app import models
+from app.api.deps import get_token_claims
 from app.core.security import create_jwt_token
 
 
@@ -16,3 +17,9 @@ def get_expired_user_token_headers(user: models.User) -> Dict[str, str]:
     token = create_jwt_token(subject=user.id, expires_delta=expire_delta)
     headers = {"Authorization": f"Bearer {token}"}
     return headers
+
+
+def get_stateless_user_token_headers(user: models.User) -> Dict[str, str]:
+    token = create_jwt_token(subject=user.id, claims=get_token_claims(user))
+    headers = {"Authorization": f"Bearer {token}"}
+    return headers
@@ -0,0 +1,34 @@
+import time
+from typing import Dict, Optional, Tuple
+
+
+class FakeSharedStore:
+    """
+    Local stand-in for the shared cache store (redis), implementing just the
+    client methods used by the SharedCacheBackend.
+    """
+
+    def __init__(self) -> None:
+        self.data: Dict[str, Tuple[Optional[float], str]] = {}
+
+    async def get(self, key: str) -> Optional[str]:
+        item = self.data.get(key)
+        if item is None:
+            return None
+        expires_at, value = item
+        if expires_at is not None and expires_at <= time.monotonic():
+            del self.data[key]
+            return None
+        return value
+
+    async def set(
+        self, key: str, value: str, ex: Optional[int] = None, nx: bool = False
+    ) -> Optional[bool]:
+        if nx and await self.get(key) is not None:
+            return None
+        expires_at = time.monotonic() + ex if ex is not None else None
+        self.data[key] = (expires_at, value)
+        return True
+
+    async def delete(self, key: str) -> None:
+        self.data.pop(key, None)
@@ -0,0 +1,32 @@
+import socket
+from typing import Any, List
+
+from aiosmtpd.controller import Controller
+
+
+class RecordingHandler:
+    """aiosmtpd handler keeping every accepted message and SMTP session."""
+
+    def __init__(self) -> None:
+        self.messages: List[Any] = []
+        self.sessions: List[Any] = []
+
+    async def handle_DATA(self, server: Any, session: Any, envelope: Any):
+        if all(session is not known for known in self.sessions):
+            self.sessions.append(session)
+        self.messages.append(envelope)
+        return "250 Message accepted for delivery"
+
+
+def get_free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def start_smtp_server(handler: RecordingHandler) -> Controller:
+    controller = Controller(
+        handler, hostname="127.0.0.1", port=get_free_port()
+    )
+    controller.start()
+    return controller
@@ -0,0 +1,18 @@
+from typing import Dict, Union
+
+from app.tests.utils.user import fake
+
+
+def random_task_dict() -> Dict[str, Union[str, bool]]:
+    task_dict = {
+        "title": fake.sentence(nb_words=3)[:50],
+        "description": fake.text(max_nb_chars=140),
+        "is_done": False,
+    }
+    return task_dict
+
+
+def random_done_task_dict() -> Dict[str, Union[str, bool]]:
+    task_dict = random_task_dict()
+    task_dict["is_done"] = True
+    return task_dict
@@ -8,7 +8,7 @@ fake = Faker()
 def random_user_dict() -> Dict[str, Union[str, int, bool]]:
     user_dict = {
         "full_name": fake.name(),
-        "email": fake.free_email(),
+        "email": fake.unique.free_email(),
         "password": fake.password(length=12),
         "is_active": False,
         "is_superuser": False,
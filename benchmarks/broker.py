@@ -0,0 +1,97 @@
+"""
+Broker throughput benchmark. It publishes --messages verification email
+tasks through the Celery app (with its serializer, compression and routes)
+and then consumes them back from the broker, reporting messages/second of
+each side. The tasks are not run, so no SMTP server is needed.
+
+    python -m benchmarks.broker
+    python -m benchmarks.broker --broker amqp://guest@localhost:5672//
+    python -m benchmarks.broker --serializer json --compression gzip
+"""
+
+import argparse
+import sys
+import time
+from typing import Dict, List, Optional
+
+DEFAULT_BROKER = "memory://"
+
+
+def publish(messages: int) -> float:
+    from app.celery_worker import send_verification_email
+
+    started = time.perf_counter()
+    with send_verification_email.app.producer_or_acquire() as producer:
+        for number in range(messages):
+            send_verification_email.apply_async(
+                (f"user{number}@example.com", f"User {number}", "token"),
+                producer=producer,
+            )
+    return time.perf_counter() - started
+
+
+def consume(messages: int, timeout: float) -> float:
+    from app.celery_worker import send_verification_email
+
+    app = send_verification_email.app
+    queue = app.amqp.router.route({}, send_verification_email.name)["queue"]
+    received = 0
+
+    def on_message(message) -> None:
+        nonlocal received
+        message.decode()
+        message.ack()
+        received += 1
+
+    started = time.perf_counter()
+    with app.connection_for_read() as connection:
+        with connection.Consumer(
+            queue,
+            accept=app.conf.accept_content,
+            on_message=on_message,
+            prefetch_count=app.conf.worker_prefetch_multiplier,
+        ):
+            while received < messages:
+                connection.drain_events(timeout=timeout)
+    return time.perf_counter() - started
+
+
+def run(args: argparse.Namespace) -> Dict[str, float]:
+    from app.core.celery_app import celery_app
+
+    celery_app.conf.update(
+        broker_url=args.broker,
+        task_serializer=args.serializer,
+        accept_content=sorted({args.serializer, "json"}),
+        task_compression=args.compression,
+    )
+    published = publish(args.messages)
+    consumed = consume(args.messages, args.timeout)
+    return {
+        "messages": args.messages,
+        "publish_rps": round(args.messages / published, 2),
+        "consume_rps": round(args.messages / consumed, 2),
+    }
+
+
+def parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
+    from app.core.config import settings
+
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--broker", default=DEFAULT_BROKER)
+    parser.add_argument("--messages", type=int, default=10_000)
+    parser.add_argument("--serializer", default=settings.CELERY_SERIALIZER)
+    parser.add_argument("--compression", default=settings.CELERY_COMPRESSION)
+    parser.add_argument("--timeout", type=float, default=5)
+    return parser.parse_args(argv)
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    results = run(parse_args(argv))
+    for name, value in results.items():
+        print(f"{name:<14}{value:>12}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,282 @@
+"""
+In-process load driver for the API. It migrates the database, creates a user
+with some tasks and hits each endpoint through httpx.AsyncClient against
+app.main:app, reporting the p50/p95/p99 latency and requests/second.
+
+    python -m benchmarks.load
+    python -m benchmarks.load --database-uri postgresql+asyncpg://...
+    python -m benchmarks.load --save .benchmarks/load-baseline.json
+    python -m benchmarks.load --compare .benchmarks/load-baseline.json
+
+With --compare, the exit status is 1 when some endpoint p95 latency grew or
+its requests/second dropped more than --max-regression.
+"""
+
+import argparse
+import asyncio
+import json
+import math
+import os
+import sys
+import time
+from pathlib import Path
+from typing import Any, Callable, Dict, List, NamedTuple, Optional
+
+ROOT = Path(__file__).resolve().parent.parent
+DEFAULT_DATABASE_URI = "sqlite+aiosqlite:///bench.db"
+
+
+class Scenario(NamedTuple):
+    name: str
+    method: str
+    url: str
+    # Builds the httpx request keyword arguments (headers, json, data...)
+    build: Callable[[Dict[str, Any]], Dict[str, Any]]
+    requests: int
+
+
+def percentile(sorted_values: List[float], percent: float) -> float:
+    """Nearest-rank percentile of an already sorted list."""
+    if not sorted_values:
+        return 0.0
+    rank = math.ceil(percent / 100 * len(sorted_values))
+    return sorted_values[max(rank, 1) - 1]
+
+
+def summarize(
+    latencies: List[float], errors: int, elapsed: float
+) -> Dict[str, float]:
+    latencies = sorted(latencies)
+    return {
+        "requests": len(latencies),
+        "errors": errors,
+        "rps": round(len(latencies) / elapsed, 2) if elapsed else 0.0,
+        "p50_ms": round(percentile(latencies, 50) * 1000, 3),
+        "p95_ms": round(percentile(latencies, 95) * 1000, 3),
+        "p99_ms": round(percentile(latencies, 99) * 1000, 3),
+    }
+
+
+def migrate(database_uri: str) -> None:
+    from alembic import command
+    from alembic.config import Config
+
+    if database_uri == DEFAULT_DATABASE_URI:
+        Path("bench.db").unlink(missing_ok=True)
+    config = Config(str(ROOT / "alembic.ini"))
+    config.set_main_option("script_location", str(ROOT / "alembic"))
+    command.upgrade(config, "head")
+
+
+async def create_fixtures(tasks: int) -> Dict[str, Any]:
+    from app import crud
+    from app.core.security import create_jwt_token
+    from app.database.session import async_session
+
+    password = "bench-password"
+    async with async_session() as db:
+        user = await crud.user.create(
+            db=db,
+            user_in={
+                "full_name": "Bench User",
+                "email": f"bench-{time.time_ns()}@example.com",
+                "password": password,
+                "is_active": True,
+                "is_superuser": False,
+            },
+        )
+        for number in range(tasks):
+            await crud.task.create(
+                db=db,
+                owner_id=user.id,
+                task_in={"title": f"Task {number}", "description": "bench"},
+            )
+    token = create_jwt_token(subject=user.id)
+    return {
+        "email": user.email,
+        "password": password,
+        "headers": {"Authorization": f"Bearer {token}"},
+    }
+
+
+def get_scenarios(args: argparse.Namespace) -> List[Scenario]:
+    from app.core.config import settings
+
+    api = settings.API_V1_STR
+    return [
+        Scenario("GET /", "GET", "/", lambda f: {}, args.requests),
+        Scenario(
+            "POST /login/access-token",
+            "POST",
+            f"{api}/login/access-token",
+            lambda f: {
+                "data": {"username": f["email"], "password": f["password"]}
+            },
+            args.login_requests,
+        ),
+        Scenario(
+            "GET /users/me",
+            "GET",
+            f"{api}/users/me",
+            lambda f: {"headers": f["headers"]},
+            args.requests,
+        ),
+        Scenario(
+            "GET /tasks/",
+            "GET",
+            f"{api}/tasks/",
+            lambda f: {"headers": f["headers"]},
+            args.requests,
+        ),
+        Scenario(
+            "GET /tasks/search",
+            "GET",
+            f"{api}/tasks/search",
+            lambda f: {"headers": f["headers"], "params": {"q": "task 7"}},
+            args.requests,
+        ),
+        Scenario(
+            "POST /tasks/",
+            "POST",
+            f"{api}/tasks/",
+            lambda f: {
+                "headers": f["headers"],
+                "json": {"title": "Load", "description": "bench"},
+            },
+            args.requests,
+        ),
+    ]
+
+
+async def run_scenario(
+    client: Any,
+    scenario: Scenario,
+    fixtures: Dict[str, Any],
+    concurrency: int,
+) -> Dict[str, float]:
+    latencies: List[float] = []
+    errors = 0
+    remaining = iter(range(scenario.requests))
+    kwargs = scenario.build(fixtures)
+
+    async def worker() -> None:
+        nonlocal errors
+        for _ in remaining:
+            started = time.perf_counter()
+            response = await client.request(
+                scenario.method, scenario.url, **kwargs
+            )
+            latencies.append(time.perf_counter() - started)
+            if response.status_code >= 400:
+                errors += 1
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    return summarize(latencies, errors, time.perf_counter() - started)
+
+
+async def run(args: argparse.Namespace) -> Dict[str, Dict[str, float]]:
+    from httpx import AsyncClient
+
+    from app.core.config import settings
+    from app.main import app
+
+    fixtures = await create_fixtures(args.tasks)
+    results = {}
+    async with AsyncClient(app=app, base_url=settings.BASE_URL) as client:
+        for scenario in get_scenarios(args):
+            # Warm up the caches and connection pool before measuring.
+            await run_scenario(
+                client,
+                scenario._replace(requests=args.concurrency),
+                fixtures,
+                args.concurrency,
+            )
+            results[scenario.name] = await run_scenario(
+                client, scenario, fixtures, args.concurrency
+            )
+    return results
+
+
+def compare(
+    results: Dict[str, Dict[str, float]],
+    baseline: Dict[str, Dict[str, float]],
+    max_regression: float,
+) -> List[str]:
+    regressions = []
+    for name, result in results.items():
+        base = baseline.get(name)
+        if base is None:
+            continue
+        if result["p95_ms"] > base["p95_ms"] * (1 + max_regression):
+            regressions.append(
+                f"{name}: p95 {base['p95_ms']}ms -> {result['p95_ms']}ms"
+            )
+        if result["rps"] < base["rps"] * (1 - max_regression):
+            regressions.append(f"{name}: rps {base['rps']} -> {result['rps']}")
+    return regressions
+
+
+def print_results(
+    results: Dict[str, Dict[str, float]],
+    baseline: Optional[Dict[str, Dict[str, float]]] = None,
+) -> None:
+    header = f"{'endpoint':<28}{'rps':>10}{'p50 ms':>10}"
+    header += f"{'p95 ms':>10}{'p99 ms':>10}{'errors':>8}"
+    print(header)
+    for name, result in results.items():
+        print(
+            f"{name:<28}{result['rps']:>10}{result['p50_ms']:>10}"
+            f"{result['p95_ms']:>10}{result['p99_ms']:>10}"
+            f"{result['errors']:>8}"
+        )
+        base = (baseline or {}).get(name)
+        if base:
+            print(
+                f"{'  baseline':<28}{base['rps']:>10}{base['p50_ms']:>10}"
+                f"{base['p95_ms']:>10}{base['p99_ms']:>10}"
+                f"{base['errors']:>8}"
+            )
+
+
+def parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--database-uri", default=DEFAULT_DATABASE_URI)
+    parser.add_argument("--requests", type=int, default=500)
+    parser.add_argument("--login-requests", type=int, default=50)
+    parser.add_argument("--concurrency", type=int, default=20)
+    parser.add_argument("--tasks", type=int, default=100)
+    parser.add_argument("--save", type=Path)
+    parser.add_argument("--compare", type=Path)
+    parser.add_argument("--max-regression", type=float, default=0.1)
+    return parser.parse_args(argv)
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    args = parse_args(argv)
+    # The settings are read on import, so the URI must be set before it.
+    os.environ["SQLALCHEMY_DATABASE_URI"] = args.database_uri
+    # The logins all come from one client and account, they would be
+    # answered with 429 by the login rate limits.
+    for name in ("IP", "ACCOUNT"):
+        os.environ[f"LOGIN_RATE_LIMIT_{name}_BURST"] = str(sys.maxsize)
+    migrate(args.database_uri)
+    results = asyncio.run(run(args))
+
+    baseline = None
+    if args.compare:
+        baseline = json.loads(args.compare.read_text())
+    print_results(results, baseline)
+    if args.save:
+        args.save.parent.mkdir(parents=True, exist_ok=True)
+        args.save.write_text(json.dumps(results, indent=2))
+    if baseline is not None:
+        regressions = compare(results, baseline, args.max_regression)
+        for regression in regressions:
+            print(f"REGRESSION {regression}")
+        return 1 if regressions else 0
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
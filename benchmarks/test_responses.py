@@ -0,0 +1,80 @@
+import asyncio
+from typing import Any, Dict, List
+
+import pytest
+from fastapi.responses import JSONResponse, ORJSONResponse
+from fastapi.routing import serialize_response
+from fastapi.utils import create_response_field
+from sqlalchemy import create_engine, insert, select
+from sqlalchemy.orm import Session
+
+from app import models, schemas
+from app.crud.crud_user import PUBLIC_COLUMNS
+from app.database.base import Base
+
+ITEMS = 1000
+
+
+@pytest.fixture(scope="module")
+def session() -> Session:
+    engine = create_engine("sqlite://")
+    Base.metadata.create_all(engine)
+    with Session(engine) as session:
+        session.execute(
+            insert(models.User),
+            [
+                {
+                    "full_name": f"User {number}",
+                    "email": f"user{number}@example.com",
+                    "hashed_password": "hashed",
+                    "is_active": True,
+                    "is_superuser": False,
+                }
+                for number in range(ITEMS)
+            ],
+        )
+        yield session
+
+
+@pytest.fixture(scope="module")
+def db_users(session: Session) -> List[models.User]:
+    return session.scalars(select(models.User)).all()
+
+
+@pytest.fixture(scope="module")
+def user_rows(session: Session) -> List[Dict[str, Any]]:
+    result = session.execute(select(*PUBLIC_COLUMNS))
+    return [dict(row) for row in result.mappings()]
+
+
+def test_list_1000_users_through_response_model(
+    benchmark, db_users: List[models.User]
+) -> None:
+    """What FastAPI does with the ORM objects and a response_model."""
+    field = create_response_field(
+        name="response", type_=schemas.Page[schemas.User]
+    )
+    loop = asyncio.new_event_loop()
+
+    def render() -> bytes:
+        content = loop.run_until_complete(
+            serialize_response(
+                field=field,
+                response_content={"items": db_users, "next_cursor": None},
+            )
+        )
+        return JSONResponse(content).body
+
+    benchmark(render)
+    loop.close()
+
+
+def test_list_1000_users_from_rows_with_orjson(
+    benchmark, user_rows: List[Dict[str, Any]]
+) -> None:
+    """What list_users does now."""
+
+    def render() -> bytes:
+        return ORJSONResponse({"items": user_rows, "next_cursor": None}).body
+
+    benchmark(render)
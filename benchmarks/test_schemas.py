@@ -0,0 +1,47 @@
+from typing import List
+
+import pytest
+
+from app import models, schemas
+from app.core.pagination import encode_cursor
+
+
+@pytest.fixture
+def db_users() -> List[models.User]:
+    return [
+        models.User(
+            id=id,
+            full_name=f"User {id}",
+            email=f"user{id}@example.com",
+            hashed_password="hashed",
+            is_active=True,
+            is_superuser=False,
+        )
+        for id in range(1, 101)
+    ]
+
+
+def test_user_from_orm(benchmark, db_users: List[models.User]) -> None:
+    benchmark(schemas.User.from_orm, db_users[0])
+
+
+def test_user_page_serialization(
+    benchmark, db_users: List[models.User]
+) -> None:
+    def serialize() -> str:
+        page = schemas.Page[schemas.User](
+            items=[schemas.User.from_orm(user) for user in db_users],
+            next_cursor=encode_cursor([db_users[-1].id]),
+        )
+        return page.json()
+
+    benchmark(serialize)
+
+
+def test_user_create_validation(benchmark) -> None:
+    benchmark(
+        schemas.UserCreate,
+        full_name="User",
+        email="user@example.com",
+        password="my-password",
+    )
@@ -0,0 +1,39 @@
+import pytest
+
+from app.core.security import (
+    create_jwt_token,
+    decode_jwt_token,
+    get_password_hash,
+    token_cache,
+    verify_password,
+)
+
+
+@pytest.fixture
+def token() -> str:
+    return create_jwt_token(subject=1)
+
+
+def test_create_jwt_token(benchmark) -> None:
+    benchmark(create_jwt_token, subject=1)
+
+
+def test_decode_jwt_token_not_cached(benchmark, token: str) -> None:
+    def decode() -> None:
+        token_cache.clear()
+        decode_jwt_token(token)
+
+    benchmark(decode)
+
+
+def test_decode_jwt_token_cached(benchmark, token: str) -> None:
+    decode_jwt_token(token)
+    benchmark(decode_jwt_token, token)
+
+
+def test_verify_password(benchmark) -> None:
+    hashed_password = get_password_hash("my-password")
+    # bcrypt is slow on purpose, a few rounds are enough.
+    benchmark.pedantic(
+        verify_password, args=("my-password", hashed_password), rounds=5
+    )